@@ -0,0 +1,76 @@
+"""
+Encoding throughput (docs/sec) of TextEncoder vs number of worker processes.
+
+usage: uv run python benchmarks/bench_encoder.py --num-docs 20000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from arxivrec.engine.encoder import TextEncoder
+
+
+def make_abstracts(num_docs: int, words_per_doc: int = 150, seed: int = 0):
+    """Random word salad with roughly the token length of an arXiv abstract."""
+    rng = np.random.default_rng(seed)
+    vocab = [f"term{i}" for i in range(5000)]
+    return [
+        "Title: " + " ".join(rng.choice(vocab, size=words_per_doc))
+        for _ in range(num_docs)
+    ]
+
+
+def default_workers() -> list[int]:
+    cores = os.cpu_count() or 1
+    workers = [1]
+    while workers[-1] * 2 <= cores:
+        workers.append(workers[-1] * 2)
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--num-docs", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers())
+    args = parser.parse_args()
+
+    texts = make_abstracts(args.num_docs)
+    print(f"{args.num_docs} docs, model={args.model}, {os.cpu_count()} cores")
+    print(f"{'workers':>8}{'threads':>9}{'docs/s':>10}{'speedup':>9}")
+
+    baseline = None
+    reference = None
+    for num_workers in args.workers:
+        threads = max(1, (os.cpu_count() or 1) // num_workers)
+        encoder = TextEncoder(
+            args.model,
+            batch_size=args.batch_size,
+            num_workers=num_workers,
+            torch_threads=threads,
+        )
+        encoder.encode(texts[: args.batch_size * num_workers])  # warm up the pool
+
+        start = time.perf_counter()
+        vectors = encoder.encode(texts)
+        docs_per_sec = len(texts) / (time.perf_counter() - start)
+        encoder.close()
+
+        # Same vectors, in the same order, whatever the number of workers
+        if reference is None:
+            reference = vectors
+        assert np.allclose(vectors, reference, atol=1e-4)
+
+        baseline = baseline or docs_per_sec
+        print(
+            f"{num_workers:>8}{threads:>9}{docs_per_sec:>10.1f}"
+            f"{docs_per_sec / baseline:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Throughput and fp32 parity of the TextEncoder backends.
+
+For each backend, prints load time, docs/sec, and how much of the fp32 top-k
+it keeps, and exits non-zero if that overlap falls below --threshold.
+
+usage: uv run python benchmarks/bench_encoder_backends.py --num-docs 5000 -k 15
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from arxivrec.engine.encoder import ENCODER_BACKENDS, TextEncoder, top_k_overlap
+
+
+def make_corpus(num_docs: int, num_queries: int, seed: int = 0):
+    """Abstract-like texts built from a handful of overlapping research themes."""
+    rng = np.random.default_rng(seed)
+    themes = [
+        "large language models instruction tuning reasoning benchmarks",
+        "retrieval augmented generation dense retrieval vector search",
+        "diffusion models image generation guidance sampling",
+        "graph neural networks message passing molecules",
+        "reinforcement learning from human feedback reward models",
+        "speech recognition self supervised audio representations",
+        "efficient inference quantization pruning distillation",
+        "vision transformers object detection segmentation",
+    ]
+    filler = (
+        "we propose a novel method and show strong results on several tasks".split()
+    )
+
+    def text(size: int) -> str:
+        picked = rng.choice(len(themes), size=2, replace=False)
+        words = " ".join(themes[i] for i in picked).split() + filler
+        return " ".join(rng.choice(words, size=size))
+
+    return [text(8) for _ in range(num_queries)], [text(120) for _ in range(num_docs)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--num-docs", type=int, default=2000)
+    parser.add_argument("--num-queries", type=int, default=32)
+    parser.add_argument("-k", type=int, default=15)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--backends", nargs="+", default=list(ENCODER_BACKENDS))
+    args = parser.parse_args()
+
+    queries, docs = make_corpus(args.num_docs, args.num_queries)
+    print(f"{args.num_docs} docs, {args.num_queries} queries, k={args.k}")
+    print(f"{'backend':<12}{'load s':>8}{'docs/s':>10}{'speedup':>9}{'overlap':>9}")
+
+    failed = []
+    reference = TextEncoder(args.model)
+    baseline = None
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for backend in args.backends:
+            start = time.perf_counter()
+            try:
+                encoder = (
+                    reference
+                    if backend == "torch"
+                    else TextEncoder(args.model, cache_dir=cache_dir, backend=backend)
+                )
+            except ImportError as e:
+                print(f"{backend:<12}skipped: {e}")
+                continue
+            load_s = time.perf_counter() - start
+
+            encoder.encode(docs[:64])  # warm up
+            start = time.perf_counter()
+            encoder.encode(docs)
+            docs_per_sec = len(docs) / (time.perf_counter() - start)
+            baseline = baseline or docs_per_sec
+
+            overlap = top_k_overlap(encoder, reference, queries, docs, k=args.k)
+            if overlap < args.threshold:
+                failed.append(backend)
+            print(
+                f"{backend:<12}{load_s:>8.2f}{docs_per_sec:>10.1f}"
+                f"{docs_per_sec / baseline:>8.2f}x{overlap:>9.3f}"
+            )
+
+    if failed:
+        print(f"Top-{args.k} overlap below {args.threshold} for: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Recall vs latency of the vector index backends on synthetic embeddings.
+
+usage: uv run python benchmarks/bench_index.py --num-docs 100000 --dim 384
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from arxivrec.engine.index import INDEX_REGISTRY
+from arxivrec.engine.similarity import l2_normalize
+
+
+def make_corpus(num_docs: int, dim: int, num_clusters: int, seed: int = 0):
+    """Clustered unit vectors, closer to real abstracts than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(num_clusters, dim))
+    labels = rng.integers(num_clusters, size=num_docs)
+    docs = centers[labels] + 0.5 * rng.normal(size=(num_docs, dim))
+    queries = centers[rng.integers(num_clusters, size=64)] + rng.normal(size=(64, dim))
+    return l2_normalize(docs), l2_normalize(queries)
+
+
+def recall_at_k(found: list[list[str]], truth: list[list[str]]) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / sum(len(t) for t in truth)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-docs", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("-k", type=int, default=15)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 256])
+    args = parser.parse_args()
+
+    docs, queries = make_corpus(args.num_docs, args.dim, args.clusters)
+    ids = [str(i) for i in range(args.num_docs)]
+
+    exact = INDEX_REGISTRY["numpy"]()
+    exact.add(ids, docs)
+    start = time.perf_counter()
+    truth, _ = exact.search(queries, k=args.k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    print(f"{args.num_docs} docs, dim={args.dim}, k={args.k}")
+    print(f"{'backend':<20}{'build s':>10}{'ms/query':>10}{'recall':>8}")
+    print(f"{'numpy':<20}{'-':>10}{exact_ms:>10.3f}{1.0:>8.3f}")
+
+    if "hnsw" not in INDEX_REGISTRY.show_available():
+        return
+    try:
+        ann = INDEX_REGISTRY["hnsw"]()
+    except ImportError as e:
+        print(f"Skipping hnsw: {e}")
+        return
+
+    start = time.perf_counter()
+    ann.add(ids, docs)
+    build_s = time.perf_counter() - start
+
+    for ef in args.ef_search:
+        ann.ef_search = ef
+        start = time.perf_counter()
+        found, _ = ann.search(queries, k=args.k)
+        ms = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = recall_at_k(found, truth)
+        print(f"{f'hnsw ef={ef}':<20}{build_s:>10.1f}{ms:>10.3f}{recall:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Candidate assembly and digest rendering cost at 10^4 candidates.
+
+Times LLMRanker.rank with an instant fake LLM (so only prompt building and
+result assembly are measured) and build_digest_html, and exits non-zero if
+either exceeds --budget-ms.
+
+usage: uv run python benchmarks/bench_ranker.py --num-candidates 10000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+from arxivrec.engine.llm import BaseLLM
+from arxivrec.engine.ranker import LLMRanker
+from arxivrec.pipeline import build_digest_html
+from arxivrec.topic import Topic
+
+
+class InstantLLM(BaseLLM):
+    """Answers at once with the last `picks` candidates of the prompt."""
+
+    def __init__(self, ids: list[str], picks: int):
+        super().__init__(model_name="instant")
+        papers = [{"id": i, "reasoning": f"Worth reading: {i}"} for i in ids[-picks:]]
+        self.response = {"response": json.dumps({"papers": papers})}
+
+    def call(self, prompt):
+        return self.response
+
+
+def make_candidates(num: int) -> pd.DataFrame:
+    ids = [f"2401.{i:05d}" for i in range(num)]
+    return pd.DataFrame(
+        {
+            "id": ids,
+            "title": [f"Paper {i} on efficient <inference>" for i in range(num)],
+            "authors": [[f"Author {j}" for j in range(i % 20 + 1)] for i in range(num)],
+            "abstract": ["We study a problem & propose a method. " * 8] * num,
+            "url": [f"https://arxiv.org/abs/{i}" for i in ids],
+            "published": pd.Timestamp("2024-01-01", tz="UTC"),
+            "combined_text": ["Title: ...; Abstract: ..."] * num,
+        }
+    )
+
+
+def timings_ms(fn, repeat: int) -> tuple[float, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-candidates", type=int, default=10_000)
+    parser.add_argument("--num-topics", type=int, default=5)
+    parser.add_argument("--picks", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    candidates = make_candidates(args.num_candidates)
+    ranker = LLMRanker(InstantLLM(candidates["id"].tolist(), args.picks))
+
+    topics = [Topic(id=f"topic_{t}") for t in range(args.num_topics)]
+    ranked = candidates.assign(reasoning="Relevant to the topic.")
+    results = {t.id: ranked.iloc[i :: args.num_topics] for i, t in enumerate(topics)}
+
+    stages = {
+        "LLMRanker.rank": lambda: ranker.rank("efficient inference", candidates),
+        "build_digest_html": lambda: build_digest_html(topics, results),
+    }
+    print(f"{args.num_candidates} candidates, best of {args.repeat}")
+    print(f"{'stage':<20}{'best ms':>10}{'median ms':>11}")
+    over_budget = []
+    for name, fn in stages.items():
+        best, median = timings_ms(fn, args.repeat)
+        print(f"{name:<20}{best:>10.1f}{median:>11.1f}")
+        if best > args.budget_ms:
+            over_budget.append(name)
+
+    if over_budget:
+        print(f"Over the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
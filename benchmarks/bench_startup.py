@@ -0,0 +1,70 @@
+"""
+CLI startup cost: `python -X importtime` of arxivrec.main and of each stage.
+
+Prints the median cumulative import time per target and the slowest modules of
+the first one, and exits non-zero if `arxivrec.main` exceeds --budget-ms.
+
+usage: uv run python benchmarks/bench_startup.py --repeat 5 --budget-ms 300
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+TARGETS = [
+    "arxivrec.main",
+    "arxivrec.dataset.fetcher",
+    "arxivrec.dataset.store",
+    "arxivrec.pipeline",
+    "arxivrec.engine.encoder",
+]
+
+
+def import_times(module: str) -> dict[str, tuple[int, int]]:
+    """{module: (self us, cumulative us)} from one fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", nargs="+", default=TARGETS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"{'module':<28}{'median ms':>10}")
+    medians = {}
+    first_run = None
+    for module in args.targets:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        first_run = first_run or runs[0]
+        medians[module] = statistics.median(r[module][1] for r in runs) / 1000
+        print(f"{module:<28}{medians[module]:>10.1f}")
+
+    slowest = sorted(first_run.items(), key=lambda kv: kv[1][0], reverse=True)
+    print(f"\nSlowest modules (self time) importing {args.targets[0]}:")
+    for name, (self_us, _) in slowest[: args.top]:
+        print(f"  {name:<40}{self_us / 1000:>8.1f} ms")
+
+    startup_ms = medians.get("arxivrec.main")
+    if startup_ms is not None and startup_ms > args.budget_ms:
+        print(f"arxivrec.main takes {startup_ms:.0f} ms, over {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Synthetic papers and topics, and the recorded API responses they are served in.
+
+`fixtures/` holds responses recorded from the arXiv API, the Hugging Face
+daily_papers API and an LLM ranking call. The stand-in server replays them with
+the synthetic papers swapped in, so the clients parse exactly what they would
+get in production, at any scale.
+"""
+
+import copy
+import datetime
+import json
+import re
+from functools import cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# (primary category, theme) pairs; a topic follows one theme
+THEMES = [
+    ("cs.CL", "large language models instruction tuning reasoning benchmarks"),
+    ("cs.IR", "retrieval augmented generation dense retrieval vector search"),
+    ("cs.CV", "diffusion models image generation guidance sampling"),
+    ("cs.LG", "graph neural networks message passing molecules"),
+    ("cs.AI", "reinforcement learning from human feedback reward models"),
+    ("eess.AS", "speech recognition self supervised audio representations"),
+    ("cs.LG", "efficient inference quantization pruning distillation"),
+    ("cs.CV", "vision transformers object detection segmentation"),
+    ("cs.RO", "robot manipulation imitation learning policies"),
+    ("cs.CR", "adversarial attacks jailbreaks model security"),
+    ("stat.ML", "bayesian optimization gaussian processes uncertainty"),
+    ("cs.DC", "distributed training pipeline parallelism accelerators"),
+    ("astro-ph.HE", "neutrino observatories cosmic rays high energy sources"),
+    ("astro-ph.CO", "dark matter cosmology large scale structure surveys"),
+    ("hep-ex", "collider experiments particle detectors event reconstruction"),
+    ("quant-ph", "quantum error correction superconducting qubits"),
+    ("cond-mat.mtrl-sci", "materials discovery density functional theory"),
+    ("q-bio.BM", "protein structure prediction folding design"),
+    ("math.OC", "convex optimization stochastic gradient convergence"),
+    ("cs.SE", "code generation program synthesis software agents"),
+    ("cs.HC", "human computer interaction user studies interfaces"),
+    ("econ.EM", "causal inference econometrics treatment effects"),
+    ("physics.flu-dyn", "turbulence simulation fluid dynamics neural operators"),
+    ("cs.NE", "evolutionary algorithms neuroevolution spiking networks"),
+]
+CATEGORIES = sorted({category for category, _ in THEMES})
+ORGS = ["Google DeepMind", "Meta AI", "Microsoft Research", "NVIDIA", "OpenAI"]
+_FILLER = [
+    "We propose a simple method that scales to large datasets.",
+    "Experiments on standard benchmarks show consistent improvements.",
+    "Our analysis reveals when and why the approach fails.",
+    "Code and data are released to support future research.",
+    "The method requires no additional labels or supervision.",
+    "Ablations confirm the contribution of each component.",
+]
+_TITLE_PREFIXES = ["Towards", "Rethinking", "Scaling", "Understanding", "Efficient"]
+_AUTHORS = [f"{first} {last}" for first in "ABCDEFGH" for last in "KLMNPRST"]
+
+
+def paper_id(index: int) -> str:
+    """Unique arXiv-style ID for the `index`-th synthetic paper."""
+    return f"26{index // 100_000 % 100:02d}.{index % 100_000:05d}"
+
+
+def make_papers(
+    num_papers: int,
+    newest: datetime.datetime,
+    span: datetime.timedelta,
+    first_index: int = 0,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    `num_papers` papers in the store's schema, newest first and evenly spread
+    over `span` before `newest`. One in ten has an author from one of `ORGS`.
+    """
+    rng = np.random.default_rng(seed + first_index)
+    themes = rng.integers(len(THEMES), size=num_papers)
+    cross_lists = rng.integers(len(CATEGORIES), size=num_papers)
+    fillers = rng.integers(len(_FILLER), size=(num_papers, 2))
+    orgs = np.where(
+        rng.random(num_papers) < 0.1, rng.integers(len(ORGS), size=num_papers), -1
+    )
+    step = span / max(num_papers, 1)
+
+    ids, titles, authors, abstracts, categories, org_names = [], [], [], [], [], []
+    for i, theme in enumerate(themes.tolist()):
+        category, words = THEMES[theme]
+        index = first_index + i
+        title = f"{_TITLE_PREFIXES[index % 5]} {words.split(' ', 3)[-1]} {index}"
+        abstract = (
+            f"We study {words}. {_FILLER[fillers[i, 0]]} {_FILLER[fillers[i, 1]]}"
+        )
+        ids.append(paper_id(index))
+        titles.append(title)
+        authors.append([_AUTHORS[index % 64], _AUTHORS[(index * 7 + 3) % 64]])
+        abstracts.append(abstract)
+        categories.append(list(dict.fromkeys([category, CATEGORIES[cross_lists[i]]])))
+        org_names.append(ORGS[orgs[i]] if orgs[i] >= 0 else "")
+
+    published = pd.to_datetime(
+        [newest - step * i for i in range(num_papers)], utc=True
+    ).floor("s")
+    df = pd.DataFrame(
+        {
+            "id": ids,
+            "title": titles,
+            "authors": authors,
+            "abstract": abstracts,
+            "published": published,
+            "primary_category": [c[0] for c in categories],
+            "categories": categories,
+            "url": [f"https://arxiv.org/pdf/{i}v1" for i in ids],
+            "org": org_names,
+        }
+    )
+    df["combined_text"] = "Title: " + df["title"] + "; Abstract: " + df["abstract"]
+    return df
+
+
+def make_topics(num_topics: int) -> list[dict]:
+    """
+    `num_topics` topic configs, one per theme in turn. With two or more topics,
+    the first filters on affiliations (so first-page PDFs are parsed) and the
+    last follows Hugging Face Daily Papers.
+    """
+    topics = []
+    for i in range(num_topics):
+        category, words = THEMES[i % len(THEMES)]
+        neighbour = THEMES[(i + 1) % len(THEMES)][0]
+        topics.append(
+            {
+                "id": f"topic_{i:02d}",
+                "description": words,
+                "categories": list(dict.fromkeys([category, neighbour])),
+            }
+        )
+    if num_topics >= 2:
+        topics[0]["org_keywords"] = ["DeepMind", "NVIDIA"]
+        topics[-1] = {
+            "id": topics[-1]["id"],
+            "description": topics[-1]["description"],
+            "source": "huggingface",
+        }
+    return topics
+
+
+@cache
+def _recorded_feed():
+    from lxml import etree
+
+    return etree.parse(str(FIXTURES_DIR / "arxiv_query.atom")).getroot()
+
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ARXIV = "{http://arxiv.org/schemas/atom}"
+_OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+
+def render_atom_page(
+    papers: pd.DataFrame, total: int, start: int, pdf_base: str
+) -> bytes:
+    """
+    The recorded arXiv Atom page with its entries replaced by `papers`, and the
+    paging header set to `total` results starting at `start`.
+    """
+    from lxml import etree
+
+    feed = copy.deepcopy(_recorded_feed())
+    entries = feed.findall(f"{_ATOM}entry")
+    template = entries[0]
+    for entry in entries:
+        feed.remove(entry)
+    feed.find(f"{_OPENSEARCH}totalResults").text = str(total)
+    feed.find(f"{_OPENSEARCH}startIndex").text = str(start)
+    feed.find(f"{_OPENSEARCH}itemsPerPage").text = str(len(papers))
+
+    for paper in papers.itertuples(index=False):
+        entry = copy.deepcopy(template)
+        timestamp = paper.published.strftime("%Y-%m-%dT%H:%M:%SZ")
+        entry.find(f"{_ATOM}id").text = f"http://arxiv.org/abs/{paper.id}v1"
+        entry.find(f"{_ATOM}updated").text = timestamp
+        entry.find(f"{_ATOM}published").text = timestamp
+        entry.find(f"{_ATOM}title").text = paper.title
+        entry.find(f"{_ATOM}summary").text = paper.abstract
+        for author in entry.findall(f"{_ATOM}author"):
+            entry.remove(author)
+        for position, name in enumerate(paper.authors):
+            author = etree.Element(f"{_ATOM}author")
+            etree.SubElement(author, f"{_ATOM}name").text = name
+            entry.insert(4 + position, author)
+        for link in entry.findall(f"{_ATOM}link"):
+            if link.get("title") == "pdf":
+                link.set("href", f"{pdf_base}/{paper.id}v1")
+            else:
+                link.set("href", f"http://arxiv.org/abs/{paper.id}v1")
+        entry.find(f"{_ARXIV}primary_category").set("term", paper.primary_category)
+        for category in entry.findall(f"{_ATOM}category"):
+            entry.remove(category)
+        for term in paper.categories:
+            etree.SubElement(
+                entry,
+                f"{_ATOM}category",
+                term=term,
+                scheme="http://arxiv.org/schemas/atom",
+            )
+        feed.append(entry)
+
+    return etree.tostring(feed, xml_declaration=True, encoding="UTF-8")
+
+
+def render_hf_daily(papers: pd.DataFrame, listing_date: datetime.date) -> bytes:
+    """The recorded daily_papers listing with `papers` in place of its items."""
+    recorded = json.loads((FIXTURES_DIR / "hf_daily_papers.json").read_text())
+    template = recorded[0]
+    items = []
+    for rank, paper in enumerate(papers.itertuples(index=False)):
+        item = copy.deepcopy(template)
+        item["paper"].update(
+            id=paper.id,
+            title=paper.title,
+            summary=paper.abstract,
+            publishedAt=paper.published.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            upvotes=len(papers) - rank,
+            authors=[
+                {"_id": f"{paper.id}-{n}", "name": name, "hidden": False}
+                for n, name in enumerate(paper.authors)
+            ],
+        )
+        if not paper.org:
+            item["paper"].pop("organization", None)
+        else:
+            item["paper"]["organization"] = {"name": paper.org, "fullname": paper.org}
+        item["title"] = paper.title
+        item["publishedAt"] = f"{listing_date.isoformat()}T06:00:00.000Z"
+        items.append(item)
+    return json.dumps(items).encode()
+
+
+def make_pdf(lines: list[str], padding_bytes: int = 0) -> bytes:
+    """
+    A one-page PDF showing `lines`. `padding_bytes` of unreferenced stream data
+    sit between the page and the cross-reference table, like the figures of a
+    real paper, so readers have to seek to the end of a large file.
+    """
+    escaped = [re.sub(r"([\\()])", r"\\\1", line) for line in lines]
+    text = " ".join(f"({line}) '" for line in escaped)
+    content = f"BT /F1 11 Tf 14 TL 72 740 Td {text} ET".encode("latin-1", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Length %d >>\nstream\n%s\nendstream"
+        % (padding_bytes, b"\0" * padding_bytes),
+    ]
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(pdf)
+
+
+def canned_ranking(paper_ids: list[str], k: int = 5) -> str:
+    """The recorded LLM ranking response, naming the first `k` of `paper_ids`."""
+    recorded = json.loads((FIXTURES_DIR / "llm_response.json").read_text())
+    reasonings = [p["reasoning"] for p in recorded["papers"]]
+    return json.dumps(
+        {
+            "papers": [
+                {"id": pid, "reasoning": reasonings[i % len(reasonings)]}
+                for i, pid in enumerate(paper_ids[:k])
+            ]
+        }
+    )
@@ -0,0 +1,385 @@
+"""
+End-to-end offline benchmark of a full digest run.
+
+Each scenario runs `arxivrec.main.run_digest` on the repo's config.yaml, with
+its topics replaced by synthetic ones, against a local stand-in server that
+replays recorded arXiv Atom pages, Hugging Face daily_papers listings and PDFs
+(see fixtures/). The LLM answers with the recorded ranking response, and the
+encoder is a hashing bag-of-words model unless --encoder names a real one.
+
+Scenarios are PAPERSxTOPICS, e.g. 10kx10. The stand-in API returns at most
+10k papers for the day; the rest of a larger corpus is seeded into the paper
+store as 30 days of history. Each scenario runs in its own process, so peak RSS
+is its own, first with empty caches (cold) and then again (warm), like the next
+scheduled run. Prints per-stage latency, docs/sec and peak RSS, and with
+--baseline exits non-zero if any of them regressed by more than --tolerance.
+
+usage: uv run python benchmarks/e2e/run.py --scenarios 100x1 10kx10 1Mx50
+       uv run python benchmarks/e2e/run.py --baseline benchmarks/e2e/baseline.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fixtures import canned_ranking, make_papers, make_topics  # noqa: E402
+
+REPO_CONFIG = Path(__file__).parents[2] / "src" / "config.yaml"
+DEFAULT_SCENARIOS = ["100x1", "10kx10"]
+HASHING_ENCODER = "hashing"
+# Papers the stand-in API lists for the day; larger corpora are stored history
+MAX_FRESH_PAPERS = 10_000
+HISTORY_DAYS = 30
+_SEED_CHUNK = 100_000
+# Differences below these are noise, whatever the relative change
+_MIN_REGRESSION = {"s": 0.05, "MiB": 32.0}
+
+
+def parse_scenario(name: str) -> tuple[int, int]:
+    """'10kx10' -> (10_000 papers, 10 topics)."""
+    match = re.fullmatch(r"(\d+)([kM]?)x(\d+)", name)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Expected PAPERSxTOPICS, got '{name}'")
+    scale = {"": 1, "k": 1_000, "M": 1_000_000}[match[2]]
+    return int(match[1]) * scale, int(match[3])
+
+
+class HashingSentenceTransformer:
+    """
+    Bag-of-words feature hashing with the output size of all-MiniLM-L6-v2, so
+    runs measure the pipeline around the model rather than the model itself.
+    """
+
+    dim = 384
+
+    def __init__(self, *args, **kwargs):
+        self._buckets: dict[str, int] = {}
+
+    def _bucket(self, token: str) -> int:
+        bucket = self._buckets.get(token)
+        if bucket is None:
+            bucket = self._buckets[token] = zlib.crc32(token.encode()) % self.dim
+        return bucket
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split()[:64]:
+                vectors[row, self._bucket(token)] += 1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.maximum(norms, 1e-12)
+        return vectors
+
+
+def _patch_clients(server_url: str, encoder: str) -> None:
+    """Point the arXiv and Hugging Face clients at the stand-in server."""
+    from arxivrec.dataset import fetcher, hf_fetcher
+
+    fetcher.ARXIV_API_URL = f"{server_url}/api/query"
+    # The stand-in server has no rate limit to respect between pages
+    fetcher._ARXIV_DELAY_SECONDS = 0.0
+    hf_fetcher._HF_API = f"{server_url}/api/daily_papers"
+
+    if encoder == HASHING_ENCODER:
+        from arxivrec.engine import encoder as encoder_module
+
+        # Skips importing torch, which is most of a cold run's peak RSS
+        encoder_module._load_model = lambda *args: HashingSentenceTransformer()
+
+
+def _register_stand_ins() -> None:
+    from arxivrec.engine.llm import LLM_REGISTRY, BaseLLM
+    from arxivrec.notify.notification import NOTIFIER_REGISTRY, BaseNotifier
+
+    @LLM_REGISTRY.register("recorded")
+    class RecordedLLM(BaseLLM):
+        """Answers with the recorded ranking, picking the prompt's first papers."""
+
+        def __init__(self, latency_ms: float = 0, **kwargs):
+            super().__init__("recorded", **kwargs)
+            self.latency_s = latency_ms / 1000
+
+        def call(self, prompt):
+            time.sleep(self.latency_s)
+            paper_ids = re.findall(r"'id': '([^']+)'", prompt)
+            answer = canned_ranking(paper_ids)
+            return {
+                "response": answer,
+                "prompt_eval_count": len(prompt) // 4,
+                "eval_count": len(answer) // 4,
+            }
+
+    @NOTIFIER_REGISTRY.register("discard")
+    class DiscardNotifier(BaseNotifier):
+        def notify(self, subject: str, body_html: str, **kwargs):
+            body_html.encode("utf-8")
+
+
+def build_config(spec: dict) -> dict:
+    """The repo's config.yaml with the scenario's topics, sizes and stand-ins."""
+    from arxivrec.utils.config_parse import load_config
+
+    cfg = load_config(str(REPO_CONFIG))
+    cfg["topic"] = make_topics(spec["num_topics"])
+    # The optimized paths are opt-in; the benchmark runs them
+    cfg["pipeline"]["mode"] = "shared"
+    cfg["pipeline"]["shared_arxiv_query"] = True
+    cfg["pipeline"]["max_results"] = spec["num_fresh"]
+    if spec["num_papers"] > spec["num_fresh"]:
+        cfg["pipeline"]["history_days"] = HISTORY_DAYS
+    cfg["cache"]["dir"] = str(Path(spec["workdir"]) / "cache")
+    cfg["cache"]["incremental_fetch"] = True
+    cfg["models"]["ranker"] = {"recorded": {"latency_ms": spec["llm_latency_ms"]}}
+    if spec["encoder"] != HASHING_ENCODER:
+        cfg["models"]["encoder"] = spec["encoder"]
+    cfg["notifiers"] = [{"discard": {}}]
+    cfg.pop("metrics", None)
+    return cfg
+
+
+def seed_history(spec: dict) -> None:
+    """Store the papers beyond the day's fetch as history, in bounded chunks."""
+    from arxivrec.dataset.store import SOURCE_ARXIV, PaperStore
+
+    store = PaperStore(Path(spec["workdir"]) / "cache")
+    num_history = spec["num_papers"] - spec["num_fresh"]
+    now = datetime.datetime.now(datetime.timezone.utc)
+    span = datetime.timedelta(days=HISTORY_DAYS - 2)
+    per_chunk = span * (_SEED_CHUNK / num_history)
+    for first in range(0, num_history, _SEED_CHUNK):
+        df = make_papers(
+            min(_SEED_CHUNK, num_history - first),
+            newest=now - datetime.timedelta(days=1) - per_chunk * (first / _SEED_CHUNK),
+            span=per_chunk,
+            first_index=spec["num_fresh"] + first,
+        )
+        store.upsert(df.drop(columns=["org"]), SOURCE_ARXIV)
+
+
+def run_child(spec: dict) -> dict:
+    """One digest run inside this process; returns its metrics."""
+    os.chdir(spec["workdir"])
+    _patch_clients(spec["server_url"], spec["encoder"])
+    _register_stand_ins()
+
+    from arxivrec.main import run_digest
+    from arxivrec.utils.logger import setup_logging
+    from arxivrec.utils.metrics import METRICS
+
+    if spec["verbose"]:
+        setup_logging()
+    cfg = build_config(spec)
+
+    METRICS.reset()
+    status = 0
+    try:
+        run_digest(cfg)
+    except SystemExit as e:
+        status = e.code
+    report = METRICS.report()
+
+    stages = report["stages"]
+    counters = report["counters"]
+    encode_s = stages.get("encode.model", {}).get("total_s")
+    return {
+        "status": status,
+        "wall_s": report["wall_s"],
+        "peak_rss_mb": report["peak_rss_mb"],
+        "docs_per_s": round(spec["num_papers"] / report["wall_s"], 1),
+        "encode_docs_per_s": (
+            round(counters.get("encode.texts", 0) / encode_s, 1) if encode_s else None
+        ),
+        "stages": {
+            name: {"count": s["count"], "total_s": s["total_s"]}
+            for name, s in stages.items()
+        },
+        "counters": counters,
+    }
+
+
+def _in_subprocess(command: str, spec: dict) -> dict | None:
+    with tempfile.NamedTemporaryFile("r", suffix=".json") as out:
+        subprocess.run(
+            [sys.executable, __file__, f"--{command}", json.dumps(spec), out.name],
+            check=True,
+            # The run prints its registry and topic tables
+            stdout=None if spec["verbose"] else subprocess.DEVNULL,
+        )
+        text = out.read()
+    return json.loads(text) if text else None
+
+
+def run_scenario(name: str, args: argparse.Namespace) -> dict[str, dict]:
+    """Cold and warm runs of one scenario, keyed '<name>/cold', '<name>/warm'."""
+    from server import StandInServer
+
+    num_papers, num_topics = parse_scenario(name)
+    num_fresh = min(num_papers, MAX_FRESH_PAPERS)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="arxivrec-e2e-") as workdir:
+        spec = {
+            "num_papers": num_papers,
+            "num_topics": num_topics,
+            "num_fresh": num_fresh,
+            "workdir": workdir,
+            "encoder": args.encoder,
+            "llm_latency_ms": args.llm_latency_ms,
+            "verbose": args.verbose,
+        }
+        if num_papers > num_fresh:
+            print(f"{name}: seeding {num_papers - num_fresh} papers of history")
+            _in_subprocess("seed", spec)
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        fresh = make_papers(
+            num_fresh,
+            newest=now - datetime.timedelta(minutes=1),
+            span=datetime.timedelta(hours=20),
+        )
+        with StandInServer(fresh) as server:
+            spec["server_url"] = server.url
+            for run in ["cold", "warm"]:
+                before = dict(server.requests)
+                try:
+                    result = _in_subprocess("child", spec)
+                except subprocess.CalledProcessError as e:
+                    # e.g. killed for running out of memory
+                    reason = f"exit status {e.returncode}"
+                    if e.returncode < 0:
+                        reason = f"killed by signal {-e.returncode}"
+                    results[f"{name}/{run}"] = {"failed": reason}
+                    break
+                result["requests"] = {
+                    kind: count - before[kind]
+                    for kind, count in server.requests.items()
+                }
+                results[f"{name}/{run}"] = result
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Measurements that grew by more than `tolerance` over the baseline."""
+    regressions = []
+    for run, result in results.items():
+        base = baseline["runs"].get(run)
+        if base is None or "failed" in base:
+            continue
+        if "failed" in result:
+            regressions.append(f"{run} failed")
+            continue
+        pairs = [("wall", result["wall_s"], base["wall_s"], "s")]
+        pairs.append(("peak RSS", result["peak_rss_mb"], base["peak_rss_mb"], "MiB"))
+        pairs += [
+            (stage, s["total_s"], base["stages"][stage]["total_s"], "s")
+            for stage, s in result["stages"].items()
+            if stage in base["stages"]
+        ]
+        for label, new, old, unit in pairs:
+            if new is None or old is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > _MIN_REGRESSION[unit]:
+                regressions.append(f"{run} {label}: {old} -> {new} {unit}")
+    return regressions
+
+
+def print_results(results: dict, baseline: dict | None) -> None:
+    for run, result in results.items():
+        if "failed" in result:
+            print(f"\n{run}: FAILED, {result['failed']}")
+            continue
+        base = (baseline or {}).get("runs", {}).get(run, {})
+        encode = result["encode_docs_per_s"]
+        print(
+            f"\n{run}: {result['wall_s']:.2f}s wall, {result['docs_per_s']:.0f} docs/s"
+            f", encode {encode or '-'} docs/s, peak RSS {result['peak_rss_mb']} MiB"
+            f", requests {result['requests']}"
+            + (f", exit status {result['status']}" if result["status"] else "")
+        )
+        print(f"  {'stage':<22}{'calls':>7}{'total s':>10}{'baseline':>10}")
+        for stage, s in sorted(result["stages"].items()):
+            old = base.get("stages", {}).get(stage, {}).get("total_s")
+            old_text = f"{old:>10.3f}" if old is not None else f"{'-':>10}"
+            print(f"  {stage:<22}{s['count']:>7}{s['total_s']:>10.3f}{old_text}")
+
+
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "recorded_at": datetime.date.today().isoformat(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", default=DEFAULT_SCENARIOS)
+    parser.add_argument(
+        "--encoder",
+        default=HASHING_ENCODER,
+        help="'hashing' (no model), or a sentence-transformers model name",
+    )
+    parser.add_argument("--llm-latency-ms", type=float, default=0)
+    parser.add_argument("--baseline", type=str, help="JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--save-baseline", type=str, help="Write results here")
+    parser.add_argument("--verbose", action="store_true", help="Show run logs")
+    # Internal: the per-scenario subprocesses
+    parser.add_argument("--seed", nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed_history(json.loads(args.seed[0]))
+        return
+    if args.child:
+        result = run_child(json.loads(args.child[0]))
+        Path(args.child[1]).write_text(json.dumps(result), encoding="utf-8")
+        return
+
+    for name in args.scenarios:
+        parse_scenario(name)
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+
+    results = {}
+    for name in args.scenarios:
+        results.update(run_scenario(name, args))
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(
+            json.dumps({"machine": machine_info(), "runs": results}, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        print(f"\nBaseline recorded on {baseline['machine']}")
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%}")
+    if any("failed" in result for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Local stand-in for the arXiv API, arXiv PDFs and Hugging Face daily_papers.
+
+Serves the papers of a DataFrame from `fixtures.make_papers` through the recorded
+responses, honouring the parts of each API the clients rely on: arXiv's
+`search_query` categories and `submittedDate` range with `start`/`max_results`
+paging, the daily_papers `date` parameter, and HTTP Range requests for PDFs.
+"""
+
+import datetime
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+from fixtures import make_pdf, render_atom_page, render_hf_daily
+
+# Large enough that first-page reads go through the Range path, as for real PDFs
+PDF_PADDING_BYTES = 300 * 1024
+
+
+class StandInServer:
+    def __init__(self, papers: pd.DataFrame, hf_per_day: int = 50):
+        self.papers = papers.sort_values("published", ascending=False, kind="stable")
+        self.papers = self.papers.reset_index(drop=True)
+        self._by_id = dict(zip(self.papers["id"], range(len(self.papers))))
+        self.hf_per_day = hf_per_day
+        self.requests: dict[str, int] = {"api": 0, "pdf": 0, "hf": 0}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StandInServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def query(self, search_query: str) -> pd.DataFrame:
+        """Papers matching an arXiv `search_query` of categories and a date range."""
+        df = self.papers
+        categories = set(re.findall(r"cat:([\w.\-]+)", search_query))
+        if categories:
+            df = df[df["categories"].map(lambda cats: not categories.isdisjoint(cats))]
+        date_range = re.search(r"submittedDate:\[(\d{12}) TO (\d{12})\]", search_query)
+        if date_range:
+            since, until = (
+                pd.Timestamp(datetime.datetime.strptime(v, "%Y%m%d%H%M"), tz="UTC")
+                for v in date_range.groups()
+            )
+            df = df[(df["published"] >= since) & (df["published"] <= until)]
+        return df
+
+    def api_query(self, params: dict) -> bytes:
+        self._count("api")
+        matches = self.query(params.get("search_query", ""))
+        start = int(params.get("start", 0))
+        page = matches.iloc[start : start + int(params.get("max_results", 100))]
+        return render_atom_page(page, len(matches), start, f"{self.url}/pdf")
+
+    def daily_papers(self, params: dict) -> bytes:
+        """Today's listing holds the newest papers; earlier days are empty."""
+        self._count("hf")
+        listing_date = datetime.date.fromisoformat(params["date"])
+        papers = self.papers.head(self.hf_per_day)
+        if listing_date != datetime.date.today():
+            papers = papers.iloc[:0]
+        return render_hf_daily(papers, listing_date)
+
+    def pdf(self, arxiv_id: str) -> bytes | None:
+        self._count("pdf")
+        row = self._by_id.get(re.sub(r"v\d+$", "", arxiv_id))
+        if row is None:
+            return None
+        paper = self.papers.iloc[row]
+        lines = [paper["title"], ", ".join(paper["authors"])]
+        lines.append(paper["org"] or "Independent Researcher")
+        return make_pdf(lines, padding_bytes=PDF_PADDING_BYTES)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str, **headers):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name.replace("_", "-"), value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if url.path == "/api/query":
+                    body = server.api_query(params)
+                    return self._send(200, body, "application/atom+xml")
+                if url.path == "/api/daily_papers":
+                    body = server.daily_papers(params)
+                    return self._send(200, body, "application/json")
+                if url.path.startswith("/pdf/"):
+                    body = server.pdf(url.path.removeprefix("/pdf/"))
+                    if body is not None:
+                        return self._send_range(body)
+                self._send(404, b"not found", "text/plain")
+
+            def _send_range(self, body: bytes):
+                match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers["Range"] or "")
+                if not match:
+                    return self._send(200, body, "application/pdf")
+                first = int(match[1])
+                last = min(int(match[2] or len(body) - 1), len(body) - 1)
+                self._send(
+                    206,
+                    body[first : last + 1],
+                    "application/pdf",
+                    Content_Range=f"bytes {first}-{last}/{len(body)}",
+                    Accept_Ranges="bytes",
+                )
+
+        return Handler
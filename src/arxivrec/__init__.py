@@ -1,6 +0,0 @@
-from dotenv import load_dotenv
-
-from arxivrec.utils.logger import setup_logging
-
-setup_logging()
-load_dotenv()
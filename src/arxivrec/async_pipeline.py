@@ -0,0 +1,149 @@
+import asyncio
+
+import pandas as pd
+from loguru import logger
+
+from arxivrec.notify.notification import BaseNotifier
+from arxivrec.pipeline import LLMPipeline, assign_shortlists
+from arxivrec.utils.metrics import METRICS
+
+
+class AsyncPipelineRunner:
+    """
+    Run one LLMPipeline per topic concurrently on an asyncio event loop.
+
+    Network-bound stages (fetch, LLM ranking) of different topics overlap, each
+    bounded by its own semaphore. Ranking goes through the LLM client's async
+    API, so no thread is held while waiting on the model. The encoder is shared
+    and CPU-bound, so the similarity search stage runs one topic at a time.
+    Pipelines with a `stream_batch_size` fetch and search in one streaming stage,
+    holding both the fetch slot and the encoder. arXiv requests from all topics
+    share the fetcher's process-wide rate limit.
+
+    Between search and ranking, all shortlists go through `assign_shortlists`,
+    so near-duplicates and papers shared by several topics are ranked once.
+    """
+
+    def __init__(
+        self,
+        pipelines: list[LLMPipeline],
+        fetch_concurrency: int = 2,
+        llm_concurrency: int = 2,
+        exclusive_topics: bool = True,
+        dedup_threshold: float | None = 0.95,
+    ):
+        self.pipelines = pipelines
+        self.fetch_concurrency = fetch_concurrency
+        self.llm_concurrency = llm_concurrency
+        self.exclusive_topics = exclusive_topics
+        self.dedup_threshold = dedup_threshold
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}("
+            f"topics={[p.topic.id for p in self.pipelines]}, "
+            f"fetch_concurrency={self.fetch_concurrency}, "
+            f"llm_concurrency={self.llm_concurrency}"
+            f")"
+        )
+
+    async def _shortlist(
+        self,
+        pipeline: LLMPipeline,
+        fetch_sem: asyncio.Semaphore,
+        encode_lock: asyncio.Lock,
+    ) -> pd.DataFrame:
+        topic_id = pipeline.topic.id
+
+        if pipeline.stream_batch_size:
+            async with fetch_sem, encode_lock:
+                logger.info(f"[{topic_id}] Streaming papers into the search")
+                return await asyncio.to_thread(pipeline.stream_search)
+
+        async with fetch_sem:
+            logger.info(f"[{topic_id}] Fetching papers")
+            df = await asyncio.to_thread(pipeline.fetch)
+
+        async with encode_lock:
+            return await asyncio.to_thread(pipeline.search, df)
+
+    async def _rank(
+        self, pipeline: LLMPipeline, shortlist: pd.DataFrame, llm_sem: asyncio.Semaphore
+    ) -> pd.DataFrame:
+        async with llm_sem:
+            logger.info(f"[{pipeline.topic.id}] Ranking {len(shortlist)} candidates")
+            return await pipeline.arank(shortlist)
+
+    def _log_failures(self, pipelines: list[LLMPipeline], outcomes: list) -> None:
+        for pipeline, outcome in zip(pipelines, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.opt(exception=outcome).error(
+                    f"Error running pipeline for topic '{pipeline.topic.id}': {outcome}"
+                )
+
+    async def recommend(self) -> dict[str, pd.DataFrame]:
+        fetch_sem = asyncio.Semaphore(self.fetch_concurrency)
+        encode_lock = asyncio.Lock()
+        llm_sem = asyncio.Semaphore(self.llm_concurrency)
+
+        outcomes = await asyncio.gather(
+            *(self._shortlist(p, fetch_sem, encode_lock) for p in self.pipelines),
+            return_exceptions=True,
+        )
+        self._log_failures(self.pipelines, outcomes)
+        shortlists = {
+            p.topic.id: outcome
+            for p, outcome in zip(self.pipelines, outcomes)
+            if not isinstance(outcome, BaseException)
+        }
+
+        if self.pipelines:
+            shortlists = await asyncio.to_thread(
+                assign_shortlists,
+                [p.topic for p in self.pipelines],
+                shortlists,
+                self.pipelines[0].encoder,
+                exclusive_topics=self.exclusive_topics,
+                dedup_threshold=self.dedup_threshold,
+            )
+
+        ranked = [p for p in self.pipelines if p.topic.id in shortlists]
+        outcomes = await asyncio.gather(
+            *(self._rank(p, shortlists[p.topic.id], llm_sem) for p in ranked),
+            return_exceptions=True,
+        )
+        self._log_failures(ranked, outcomes)
+
+        all_results: dict[str, pd.DataFrame] = {}
+        for pipeline, outcome in zip(ranked, outcomes):
+            if isinstance(outcome, BaseException):
+                continue
+            if outcome is not None and not outcome.empty:
+                all_results[pipeline.topic.id] = outcome
+        return all_results
+
+
+async def notify_all(
+    notifier_list: list[BaseNotifier],
+    subject: str,
+    body_html: str,
+    concurrency: int = 2,
+) -> None:
+    """Send the digest through every notifier concurrently."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _send(notifier: BaseNotifier) -> None:
+        async with sem:
+            try:
+                with METRICS.span(f"notify.{notifier.__class__.__name__}"):
+                    await asyncio.to_thread(
+                        notifier.notify, subject=subject, body_html=body_html
+                    )
+                logger.info(f"{notifier} digest sent successfully!")
+            except Exception as e:
+                logger.warning(
+                    f"{notifier.__class__.__name__} not configured locally"
+                    f" — skipping. ({e})"
+                )
+
+    await asyncio.gather(*(_send(n) for n in notifier_list))
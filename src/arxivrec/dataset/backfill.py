@@ -0,0 +1,203 @@
+import datetime
+import json
+import re
+import time
+from collections.abc import Iterator
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from arxivrec.dataset.fetcher import search_arxiv
+from arxivrec.dataset.store import SOURCE_ARXIV, PaperStore
+from arxivrec.engine.encoder import TextEncoder
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def snapshot_record(item: dict) -> dict:
+    """Convert one line of the arXiv OAI/JSON metadata snapshot to a paper record."""
+    authors = [
+        _clean(f"{first} {last}") for last, first, *_ in item.get("authors_parsed", [])
+    ]
+    categories = item.get("categories", "").split()
+    record = {
+        "id": item["id"],
+        "title": _clean(item["title"]),
+        "authors": authors,
+        "abstract": _clean(item["abstract"]),
+        "published": parsedate_to_datetime(item["versions"][0]["created"]),
+        "primary_category": categories[0] if categories else "",
+        "categories": categories,
+        "url": f"https://arxiv.org/pdf/{item['id']}",
+    }
+    record["combined_text"] = (
+        f"Title: {record['title']}; Abstract: {record['abstract']}"
+    )
+    return record
+
+
+class Backfill:
+    """
+    Ingests a historical date range of arXiv papers into the paper store, either
+    from the API in date slices or from a local OAI/JSON metadata snapshot.
+
+    Progress is checkpointed in the store's cursors after every slice or batch,
+    so an interrupted run resumes where it stopped. With an `encoder` that has an
+    embedding cache, each batch is encoded as it is stored, so memory stays
+    bounded by the batch size and later runs never encode these papers again.
+    """
+
+    def __init__(
+        self,
+        store: PaperStore,
+        encoder: TextEncoder | None = None,
+        batch_size: int = 1000,
+        encode_batch_size: int = 256,
+    ):
+        self.store = store
+        self.encoder = encoder
+        self.batch_size = batch_size
+        self.encode_batch_size = encode_batch_size
+        self.papers = 0
+        self.new_papers = 0
+        self._started = time.perf_counter()
+
+    def stats(self) -> dict:
+        elapsed = time.perf_counter() - self._started
+        return {
+            "papers": self.papers,
+            "new": self.new_papers,
+            "seconds": round(elapsed, 2),
+            "papers_per_sec": round(self.papers / elapsed, 1) if elapsed else 0.0,
+        }
+
+    def _ingest(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        self.new_papers += self.store.upsert(df, SOURCE_ARXIV)
+        if self.encoder is not None:
+            for i in range(0, len(df), self.encode_batch_size):
+                batch = df.iloc[i : i + self.encode_batch_size]
+                self.encoder.encode(
+                    batch["combined_text"].tolist(), ids=batch["id"].tolist()
+                )
+        self.papers += len(df)
+        logger.info(f"Backfill progress: {self.stats()}")
+
+    def _resume(self, key: str, **run: str) -> dict:
+        """Checkpoint for `key`, or an empty one if it was for a different run."""
+        cursor = self.store.get_cursor(key)
+        if any(cursor.get(k) != v for k, v in run.items()):
+            self.store.set_cursor(key, **run, done_until=None, offset=0)
+            return {}
+        return cursor
+
+    def run_api(
+        self,
+        categories: list[str],
+        start: datetime.date,
+        end: datetime.date,
+        slice_days: int = 1,
+        max_per_slice: int = 2000,
+    ) -> dict:
+        """Ingest papers submitted from `start` to `end` (inclusive) via the API."""
+        key = "backfill:api:" + "+".join(sorted(categories))
+        cursor = self._resume(key, start=start.isoformat(), end=end.isoformat())
+        if cursor.get("done_until"):
+            start = datetime.date.fromisoformat(cursor["done_until"])
+            logger.info(f"Resuming API backfill of {categories} from {start}")
+
+        for slice_start, slice_end in _date_slices(start, end, slice_days):
+            since = datetime.datetime.combine(
+                slice_start, datetime.time(), datetime.timezone.utc
+            )
+            until = datetime.datetime.combine(
+                slice_end, datetime.time(), datetime.timezone.utc
+            ) - datetime.timedelta(minutes=1)
+            df = search_arxiv(
+                categories,
+                0,
+                max_per_slice,
+                since=since,
+                until=until,
+                page_size=min(max_per_slice, 1000),
+            )
+            if len(df) >= max_per_slice:
+                logger.warning(
+                    f"Slice {slice_start}..{slice_end} hit {max_per_slice} results "
+                    "and was cut short; use a smaller slice_days"
+                )
+            self._ingest(df)
+            self.store.set_cursor(key, done_until=slice_end.isoformat())
+
+        return self.stats()
+
+    def run_snapshot(
+        self,
+        path: str | Path,
+        categories: list[str] | None,
+        start: datetime.date,
+        end: datetime.date,
+    ) -> dict:
+        """Ingest papers from a local arXiv OAI/JSON snapshot (one JSON per line)."""
+        path = Path(path)
+        key = f"backfill:snapshot:{path.resolve()}"
+        cursor = self._resume(
+            key,
+            start=start.isoformat(),
+            end=end.isoformat(),
+            categories="+".join(sorted(categories or [])),
+        )
+        offset = cursor.get("offset") or 0
+        if offset:
+            logger.info(f"Resuming snapshot backfill of {path} at byte {offset}")
+
+        for df, offset in self._snapshot_batches(path, offset, categories, start, end):
+            self._ingest(df)
+            self.store.set_cursor(key, offset=offset)
+
+        return self.stats()
+
+    def _snapshot_batches(
+        self,
+        path: Path,
+        offset: int,
+        categories: list[str] | None,
+        start: datetime.date,
+        end: datetime.date,
+    ) -> Iterator[tuple[pd.DataFrame, int]]:
+        """Batches of matching records, each with the byte offset after it."""
+        wanted = set(categories or [])
+        records = []
+        with path.open("rb") as f:
+            f.seek(offset)
+            while line := f.readline():
+                item = json.loads(line)
+                if wanted and wanted.isdisjoint(item.get("categories", "").split()):
+                    continue
+                record = snapshot_record(item)
+                if not start <= record["published"].date() <= end:
+                    continue
+                records.append(record)
+                if len(records) >= self.batch_size:
+                    yield pd.DataFrame(records), f.tell()
+                    records = []
+            yield pd.DataFrame(records), f.tell()
+
+    def __repr__(self):
+        return f"Backfill(store={self.store}, encoder={self.encoder})"
+
+
+def _date_slices(
+    start: datetime.date, end: datetime.date, slice_days: int
+) -> Iterator[tuple[datetime.date, datetime.date]]:
+    """Half-open [slice_start, slice_end) windows covering start..end inclusive."""
+    stop = end + datetime.timedelta(days=1)
+    while start < stop:
+        slice_end = min(start + datetime.timedelta(days=slice_days), stop)
+        yield start, slice_end
+        start = slice_end
@@ -1,14 +1,280 @@
 import datetime
 import re
+import threading
+import time
+import xml.etree.ElementTree as ET
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import batched
 
-import arxiv
 import pandas as pd
+import requests
 from loguru import logger
+from urllib3.util.retry import Retry
 
+from arxivrec.dataset.header_cache import HeaderTextCache
+from arxivrec.dataset.store import SOURCE_ARXIV, PaperStore
 from arxivrec.topic import Topic
 from arxivrec.utils.fallback import fallback
+from arxivrec.utils.http_cache import mount_cache
+from arxivrec.utils.metrics import METRICS
+
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+# arXiv's terms of use ask for at most one request every three seconds
+_ARXIV_DELAY_SECONDS = 3.0
+# arXiv sometimes answers with an empty page in the middle of a result set
+_EMPTY_PAGE_RETRIES = 3
+_ATOM_NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "arxiv": "http://arxiv.org/schemas/atom",
+    "opensearch": "http://a9.com/-/spec/opensearch/1.1/",
+}
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+# Shared by every query in the process, so concurrent topics keep arXiv's pace
+_last_request = 0.0
+_rate_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide session for the arXiv API, retrying rate limits and server
+    errors with backoff. Pages of a query already seen (e.g. a rerun) come from
+    the HTTP cache.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            retry = Retry(
+                total=3,
+                backoff_factor=1.0,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+            )
+            mount_cache(_session, max_retries=retry)
+        return _session
+
+
+def _entry_to_record(entry: ET.Element) -> dict:
+    pdf_urls = [
+        link.get("href")
+        for link in entry.iterfind("atom:link", _ATOM_NS)
+        if link.get("title") == "pdf"
+    ]
+    primary = entry.find("arxiv:primary_category", _ATOM_NS)
+    published = entry.findtext("atom:published", "", _ATOM_NS).strip()
+    record = {
+        "id": entry.findtext("atom:id", "", _ATOM_NS).split("/")[-1].split("v")[0],
+        "title": re.sub(r"\s+", " ", entry.findtext("atom:title", "", _ATOM_NS)),
+        "authors": [
+            author.findtext("atom:name", "", _ATOM_NS)
+            for author in entry.iterfind("atom:author", _ATOM_NS)
+        ],
+        "abstract": entry.findtext("atom:summary", "", _ATOM_NS).replace("\n", " "),
+        "published": datetime.datetime.fromisoformat(published).astimezone(
+            datetime.timezone.utc
+        ),
+        "primary_category": primary.get("term", "") if primary is not None else "",
+        "categories": [
+            category.get("term")
+            for category in entry.iterfind("atom:category", _ATOM_NS)
+        ],
+        "url": pdf_urls[0] if pdf_urls else None,
+    }
+    record["combined_text"] = (
+        f"Title: {record['title']}; Abstract: {record['abstract']}"
+    )
+    return record
+
+
+def parse_feed(content: bytes) -> tuple[list[dict], int]:
+    """Paper records of an arXiv API Atom page, and the query's total results."""
+    root = ET.fromstring(content)
+    total = int(root.findtext("opensearch:totalResults", "0", _ATOM_NS))
+    return [_entry_to_record(e) for e in root.iterfind("atom:entry", _ATOM_NS)], total
+
+
+def _wait_for_turn() -> None:
+    """Block until `_ARXIV_DELAY_SECONDS` have passed since any thread's last call."""
+    global _last_request
+    with _rate_lock:
+        time.sleep(max(0.0, _last_request + _ARXIV_DELAY_SECONDS - time.monotonic()))
+        _last_request = time.monotonic()
+
+
+def _request_page(params: dict, refresh: bool = False) -> bytes:
+    # A retried empty page must not be answered from the cache
+    headers = {"Cache-Control": "no-cache"} if refresh else None
+    response = get_session().get(
+        ARXIV_API_URL, params=params, headers=headers, timeout=30
+    )
+    response.raise_for_status()
+    return response.content
+
+
+def _arxiv_pages(query: str, page_size: int) -> Iterator[list[dict]]:
+    """Pages of a query's results, newest first, rate limited process-wide."""
+    start, total = 0, None
+    while total is None or start < total:
+        params = {
+            "search_query": query,
+            "sortBy": "submittedDate",
+            "sortOrder": "descending",
+            "start": start,
+            "max_results": page_size,
+        }
+        for attempt in range(_EMPTY_PAGE_RETRIES + 1):
+            _wait_for_turn()
+            records, total = parse_feed(_request_page(params, refresh=attempt > 0))
+            if records or start >= total:
+                break
+            logger.warning(f"arXiv returned an empty page at {start}/{total}")
+        if not records:
+            return
+        yield records
+        start += len(records)
+
+
+def _as_utc(value: str | datetime.datetime | None) -> datetime.datetime | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    return pd.Timestamp(value).tz_convert("UTC").to_pydatetime()
+
+
+def iter_arxiv(
+    categories: list[str],
+    lookback_days: int,
+    max_results: int,
+    *,
+    since: datetime.datetime | None = None,
+    until: datetime.datetime | None = None,
+    page_size: int = 100,
+) -> Iterator[dict]:
+    """
+    Yields the newest papers in any of `categories` within a time window, one
+    record at a time as the client pages through the results.
+
+    The window starts `lookback_days` ago, or at `since` if given. `until` bounds
+    it server-side with a `submittedDate` range, and paging stops as soon as a
+    result is older than the window.
+    """
+
+    # 1. Build Query (e.g., "cat:cs.LG OR cat:cs.AI")
+    query = " OR ".join([f"cat:{c}" for c in categories])
+    threshold = since or _window_start(lookback_days)
+    if until is not None:
+        date_range = f"[{threshold:%Y%m%d%H%M} TO {until:%Y%m%d%H%M}]"
+        query = f"({query}) AND submittedDate:{date_range}"
+
+    num_yielded = 0
+    for records in _arxiv_pages(query, page_size):
+        for record in records:
+            # ArXiv results are sorted by date, so we can break early
+            if record["published"] < threshold:
+                return
+            yield record
+            num_yielded += 1
+            if num_yielded >= max_results:
+                return
+
+
+def _window_start(lookback_days: int) -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        days=lookback_days
+    )
+
+
+def search_arxiv(
+    categories: list[str],
+    lookback_days: int,
+    max_results: int,
+    **kwargs,
+) -> pd.DataFrame:
+    """Fetches all papers `iter_arxiv` yields into one DataFrame."""
+    results = list(iter_arxiv(categories, lookback_days, max_results, **kwargs))
+
+    threshold = kwargs.get("since") or _window_start(lookback_days)
+    since_time = threshold.strftime("%Y-%m-%d %H:%M")
+    logger.info(f"Fetched {len(results)} new papers since {since_time}")
+
+    return pd.DataFrame(results)
+
+
+def sync_arxiv(
+    store: PaperStore,
+    categories: list[str],
+    lookback_days: int,
+    max_results: int,
+    min_sync_interval: datetime.timedelta = datetime.timedelta(minutes=10),
+) -> pd.DataFrame:
+    """
+    Brings the local store up to date for `categories` and reads the window.
+
+    The cursor records the newest paper's timestamp and the oldest time the
+    store covers. Papers from the cursor's timestamp on are requested, plus the
+    older gap when the window reaches further back than before, so fallback
+    retries with a wider window are mostly answered from the store. Papers at
+    exactly the cursor's timestamp are fetched again and deduplicated by ID in
+    the store, so none sharing it are skipped.
+    """
+    key = "arxiv:" + "+".join(sorted(categories))
+    now = datetime.datetime.now(datetime.timezone.utc)
+    window_start = now - datetime.timedelta(days=lookback_days)
+
+    cursor = store.get_cursor(key)
+    newest = _as_utc(cursor.get("newest_published"))
+    synced_at = _as_utc(cursor.get("synced_at"))
+    # Without a cursor, nothing is covered yet and the whole window is fetched
+    covered_from = _as_utc(cursor.get("covered_from")) or now
+
+    if synced_at is None or now - synced_at >= min_sync_interval:
+        df = search_arxiv(
+            categories,
+            lookback_days,
+            max_results,
+            since=newest,
+        )
+        store.upsert(df, SOURCE_ARXIV)
+        if newest is None:
+            covered_from = window_start
+        if len(df) >= max_results:
+            # Truncated: papers between this page and the old cursor are missing
+            covered_from = _as_utc(df["published"].min())
+        if not df.empty:
+            newest = _as_utc(pd.to_datetime(df["published"], utc=True).max())
+        store.set_cursor(
+            key,
+            newest_published=newest.isoformat() if newest else None,
+            covered_from=covered_from.isoformat(),
+            synced_at=now.isoformat(),
+        )
+
+    if window_start < covered_from:
+        df = search_arxiv(
+            categories,
+            lookback_days,
+            max_results,
+            since=window_start,
+            until=covered_from,
+        )
+        store.upsert(df, SOURCE_ARXIV)
+        reached = window_start
+        if len(df) >= max_results:
+            reached = _as_utc(df["published"].min())
+        store.set_cursor(key, covered_from=reached.isoformat())
+
+    df = store.read(SOURCE_ARXIV, since=window_start, categories=categories)
+    logger.info(f"Read {len(df)} papers in {categories} from {store}")
+    return df.head(max_results)
+
+
+# Wider windows retried, in order, when the configured lookback finds nothing
+_FALLBACK_LOOKBACK_DAYS = [2, 4]
 
 
 class BaseFetcher(ABC):
@@ -16,6 +282,17 @@ class BaseFetcher(ABC):
     def fetch(self, **kwargs) -> pd.DataFrame:
         pass
 
+    def iter_batches(self, batch_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Fetched papers in DataFrames of at most `batch_size` rows. Fetchers that
+        page through an API override this to yield batches as pages arrive.
+        """
+        df = self.fetch()
+        if df is None:
+            return
+        for start in range(0, len(df), batch_size):
+            yield df.iloc[start : start + batch_size]
+
 
 class ArxivFetcher(BaseFetcher):
     def __init__(
@@ -23,25 +300,30 @@ class ArxivFetcher(BaseFetcher):
         topic: Topic,
         lookback_days: int = 1,
         max_results: int = 100,
+        header_cache: HeaderTextCache | None = None,
+        store: PaperStore | None = None,
     ):
         super().__init__()
         self.categories = topic.categories
         self.org_keywords = topic.org_keywords
         self.lookback_days = lookback_days
         self.max_results = max_results
+        # Share one cache across fetchers so topics never parse a PDF twice
+        self.header_cache = header_cache or HeaderTextCache()
+        # With a store, each run only requests papers newer than the last one
+        self.store = store
 
     def _has_org_affiliation(self, paper_id: str, url: str) -> tuple[str, bool]:
         """Extract first-page text and check if any org keyword appears."""
-        from arxivrec.dataset.parser import get_header_text
-
         try:
-            header = get_header_text(url)
+            header = self.header_cache.get(paper_id, url)
             pattern = "|".join(re.escape(k) for k in self.org_keywords)
             return paper_id, bool(re.search(pattern, header, re.IGNORECASE))
         except Exception as e:
             logger.warning(f"Could not parse {paper_id}: {e} — including by default")
             return paper_id, True
 
+    @METRICS.timed("fetch.org_filter")
     def _filter_by_org(self, df: pd.DataFrame) -> pd.DataFrame:
         logger.info(f"Parsing {len(df)} PDFs for org affiliation (10 workers)...")
 
@@ -61,60 +343,55 @@ class ArxivFetcher(BaseFetcher):
         filtered = df[df["id"].isin(keep_ids)]
         logger.info(
             f"Affiliation filter: {len(filtered)}/{len(df)} papers from known orgs"
+            f" ({self.header_cache})"
         )
         return filtered
 
-    @fallback("lookback_days", [2, 4])
+    def _search(self, lookback_days: int) -> pd.DataFrame:
+        if self.store is not None:
+            return sync_arxiv(
+                self.store, self.categories, lookback_days, self.max_results
+            )
+        return search_arxiv(self.categories, lookback_days, self.max_results)
+
+    @METRICS.timed("fetch.arxiv")
+    @fallback("lookback_days", _FALLBACK_LOOKBACK_DAYS)
     def fetch(self, **kwargs):
         """Fetches papers from specific categories within a time window."""
 
         # for fallback purpose only
         _lookback_days = kwargs.get("lookback_days", self.lookback_days)
 
-        # 1. Build Query (e.g., "cat:cs.LG OR cat:cs.AI")
-        query = " OR ".join([f"cat:{c}" for c in self.categories])
-
-        client = arxiv.Client(
-            page_size=100,
-            delay_seconds=3.0,  # Be nice to ArXiv servers
-            num_retries=3,
-        )
-
-        search = arxiv.Search(
-            query=query,
-            max_results=self.max_results,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
-        )
-
-        # 2. Time Window
-        threshold = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
-            days=_lookback_days
-        )
-
-        results = []
-        for result in client.results(search):
-            # ArXiv results are sorted by date, so we can break early
-            if result.published < threshold:
-                break
-
-            tmp = {
-                "id": result.entry_id.split("/")[-1].split("v")[0],
-                "title": result.title,
-                "authors": [a.name for a in result.authors],
-                "abstract": result.summary.replace("\n", " "),
-                "published": result.published,
-                "primary_category": result.primary_category,
-                "url": result.pdf_url,
-            }
-            tmp["combined_text"] = f"Title: {tmp['title']}; Abstract: {tmp['abstract']}"
-            results.append(tmp)
-
-        since_time = threshold.strftime("%Y-%m-%d %H:%M")
-        logger.info(f"Fetched {len(results)} new papers since {since_time}")
-
-        df = pd.DataFrame(results)
+        df = self._search(_lookback_days)
 
         if self.org_keywords and not df.empty:
             df = self._filter_by_org(df)
 
         return df
+
+    def iter_batches(self, batch_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Stream papers in batches while later API pages are still downloading.
+        Each batch goes through the org filter on its own; like `fetch`, wider
+        windows are tried if the configured one yields no papers.
+        """
+        if self.store is not None:
+            yield from super().iter_batches(batch_size)
+            return
+
+        for lookback_days in [self.lookback_days, *_FALLBACK_LOOKBACK_DAYS]:
+            if lookback_days != self.lookback_days:
+                logger.warning(
+                    f"Retrying iter_batches with lookback_days={lookback_days}"
+                )
+
+            num_papers = 0
+            records = iter_arxiv(self.categories, lookback_days, self.max_results)
+            for batch in batched(records, batch_size):
+                df = pd.DataFrame(batch)
+                if self.org_keywords:
+                    df = self._filter_by_org(df)
+                num_papers += len(df)
+                yield df
+            if num_papers:
+                return
@@ -0,0 +1,99 @@
+import re
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from pathlib import Path
+
+from loguru import logger
+
+from arxivrec.utils.metrics import METRICS
+
+
+def _default_extractor(url: str) -> str:
+    from arxivrec.dataset.parser import get_header_text
+
+    return get_header_text(url)
+
+
+class HeaderTextCache:
+    """
+    Per-paper cache of first-page PDF text used by the org-affiliation filter.
+
+    Texts are kept in memory and, with a `cache_dir`, as one file per paper, so
+    later runs and other topics can match any `org_keywords` without network or
+    PDF work. Concurrent requests for the same paper share a single download.
+    Failed extractions are not cached.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        extractor: Callable[[str], str] = _default_extractor,
+    ):
+        self.path = Path(cache_dir) / "headers" if cache_dir else None
+        self.extractor = extractor
+        self.hits = 0
+        self.misses = 0
+
+        self._texts: dict[str, str] = {}
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _file_for(self, paper_id: str) -> Path | None:
+        if self.path is None:
+            return None
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", paper_id)
+        # New-style IDs shard by yymm, e.g. headers/2408/2408.09869.txt
+        return self.path / safe_id[:4] / f"{safe_id}.txt"
+
+    def _load_or_extract(self, paper_id: str, url: str) -> str:
+        file_path = self._file_for(paper_id)
+        if file_path is not None and file_path.exists():
+            text = file_path.read_text(encoding="utf-8")
+            with self._lock:
+                self.hits += 1
+            return text
+
+        with self._lock:
+            self.misses += 1
+        with METRICS.span("fetch.pdf_header"):
+            text = self.extractor(url)
+        if file_path is not None:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(text, encoding="utf-8")
+        return text
+
+    def get(self, paper_id: str, url: str) -> str:
+        with self._lock:
+            if paper_id in self._texts:
+                self.hits += 1
+                return self._texts[paper_id]
+
+            future = self._in_flight.get(paper_id)
+            is_owner = future is None
+            if future is None:
+                future = Future()
+                self._in_flight[paper_id] = future
+
+        if not is_owner:
+            logger.debug(f"Waiting for in-flight header extraction of {paper_id}")
+            return future.result()
+
+        try:
+            text = self._load_or_extract(paper_id, url)
+        except Exception as e:
+            with self._lock:
+                self._in_flight.pop(paper_id, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._texts[paper_id] = text
+            self._in_flight.pop(paper_id, None)
+        future.set_result(text)
+        return text
+
+    def __repr__(self):
+        return (
+            f"HeaderTextCache(path={self.path}, hits={self.hits}, misses={self.misses})"
+        )
@@ -1,75 +1,178 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
 
 import pandas as pd
 import requests
 from loguru import logger
+from urllib3.util.retry import Retry
 
 from arxivrec.dataset.fetcher import BaseFetcher
+from arxivrec.dataset.store import SOURCE_HF_DAILY, PaperStore
 from arxivrec.topic import Topic
+from arxivrec.utils.http_cache import mount_cache
+from arxivrec.utils.metrics import METRICS
 
 _HF_API = "https://huggingface.co/api/daily_papers"
+# Listing dates remembered in the cursor; older ones are simply refetched
+_MAX_CURSOR_DAYS = 60
+# Days of a lookback window requested at once
+_MAX_PARALLEL_DAYS = 8
+# A listing keeps collecting upvotes for a while after its day; only listings at
+# least this many days old when fetched are stored as final
+_SETTLE_DAYS = 2
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide session so listing requests reuse pooled connections. Rate
+    limits and server errors are retried with exponential backoff, and
+    unchanged listings are served from the HTTP cache when one is configured.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+            )
+            mount_cache(_session, pool_maxsize=_MAX_PARALLEL_DAYS, max_retries=retry)
+        return _session
+
+
+def _listing_to_frame(items: list[dict], listing_date: date) -> pd.DataFrame:
+    """One day's listing as a DataFrame, built column by column."""
+    papers = [item["paper"] for item in items]
+    return pd.DataFrame(
+        {
+            "id": [p["id"] for p in papers],
+            "title": [p["title"] for p in papers],
+            "authors": [
+                [a["name"] for a in p.get("authors", []) if not a.get("hidden")]
+                for p in papers
+            ],
+            "abstract": [p.get("summary", "").replace("\n", " ") for p in papers],
+            "published": [p.get("publishedAt", "") for p in papers],
+            "primary_category": "",
+            "url": [f"https://arxiv.org/pdf/{p['id']}" for p in papers],
+            "upvotes": [p.get("upvotes", 0) for p in papers],
+            "org": [(p.get("organization") or {}).get("fullname", "") for p in papers],
+            "date": listing_date.isoformat(),
+        }
+    )
 
 
 class HFDailyPapersFetcher(BaseFetcher):
-    def __init__(self, topic: Topic, min_upvotes: int = 0, lookback_days: int = 3):
+    """
+    Papers listed on Hugging Face Daily Papers over the last `lookback_days`.
+
+    All days of the window are requested concurrently over a pooled session,
+    and a paper listed on several days is kept once, from its latest listing.
+    Unlike a walk back to the first non-empty day, this also combines a weekend
+    with the Friday before it.
+    """
+
+    def __init__(
+        self,
+        topic: Topic,
+        min_upvotes: int = 0,
+        lookback_days: int = 3,
+        store: PaperStore | None = None,
+    ):
         self.topic = topic
         self.min_upvotes = min_upvotes
         self.lookback_days = lookback_days
+        # Settled listings are final, so with a store each is requested once
+        self.store = store
 
     def _fetch_for_date(self, d: date) -> list[dict]:
-        response = requests.get(_HF_API, params={"date": d.isoformat()}, timeout=15)
+        response = get_session().get(
+            _HF_API, params={"date": d.isoformat()}, timeout=15
+        )
         response.raise_for_status()
         return response.json()
 
+    def _listings(self, days: list[date]) -> list[pd.DataFrame]:
+        """
+        Listings of `days`, in order. Settled days already in the store are read
+        from it; the others are requested in parallel and stored. A day whose
+        request fails is logged and left out, unless every request failed.
+        """
+        settled = date.today() - timedelta(days=_SETTLE_DAYS)
+        stored_days = set()
+        if self.store is not None:
+            stored_days = set(self.store.get_cursor(SOURCE_HF_DAILY).get("days", []))
+        # Recent listings still grow and collect upvotes, so always refetch them
+        to_request = [
+            d for d in days if d > settled or d.isoformat() not in stored_days
+        ]
+
+        fetched: dict[date, list[dict]] = {}
+        errors: list[Exception] = []
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(len(to_request), _MAX_PARALLEL_DAYS))
+        ) as executor:
+            futures = {executor.submit(self._fetch_for_date, d): d for d in to_request}
+            for future in as_completed(futures):
+                d = futures[future]
+                try:
+                    fetched[d] = future.result()
+                except Exception as e:
+                    logger.warning(
+                        f"HF Daily Papers: skipping {d}, request failed: {e}"
+                    )
+                    errors.append(e)
+        if errors and not fetched:
+            raise errors[0]
+
+        frames = []
+        for d in days:
+            if d in to_request and d not in fetched:
+                continue
+            if d not in fetched:
+                frames.append(self.store.read(SOURCE_HF_DAILY, dates=[d.isoformat()]))
+                continue
+            df = _listing_to_frame(fetched[d], d)
+            if self.store is not None:
+                self.store.upsert(df, SOURCE_HF_DAILY)
+            frames.append(df)
+
+        if self.store is not None:
+            final = {d.isoformat() for d in fetched if d <= settled}
+            if final - stored_days:
+                days_seen = sorted(stored_days | final)
+                self.store.set_cursor(
+                    SOURCE_HF_DAILY, days=days_seen[-_MAX_CURSOR_DAYS:]
+                )
+        return frames
+
+    @METRICS.timed("fetch.hf_daily")
     def fetch(self, **kwargs) -> pd.DataFrame:
-        # Walk back until we find a day with papers (handles weekends/gaps)
-        raw: list[dict] = []
-        for days_ago in range(self.lookback_days):
-            d = date.today() - timedelta(days=days_ago)
-            raw = self._fetch_for_date(d)
-            if raw:
-                logger.info(f"HF Daily Papers: found {len(raw)} papers for {d}")
-                break
-        else:
+        days = [date.today() - timedelta(days=n) for n in range(self.lookback_days)]
+        frames = [df for df in self._listings(days) if not df.empty]
+        if not frames:
             logger.warning(
                 f"HF Daily Papers: no papers found in last {self.lookback_days} days"
             )
             return pd.DataFrame()
 
-        results = []
-        for item in raw:
-            paper = item["paper"]
-            upvotes = paper.get("upvotes", 0)
+        # Newest listing first, so its upvotes win for papers listed again
+        df = pd.concat(frames, ignore_index=True).drop_duplicates(subset="id")
+        df["published"] = pd.to_datetime(df["published"], utc=True, errors="coerce")
+        logger.info(
+            f"HF Daily Papers: found {len(df)} papers on {len(frames)} of the last "
+            f"{self.lookback_days} days"
+        )
 
-            if upvotes < self.min_upvotes:
-                continue
-
-            arxiv_id = paper["id"]
-            authors = [
-                a["name"] for a in paper.get("authors", []) if not a.get("hidden")
-            ]
-            org_info = paper.get("organization") or {}
-            org = org_info.get("fullname", "")
-
-            results.append(
-                {
-                    "id": arxiv_id,
-                    "title": paper["title"],
-                    "authors": authors,
-                    "abstract": paper.get("summary", "").replace("\n", " "),
-                    "published": paper.get("publishedAt", ""),
-                    "primary_category": "",
-                    "url": f"https://arxiv.org/pdf/{arxiv_id}",
-                    "upvotes": upvotes,
-                    "org": org,
-                }
-            )
-
-        df = pd.DataFrame(results)
-        if not df.empty:
-            df["combined_text"] = df.apply(
-                lambda r: f"Title: {r['title']}; Abstract: {r['abstract']}", axis=1
-            )
+        df = df[df["upvotes"] >= self.min_upvotes].reset_index(drop=True)
+        df = df.drop(columns=["date", "categories"], errors="ignore")
+        df["combined_text"] = "Title: " + df["title"] + "; Abstract: " + df["abstract"]
 
         suffix = f" (min_upvotes≥{self.min_upvotes})" if self.min_upvotes else ""
         logger.info(f"Fetched {len(df)} papers from HF Daily Papers{suffix}")
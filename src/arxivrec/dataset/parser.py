@@ -1,19 +1,195 @@
 import io
+import threading
 
 import pdfplumber
 import requests
+from loguru import logger
 
+from arxivrec.utils.http_cache import mount_cache
 
-def get_header_text(url: str) -> str:
-    """Extract first-page text from an ArXiv PDF for affiliation matching."""
-    response = requests.get(url, timeout=15)
-    response.raise_for_status()
-    with pdfplumber.open(io.BytesIO(response.content)) as pdf:
+# The first request asks for this many bytes. Small PDFs arrive whole; for larger
+# ones it usually covers the page 1 objects, and the rest is fetched on demand.
+DEFAULT_HEADER_BYTES = 256 * 1024
+_BLOCK_SIZE = 64 * 1024
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide session so PDF downloads reuse pooled connections, and byte
+    ranges fetched before are served from the HTTP cache when one is configured.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            mount_cache(_session, pool_connections=4, pool_maxsize=16)
+        return _session
+
+
+class _RangeReader(io.RawIOBase):
+    """
+    Seekable, read-only view of a remote file that downloads fixed-size blocks
+    with HTTP Range requests the first time they are read.
+
+    pdfminer only touches the trailer, the cross-reference table and the objects
+    it dereferences, so extracting page 1 reads a fraction of a large PDF.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        session: requests.Session,
+        size: int,
+        prefix: bytes = b"",
+        block_size: int = _BLOCK_SIZE,
+    ):
+        super().__init__()
+        self.url = url
+        self.session = session
+        self.size = size
+        self.block_size = block_size
+        self.bytes_fetched = len(prefix)
+        self._pos = 0
+        self._blocks: dict[int, bytes] = {}
+
+        full_blocks = len(prefix) // block_size
+        for i in range(full_blocks):
+            self._blocks[i] = prefix[i * block_size : (i + 1) * block_size]
+        if len(prefix) == size and len(prefix) % block_size:
+            self._blocks[full_blocks] = prefix[full_blocks * block_size :]
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self.size + offset
+        self._pos = max(0, min(self._pos, self.size))
+        return self._pos
+
+    def _fetch_blocks(self, first: int, last: int) -> None:
+        """Download blocks first..last (inclusive) in one request."""
+        start = first * self.block_size
+        end = min((last + 1) * self.block_size, self.size) - 1
+        response = self.session.get(
+            self.url, headers={"Range": f"bytes={start}-{end}"}, timeout=15
+        )
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise OSError(f"Server ignored Range request for {self.url}")
+
+        data = response.content
+        self.bytes_fetched += len(data)
+        for i in range(first, last + 1):
+            offset = (i - first) * self.block_size
+            self._blocks[i] = data[offset : offset + self.block_size]
+
+    def _ensure(self, start: int, end: int) -> None:
+        first, last = start // self.block_size, (end - 1) // self.block_size
+        missing = [i for i in range(first, last + 1) if i not in self._blocks]
+        while missing:
+            # Coalesce runs of consecutive missing blocks into one request
+            run_end = 0
+            while run_end + 1 < len(missing) and missing[run_end + 1] == (
+                missing[run_end] + 1
+            ):
+                run_end += 1
+            self._fetch_blocks(missing[0], missing[run_end])
+            missing = missing[run_end + 1 :]
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size - self._pos
+        end = min(self._pos + size, self.size)
+        if end <= self._pos:
+            return b""
+
+        self._ensure(self._pos, end)
+        parts = []
+        pos = self._pos
+        while pos < end:
+            block, offset = divmod(pos, self.block_size)
+            chunk = self._blocks[block][offset : offset + end - pos]
+            parts.append(chunk)
+            pos += len(chunk)
+        self._pos = end
+        return b"".join(parts)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _first_page_text(fp) -> str:
+    with pdfplumber.open(fp) as pdf:
         if not pdf.pages:
             return ""
         return pdf.pages[0].extract_text() or ""
 
 
+def _download_full(url: str, session: requests.Session) -> bytes:
+    response = session.get(url, timeout=15)
+    response.raise_for_status()
+    return response.content
+
+
+def get_header_text(
+    url: str,
+    max_bytes: int = DEFAULT_HEADER_BYTES,
+    session: requests.Session | None = None,
+) -> str:
+    """
+    Extract first-page text from an ArXiv PDF for affiliation matching.
+
+    The first `max_bytes` are requested with an HTTP Range header, and any other
+    part of the file pdfminer needs for page 1 is fetched block by block. Every
+    range is an ordinary bounded request, so the HTTP cache stores it. If the
+    server ignores Range requests, or parsing the sparse file fails, the whole
+    PDF is downloaded and parsed instead.
+    """
+    session = session or get_session()
+
+    response = session.get(
+        url, headers={"Range": f"bytes=0-{max_bytes - 1}"}, timeout=15
+    )
+    response.raise_for_status()
+    content_range = response.headers.get("Content-Range", "")
+    prefix = response.content
+    if response.status_code != 206 or not content_range.partition("/")[2].isdigit():
+        # Server sent the whole file; use it
+        return _first_page_text(io.BytesIO(prefix))
+
+    total = int(content_range.rpartition("/")[2])
+    if len(prefix) >= total:
+        return _first_page_text(io.BytesIO(prefix))
+
+    reader = _RangeReader(url, session, size=total, prefix=prefix)
+    try:
+        text = _first_page_text(io.BufferedReader(reader, buffer_size=8192))
+        logger.debug(
+            f"Parsed page 1 of {url} from {reader.bytes_fetched}/{total} bytes"
+        )
+        return text
+    except Exception as e:
+        logger.debug(f"Partial parse of {url} failed ({e}), downloading in full")
+
+    return _first_page_text(io.BytesIO(_download_full(url, session)))
+
+
 if __name__ == "__main__":
     text = get_header_text("https://arxiv.org/pdf/2408.09869.pdf")
     print(text[:500])
@@ -0,0 +1,148 @@
+import datetime
+import threading
+from collections.abc import Iterator
+
+import pandas as pd
+from loguru import logger
+
+from arxivrec.dataset.fetcher import (
+    ArxivFetcher,
+    BaseFetcher,
+    search_arxiv,
+    sync_arxiv,
+)
+from arxivrec.dataset.header_cache import HeaderTextCache
+from arxivrec.dataset.store import SOURCE_ARXIV, PaperStore
+from arxivrec.topic import Topic
+
+
+class ArxivQueryPlanner:
+    """
+    Run-level planner that fetches the union of all arXiv topics' categories
+    with a single paged query, and serves each topic a filtered view in memory.
+
+    Windows are fetched once and memoized; a smaller lookback window (e.g. after
+    a fallback retry) is answered from a larger one that was not cut short by
+    `max_results`. With a `store`, the shared query is synced incrementally.
+
+    The shared query asks for `max_results_per_topic` papers per topic. When a
+    busy category fills it, a topic left with fewer papers than it asked for
+    sends a follow-up query for the older part of the window.
+    """
+
+    def __init__(
+        self, max_results_per_topic: int = 100, store: PaperStore | None = None
+    ):
+        self.max_results_per_topic = max_results_per_topic
+        self.store = store
+        self.categories: list[str] = []
+        self.num_topics = 0
+        self._windows: dict[int, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def fetcher_for(
+        self,
+        topic: Topic,
+        lookback_days: int = 1,
+        max_results: int = 100,
+        header_cache: HeaderTextCache | None = None,
+    ) -> "PlannedArxivFetcher":
+        """Register a topic's categories and return its fetcher."""
+        for category in topic.categories:
+            if category not in self.categories:
+                self.categories.append(category)
+        self.num_topics += 1
+        return PlannedArxivFetcher(
+            planner=self,
+            topic=topic,
+            lookback_days=lookback_days,
+            max_results=max_results,
+            header_cache=header_cache,
+        )
+
+    @property
+    def max_results(self) -> int:
+        return self.max_results_per_topic * max(self.num_topics, 1)
+
+    def _complete_window(self, lookback_days: int) -> pd.DataFrame | None:
+        for days, df in sorted(self._windows.items()):
+            if days >= lookback_days and len(df) < self.max_results:
+                threshold = datetime.datetime.now(
+                    datetime.timezone.utc
+                ) - datetime.timedelta(days=lookback_days)
+                if df.empty:
+                    return df
+                return df[df["published"] >= threshold]
+        return None
+
+    def is_truncated(self, lookback_days: int) -> bool:
+        """Whether the window's query stopped at `max_results` before its start."""
+        df = self._windows.get(lookback_days)
+        return df is not None and len(df) >= self.max_results
+
+    def fetch_window(self, lookback_days: int) -> pd.DataFrame:
+        """All papers in the union of categories within the time window."""
+        with self._lock:
+            if lookback_days in self._windows:
+                return self._windows[lookback_days]
+
+            df = self._complete_window(lookback_days)
+            if df is None:
+                logger.info(
+                    f"Planned arXiv query for {self.num_topics} topics over "
+                    f"{self.categories} (lookback_days={lookback_days})"
+                )
+                if self.store is not None:
+                    df = sync_arxiv(
+                        self.store, self.categories, lookback_days, self.max_results
+                    )
+                else:
+                    df = search_arxiv(self.categories, lookback_days, self.max_results)
+            self._windows[lookback_days] = df
+            return df
+
+
+class PlannedArxivFetcher(ArxivFetcher):
+    """ArxivFetcher that reads its categories from the planner's shared query."""
+
+    def __init__(self, planner: ArxivQueryPlanner, topic: Topic, **kwargs):
+        super().__init__(topic=topic, **kwargs)
+        self.planner = planner
+
+    def _search(self, lookback_days: int) -> pd.DataFrame:
+        df = self.planner.fetch_window(lookback_days)
+        if df.empty:
+            return df
+
+        wanted = set(self.categories)
+        in_topic = df["categories"].map(lambda cats: not wanted.isdisjoint(cats))
+        view = df[in_topic].head(self.max_results).reset_index(drop=True)
+        logger.info(
+            f"Selected {len(view)} papers in {self.categories} from shared query"
+        )
+
+        # The shared query reserves `max_results_per_topic` papers for each topic
+        wanted_count = min(self.max_results, self.planner.max_results_per_topic)
+        if len(view) < wanted_count and self.planner.is_truncated(lookback_days):
+            # Papers older than the shared query's last one were never requested
+            oldest = pd.to_datetime(df["published"], utc=True).min().to_pydatetime()
+            logger.warning(
+                f"Shared query was cut at {self.planner.max_results} papers; "
+                f"fetching {self.categories} before {oldest:%Y-%m-%d %H:%M} "
+                "separately"
+            )
+            older = search_arxiv(
+                self.categories,
+                lookback_days,
+                wanted_count - len(view),
+                until=oldest,
+            )
+            if self.planner.store is not None:
+                self.planner.store.upsert(older, SOURCE_ARXIV)
+            view = pd.concat([view, older], ignore_index=True)
+            view = view.drop_duplicates(subset="id").head(self.max_results)
+        return view
+
+    def iter_batches(self, batch_size: int) -> Iterator[pd.DataFrame]:
+        # The shared window is fetched in one go; just chunk this topic's view
+        return BaseFetcher.iter_batches(self, batch_size)
@@ -0,0 +1,218 @@
+import datetime
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+SOURCE_ARXIV = "arxiv"
+SOURCE_HF_DAILY = "hf_daily"
+
+# Columns the recommendation pipeline needs; reading only these skips the rest
+PIPELINE_COLUMNS = [
+    "id",
+    "title",
+    "authors",
+    "abstract",
+    "published",
+    "url",
+    "combined_text",
+]
+
+_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("title", pa.string()),
+        ("authors", pa.list_(pa.string())),
+        ("abstract", pa.string()),
+        ("published", pa.timestamp("us", tz="UTC")),
+        ("primary_category", pa.string()),
+        ("categories", pa.list_(pa.string())),
+        ("url", pa.string()),
+        ("combined_text", pa.string()),
+        ("date", pa.string()),
+    ]
+)
+_LIST_COLUMNS = [f.name for f in _SCHEMA if pa.types.is_list(f.type)]
+_PART_FILE = "papers.parquet"
+
+
+def _to_table(df: pd.DataFrame) -> pa.Table:
+    """Arrow table with the store's types for known columns, inferred for others."""
+    arrays, fields = [], []
+    for name in df.columns:
+        known = _SCHEMA.field(name) if name in _SCHEMA.names else None
+        array = pa.Array.from_pandas(df[name], type=known.type if known else None)
+        arrays.append(array)
+        fields.append(known or pa.field(name, array.type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def _from_table(table: pa.Table) -> pd.DataFrame:
+    df = table.to_pandas()
+    for column in _LIST_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].map(lambda v: [] if v is None else list(v))
+    return df
+
+
+class PaperStore:
+    """
+    Local columnar store of paper metadata and per-source fetch cursors.
+
+    Papers are kept as Parquet files partitioned by date and primary category,
+    e.g. `papers/arxiv/date=2024-08-19/category=cs.LG/papers.parquet`, so reads
+    only open the date partitions and columns they need. The `date` is the UTC
+    submission date for arXiv papers and the listing date for Hugging Face Daily
+    Papers. Cross-listed papers live under their primary category and are
+    matched on the `categories` column.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root) / "papers"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._cursor_path = self.root / "cursors.json"
+        self._lock = threading.RLock()
+
+    def _partition_dir(self, source: str, date: str, category: str) -> Path:
+        safe_category = re.sub(r"[^A-Za-z0-9_.-]", "_", category or "_")
+        return self.root / source / f"date={date}" / f"category={safe_category}"
+
+    def dates(self, source: str) -> list[str]:
+        """Dates with stored papers, oldest first."""
+        source_dir = self.root / source
+        if not source_dir.exists():
+            return []
+        return sorted(
+            p.name.removeprefix("date=")
+            for p in source_dir.glob("date=*")
+            if p.is_dir()
+        )
+
+    def _files(
+        self,
+        source: str,
+        since: datetime.datetime | None = None,
+        dates: list[str] | None = None,
+    ) -> list[Path]:
+        selected = self.dates(source)
+        if since is not None:
+            first = since.astimezone(datetime.timezone.utc).strftime("%Y-%m-%d")
+            selected = [d for d in selected if d >= first]
+        if dates is not None:
+            selected = [d for d in selected if d in set(dates)]
+        return [
+            f
+            for d in selected
+            for f in sorted((self.root / source / f"date={d}").glob(f"*/{_PART_FILE}"))
+        ]
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        df["published"] = pd.to_datetime(df["published"], utc=True, errors="coerce")
+        if "date" not in df.columns:
+            df["date"] = df["published"].dt.strftime("%Y-%m-%d")
+        if "primary_category" not in df.columns:
+            df["primary_category"] = ""
+        for column in _LIST_COLUMNS:
+            if column not in df.columns:
+                df[column] = [[] for _ in range(len(df))]
+        return df.drop_duplicates(subset="id", keep="last")
+
+    def upsert(self, df: pd.DataFrame, source: str) -> int:
+        """Insert papers, replacing stored rows with the same ID. Returns new count."""
+        if df is None or df.empty:
+            return 0
+
+        incoming = self._normalize(df)
+        num_new = 0
+        with self._lock:
+            # Only the partitions being written are read, so bulk ingests stay
+            # proportional to the batch rather than the whole store
+            for (date, category), part in incoming.groupby(
+                ["date", "primary_category"], sort=False
+            ):
+                path = self._partition_dir(source, date, category) / _PART_FILE
+                if not path.exists():
+                    num_new += len(part)
+                else:
+                    existing = _from_table(pq.read_table(path))
+                    num_new += int((~part["id"].isin(existing["id"])).sum())
+                    part = pd.concat([existing, part], ignore_index=True)
+                    part = part.drop_duplicates(subset="id", keep="last")
+
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".parquet.tmp")
+                pq.write_table(_to_table(part.reset_index(drop=True)), tmp_path)
+                os.replace(tmp_path, path)
+
+        logger.info(f"Paper store: {num_new} new / {len(df)} upserted into {source}")
+        return num_new
+
+    def read(
+        self,
+        source: str,
+        since: datetime.datetime | None = None,
+        dates: list[str] | None = None,
+        categories: list[str] | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Stored papers, newest first.
+
+        Only partitions from `since` onwards (or in `dates`) are opened, and only
+        `columns` plus those needed for filtering are read from each file.
+        """
+        needed = None
+        if columns is not None:
+            needed = list(columns)
+            for extra in ["published", "categories" if categories else None]:
+                if extra and extra not in needed:
+                    needed.append(extra)
+
+        frames = []
+        with self._lock:
+            for path in self._files(source, since, dates):
+                names = pq.read_schema(path).names
+                to_read = names if needed is None else [c for c in needed if c in names]
+                frames.append(_from_table(pq.read_table(path, columns=to_read)))
+        if not frames:
+            return pd.DataFrame(columns=columns)
+
+        df = pd.concat(frames, ignore_index=True)
+        if since is not None:
+            df = df[df["published"] >= since]
+        if categories:
+            wanted = set(categories)
+            df = df[df["categories"].map(lambda cats: not wanted.isdisjoint(cats))]
+
+        df = df.sort_values("published", ascending=False, kind="stable")
+        # A Daily Papers entry can be listed on more than one day; keep the latest
+        df = df.drop_duplicates(subset="id").reset_index(drop=True)
+        return df if columns is None else df.reindex(columns=columns)
+
+    def get_cursor(self, key: str) -> dict:
+        with self._lock:
+            if not self._cursor_path.exists():
+                return {}
+            cursors = json.loads(self._cursor_path.read_text(encoding="utf-8"))
+            return cursors.get(key, {})
+
+    def set_cursor(self, key: str, **fields) -> None:
+        with self._lock:
+            cursors = {}
+            if self._cursor_path.exists():
+                cursors = json.loads(self._cursor_path.read_text(encoding="utf-8"))
+            cursors.setdefault(key, {}).update(fields)
+            tmp_path = self._cursor_path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(cursors, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self._cursor_path)
+
+    def __repr__(self):
+        return f"PaperStore(root={self.root})"
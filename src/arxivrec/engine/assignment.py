@@ -0,0 +1,99 @@
+import numpy as np
+from loguru import logger
+
+from arxivrec.engine.similarity import l2_normalize, top_k_scores
+
+
+def near_duplicate_of(
+    embeddings: np.ndarray, threshold: float, block_size: int = 1024
+) -> np.ndarray:
+    """
+    Map each row to the earliest kept row it is a near-duplicate of (cosine
+    similarity >= `threshold`), or to itself if it has none, e.g. for cross-listed
+    reposts of the same paper under different IDs.
+
+    Similarities are computed in blocks of `block_size` rows against the earlier
+    rows only, so memory stays at block_size x N.
+    """
+    vecs = l2_normalize(embeddings)
+    num_rows = len(vecs)
+    representative = np.arange(num_rows)
+
+    for start in range(0, num_rows, block_size):
+        block = vecs[start : start + block_size]
+        end = start + len(block)
+        similar = block @ vecs[:end].T >= threshold
+        # Keep only pairs where the other row comes first
+        similar[:, start:] &= np.tri(len(block), k=-1, dtype=bool)
+
+        for offset in np.flatnonzero(similar.any(axis=1)):
+            earlier = np.flatnonzero(similar[offset])
+            kept = earlier[representative[earlier] == earlier]
+            if kept.size:
+                representative[start + offset] = kept[0]
+
+    return representative
+
+
+def assign_to_topics(sims: np.ndarray, allowed: np.ndarray) -> np.ndarray:
+    """
+    Index of the best-matching topic for each paper of a [topics, papers]
+    similarity matrix, among the topics `allowed` to see it, or -1 for none.
+    """
+    best = np.where(allowed, sims, -np.inf).argmax(axis=0)
+    best[~allowed.any(axis=0)] = -1
+    return best
+
+
+def restrict_candidates(
+    sims: np.ndarray,
+    allowed: np.ndarray,
+    embeddings: np.ndarray,
+    exclusive_topics: bool = True,
+    dedup_threshold: float | None = 0.95,
+    pool_size: int | None = None,
+) -> np.ndarray:
+    """
+    Narrow a [topics, papers] mask of the papers each topic may rank: drop
+    near-duplicates (cosine similarity >= `dedup_threshold`) in favour of one
+    kept copy and, with `exclusive_topics`, keep each paper only for its
+    best-matching topic. Near-duplicate search is quadratic, so it only runs
+    over each topic's best `pool_size` papers when that is given.
+    """
+    allowed = allowed.copy()
+    num_topics = len(sims)
+
+    if dedup_threshold is not None:
+        candidates = allowed
+        if exclusive_topics:
+            best = assign_to_topics(sims, allowed)
+            candidates = allowed & (np.arange(num_topics)[:, None] == best)
+        if pool_size is None:
+            pool = np.flatnonzero(candidates.any(axis=0))
+        else:
+            pool_indices, pool_sims = top_k_scores(
+                np.where(candidates, sims, -np.inf), k=pool_size
+            )
+            pool = np.unique(pool_indices[np.isfinite(pool_sims)])
+
+        representative = pool[near_duplicate_of(embeddings[pool], dedup_threshold)]
+        is_duplicate = representative != pool
+        duplicates = pool[is_duplicate]
+        # A kept paper is a candidate for every topic that had a copy
+        for row in allowed:
+            np.logical_or.at(row, representative[is_duplicate], row[duplicates])
+        allowed[:, duplicates] = False
+        logger.info(
+            f"Collapsed {len(duplicates)} near-duplicates among "
+            f"{len(pool)} top candidates"
+        )
+
+    if exclusive_topics:
+        best = assign_to_topics(sims, allowed)
+        shared = allowed.sum(axis=0) > 1
+        allowed &= np.arange(num_topics)[:, None] == best
+        logger.info(
+            f"Assigned {int(shared.sum())} papers shared by several topics "
+            "to their best-matching topic"
+        )
+    return allowed
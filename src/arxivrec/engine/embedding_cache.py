@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+
+class EmbeddingCache:
+    """
+    Content-addressed on-disk store of embeddings for a single encoder model.
+
+    Vectors are appended to a raw float32 matrix (``vectors.f32``) that is read
+    back through ``np.memmap``, and their ``"<paper_id>:<text_hash>"`` keys are
+    appended to ``keys.txt``, one line per matrix row, so a write never rewrites
+    what is already stored. A paper whose title or abstract changes gets a new
+    key, so stale vectors are never served. ``meta.json`` records the model and
+    dimension; a cache written by another model is cleared, not appended to.
+    """
+
+    def __init__(self, cache_dir: str | Path, model_name: str):
+        self.model_name = model_name
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+        self.path = Path(cache_dir) / "embeddings" / slug
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._vectors_path = self.path / "vectors.f32"
+        self._keys_path = self.path / "keys.txt"
+        self._meta_path = self.path / "meta.json"
+        self._lock = threading.Lock()
+        self._matrix: np.memmap | None = None
+
+        self.dim: int | None = None
+        self._rows: dict[str, int] = {}
+        self._load()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def make_key(paper_id: str, text: str) -> str:
+        return f"{paper_id}:{EmbeddingCache.text_hash(text)}"
+
+    def _clear(self) -> None:
+        """Remove every file of the cache, including ones of older layouts."""
+        for path in self.path.iterdir():
+            if path.is_file():
+                path.unlink()
+
+    def _load(self) -> None:
+        if not self._meta_path.exists():
+            self._clear()
+            return
+
+        meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+        if meta.get("model_name") != self.model_name:
+            logger.warning(
+                f"Embedding cache at {self.path} belongs to "
+                f"'{meta.get('model_name')}', clearing it"
+            )
+            self._clear()
+            return
+        self.dim = meta["dim"]
+
+        keys, torn = [], False
+        if self._keys_path.exists():
+            text = self._keys_path.read_text(encoding="utf-8")
+            keys = text.splitlines()
+            torn = bool(text) and not text.endswith("\n")
+            if torn:
+                keys.pop()
+        row_bytes = 4 * self.dim
+        vector_bytes = (
+            self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        )
+
+        # A run that stopped mid-write leaves a torn line or one file longer
+        num_rows = min(len(keys), vector_bytes // row_bytes)
+        if vector_bytes > num_rows * row_bytes:
+            os.truncate(self._vectors_path, num_rows * row_bytes)
+        if torn or len(keys) > num_rows:
+            keys = keys[:num_rows]
+            self._keys_path.write_text(
+                "".join(f"{key}\n" for key in keys), encoding="utf-8"
+            )
+        self._rows = {key: row for row, key in enumerate(keys)}
+
+    def _get_matrix(self) -> np.memmap | None:
+        if self._matrix is None and self.dim and self._vectors_path.exists():
+            num_rows = self._vectors_path.stat().st_size // (4 * self.dim)
+            if num_rows:
+                self._matrix = np.memmap(
+                    self._vectors_path,
+                    dtype=np.float32,
+                    mode="r",
+                    shape=(num_rows, self.dim),
+                )
+        return self._matrix
+
+    def get_many(self, keys: list[str]) -> list[np.ndarray | None]:
+        """Return the cached vector for each key, or None on a miss."""
+        with self._lock:
+            matrix = self._get_matrix()
+            if matrix is None:
+                return [None] * len(keys)
+
+            results: list[np.ndarray | None] = []
+            for key in keys:
+                row = self._rows.get(key)
+                if row is None or row >= len(matrix):
+                    results.append(None)
+                else:
+                    results.append(np.array(matrix[row]))
+            return results
+
+    def put_many(self, keys: list[str], vectors: np.ndarray) -> None:
+        """Append vectors to the matrix file and record their rows."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(keys) != len(vectors):
+            raise ValueError(f"Got {len(keys)} keys for {len(vectors)} vectors")
+        if not keys:
+            return
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Vector dim {vectors.shape[1]} does not match cache dim {self.dim}"
+                )
+
+            if not self._meta_path.exists():
+                meta = {"model_name": self.model_name, "dim": self.dim}
+                self._meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+            start = (
+                self._vectors_path.stat().st_size // (4 * self.dim)
+                if self._vectors_path.exists()
+                else 0
+            )
+            # Vectors first: on restart, rows without a key are dropped
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._keys_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{key}\n" for key in keys))
+
+            for offset, key in enumerate(keys):
+                self._rows[key] = start + offset
+            self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __repr__(self):
+        return f"EmbeddingCache(path={self.path}, entries={len(self)})"
@@ -1,27 +1,272 @@
+import atexit
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from loguru import logger
+
+from arxivrec.engine.embedding_cache import EmbeddingCache
+from arxivrec.engine.similarity import l2_normalize, top_k
+from arxivrec.utils.env import load_env
+from arxivrec.utils.metrics import METRICS
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+ENCODER_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+# Dynamic int8 kernels for x86 CPUs with AVX2, e.g. GitHub-hosted runners
+_ONNX_QUANTIZATION = "avx2"
+
+
+def _load_model(
+    model_name: str, backend: str, export_dir: Path | None
+) -> "SentenceTransformer":
+    """
+    Load `model_name` for the given backend. ONNX exports are written to
+    `export_dir` once and loaded from there on later runs.
+    """
+    # torch and sentence-transformers take seconds to import
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend == "torch-int8":
+        # Linear layers hold nearly all the compute; quantizing them is quick
+        model = SentenceTransformer(model_name, device="cpu")
+        return torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    try:
+        import onnxruntime  # noqa: F401
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+    except ImportError as e:
+        raise ImportError(
+            f"The '{backend}' encoder backend needs ONNX Runtime: "
+            "pip install 'arxivrec[onnx]'"
+        ) from e
+
+    if export_dir is None:
+        export_dir = Path(tempfile.mkdtemp(prefix="arxivrec-onnx-"))
+    if not (export_dir / "modules.json").exists():
+        logger.info(f"Exporting {model_name} to ONNX in {export_dir}")
+        onnx_model = SentenceTransformer(model_name, backend="onnx")
+        onnx_model.save_pretrained(str(export_dir))
+    if backend == "onnx":
+        return SentenceTransformer(str(export_dir), backend="onnx")
+
+    file_name = f"onnx/model_qint8_{_ONNX_QUANTIZATION}.onnx"
+    if not (export_dir / file_name).exists():
+        logger.info(f"Quantizing the ONNX export of {model_name} to int8")
+        export_dynamic_quantized_onnx_model(
+            SentenceTransformer(str(export_dir), backend="onnx"),
+            _ONNX_QUANTIZATION,
+            str(export_dir),
+        )
+    return SentenceTransformer(
+        str(export_dir), backend="onnx", model_kwargs={"file_name": file_name}
+    )
+
+
+def top_k_overlap(
+    candidate: "TextEncoder",
+    reference: "TextEncoder",
+    queries: list[str],
+    docs: list[str],
+    k: int = 15,
+) -> float:
+    """
+    Mean fraction of the reference encoder's top-k documents per query that the
+    candidate encoder also ranks in its top-k.
+    """
+    overlaps = []
+    for encoder in (candidate, reference):
+        indices, _ = encoder.get_top_k_similar_batch(
+            encoder.encode(queries), encoder.encode(docs), k=k
+        )
+        overlaps.append(indices)
+    found, expected = overlaps
+    return float(
+        np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, expected)])
+    )
+
+
+def check_parity(
+    candidate: "TextEncoder",
+    reference: "TextEncoder",
+    queries: list[str],
+    docs: list[str],
+    k: int = 15,
+    threshold: float = 0.9,
+) -> float:
+    """Raise if `candidate` keeps less than `threshold` of the reference top-k."""
+    overlap = top_k_overlap(candidate, reference, queries, docs, k=k)
+    if overlap < threshold:
+        raise ValueError(
+            f"{candidate} keeps {overlap:.1%} of {reference}'s top-{k}, "
+            f"below the {threshold:.0%} threshold"
+        )
+    logger.info(f"{candidate} keeps {overlap:.1%} of {reference}'s top-{k}")
+    return overlap
+
+
+@contextmanager
+def _thread_env(num_threads: int):
+    """Thread-count env vars read by torch in freshly spawned worker processes."""
+    names = ["OMP_NUM_THREADS", "MKL_NUM_THREADS"]
+    saved = {name: os.environ.get(name) for name in names}
+    os.environ.update({name: str(num_threads) for name in names})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
 
 
 class TextEncoder:
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    """
+    Sentence-transformers bi-encoder with an optional on-disk embedding cache.
+
+    With `num_workers > 1`, large inputs are sharded across a pool of CPU
+    worker processes (started on first use, results returned in input order),
+    each running `torch_threads` threads; by default the cores are split evenly.
+
+    `backend` selects the inference engine: "torch" (fp32), "torch-int8"
+    (dynamically quantized Linear layers), "onnx" or "onnx-int8" (ONNX Runtime,
+    exported once under `cache_dir/models`). Check a faster backend against
+    fp32 with `check_parity`.
+
+    The model is loaded on first use, so runs served from the embedding cache
+    never import torch.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        cache_dir: str | Path | None = None,
+        normalize: bool = True,
+        batch_size: int = 32,
+        num_workers: int = 1,
+        torch_threads: int | None = None,
+        backend: str = "torch",
+    ):
+        if backend not in ENCODER_BACKENDS:
+            raise ValueError(f"Unknown encoder backend '{backend}': {ENCODER_BACKENDS}")
+        if num_workers > 1 and backend != "torch":
+            raise ValueError("num_workers > 1 needs the 'torch' encoder backend")
+        # HF_TOKEN for gated models must be set before huggingface_hub is imported
+        load_env()
         self.model_name = model_name
-        self.model = SentenceTransformer(model_name)
+        self.backend = backend
+        # Vectors differ slightly between backends, so cache them separately
+        self.model_id = model_name if backend == "torch" else f"{model_name}@{backend}"
+        self.normalize = normalize
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.torch_threads = torch_threads
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+        self.export_dir = Path(cache_dir) / "models" / slug if cache_dir else None
+        self.cache = EmbeddingCache(cache_dir, self.model_id) if cache_dir else None
+        self._model = None
+        self._pool = None
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        if self._model is None:
+            if self.torch_threads and self.num_workers <= 1:
+                import torch
 
-    def encode(self, texts: str | list[str]) -> np.ndarray:
+                torch.set_num_threads(self.torch_threads)
+            self._model = _load_model(self.model_name, self.backend, self.export_dir)
+        return self._model
+
+    @METRICS.timed("encode")
+    def encode(
+        self, texts: str | list[str], ids: list[str] | None = None
+    ) -> np.ndarray:
+        """
+        Encode texts into float32 embeddings, L2-normalized unless disabled.
+        When `ids` are given and a cache is configured, only texts missing from
+        the cache are run through the model.
+        """
         if isinstance(texts, str):
             texts = [texts]
-        return self.model.encode(texts)
+        if self.cache is None or ids is None:
+            return self._encode_texts(texts)
+        if len(ids) != len(texts):
+            raise ValueError(f"Got {len(ids)} ids for {len(texts)} texts")
+
+        keys = [EmbeddingCache.make_key(i, t) for i, t in zip(ids, texts)]
+        vectors = self.cache.get_many(keys)
+        misses = [i for i, vec in enumerate(vectors) if vec is None]
+
+        if misses:
+            new_vectors = self._encode_texts([texts[i] for i in misses])
+            self.cache.put_many([keys[i] for i in misses], new_vectors)
+            for i, vec in zip(misses, new_vectors):
+                vectors[i] = vec
+
+        logger.info(
+            f"Embedding cache: {len(texts) - len(misses)}/{len(texts)} hits, "
+            f"encoded {len(misses)} new texts"
+        )
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+    @METRICS.timed("encode.model")
+    def _encode_texts(self, texts: list[str]) -> np.ndarray:
+        METRICS.add("encode.texts", len(texts))
+        kwargs = {}
+        # Below a batch per worker, process start-up and IPC cost more than they save
+        if self.num_workers > 1 and len(texts) >= self.batch_size * self.num_workers:
+            kwargs["pool"] = self._get_pool()
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=self.normalize,
+            **kwargs,
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _get_pool(self):
+        if self._pool is None:
+            threads = self.torch_threads or max(
+                1, (os.cpu_count() or 1) // self.num_workers
+            )
+            logger.info(
+                f"Starting {self.num_workers} encoder processes "
+                f"with {threads} torch threads each"
+            )
+            with _thread_env(threads):
+                self._pool = self.model.start_multi_process_pool(
+                    ["cpu"] * self.num_workers
+                )
+            atexit.register(self.close)
+        return self._pool
+
+    def close(self) -> None:
+        """Stop the worker processes, if any were started."""
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
 
     def cosine_sim(self, vec1: np.ndarray, vec2: np.ndarray) -> np.ndarray:
         """
         Compute cosine similarity between two matrices.
         vec1 dim: (d1, D), vec2 dim: (d2, D) → returns (d1, d2)
+        Vectors from `encode` are already unit-norm unless `normalize` is off, so
+        then this is a plain dot product.
         """
-        norms1 = np.linalg.norm(vec1, axis=1, keepdims=True)
-        norms2 = np.linalg.norm(vec2, axis=1, keepdims=True)
-        norms1 = np.where(norms1 == 0, 1, norms1)
-        norms2 = np.where(norms2 == 0, 1, norms2)
-        return vec1 @ vec2.T / (norms1 * norms2.T)
+        if self.normalize:
+            return np.atleast_2d(vec1) @ np.atleast_2d(vec2).T
+        return l2_normalize(vec1) @ l2_normalize(vec2).T
 
     def get_top_k_similar(
         self,
@@ -32,9 +277,24 @@ class TextEncoder:
         """
         Get top-k most similar content vectors to the query vector.
         """
-        sims = self.cosine_sim(query_vec, content_vecs)[0]
-        top_k_indices = list(np.argsort(-sims)[:k])
-        return top_k_indices
+        indices, _ = self.get_top_k_similar_batch(query_vec, content_vecs, k=k)
+        return indices[0].tolist()
+
+    def get_top_k_similar_batch(
+        self,
+        query_vecs: np.ndarray,  # [Q, D]
+        content_vecs: np.ndarray,  # [N, D]
+        k: int = 10,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get per-query top-k indices and cosine scores, both [Q, min(k, N)].
+        """
+        return top_k(query_vecs, content_vecs, k=k, normalized=self.normalize)
 
     def __repr__(self):
-        return f"TextEncoder(model_name={self.model_name})"
+        options = ""
+        if self.backend != "torch":
+            options += f", backend={self.backend}"
+        if self.num_workers > 1:
+            options += f", num_workers={self.num_workers}"
+        return f"TextEncoder(model_name={self.model_name}{options})"
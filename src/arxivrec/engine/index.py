@@ -0,0 +1,342 @@
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from arxivrec.engine.similarity import l2_normalize, top_k_scores
+from arxivrec.utils.registry import Registry
+
+INDEX_REGISTRY = Registry("VectorIndex")
+
+
+class VectorIndex(ABC):
+    """
+    Persistent cosine-similarity index over paper embeddings, addressed by paper ID.
+
+    Vectors are L2-normalized on insert. Papers already in the index are skipped
+    by `add`, so callers can add a whole fetched batch and only pay for new ones.
+    Each vector may carry a hash of the text it encodes; a paper whose title or
+    abstract changed is added again, and its old vector is no longer searched.
+    Superseded vectors are dropped when the index is saved.
+    """
+
+    backend: str = ""
+
+    def __init__(self, path: str | Path | None = None, **kwargs):
+        self.path = Path(path) if path else None
+        self.params = kwargs
+        self.ids: list[str] = []
+        self.hashes: list[str | None] = []
+        # Latest position of each ID; superseded positions are never returned
+        self._positions: dict[str, int] = {}
+        # Whether anything changed since the index was opened or last saved
+        self._dirty = False
+
+    @abstractmethod
+    def _add_vectors(self, vectors: np.ndarray) -> None:
+        """Append normalized vectors; their positions follow `self.ids`."""
+        pass
+
+    @abstractmethod
+    def _search(
+        self, query_vecs: np.ndarray, k: int, allowed: np.ndarray | None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return [Q, k] positions and scores; missing slots are -1 / -inf."""
+        pass
+
+    @abstractmethod
+    def _keep_vectors(self, positions: np.ndarray) -> None:
+        """Keep only the vectors at `positions`, renumbered from 0 in that order."""
+        pass
+
+    @abstractmethod
+    def _save_vectors(self, path: Path) -> None:
+        pass
+
+    @abstractmethod
+    def _load_vectors(self, path: Path) -> None:
+        pass
+
+    def is_current(self, paper_id: str, text_hash: str | None = None) -> bool:
+        """Whether `paper_id` is indexed, and for the text with `text_hash` if given."""
+        position = self._positions.get(paper_id)
+        if position is None:
+            return False
+        return text_hash is None or self.hashes[position] == text_hash
+
+    def add(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        text_hashes: list[str] | None = None,
+    ) -> int:
+        """
+        Add vectors for ids not yet indexed, or indexed for a different text
+        hash. Returns the number added.
+        """
+        hashes = text_hashes if text_hashes is not None else [None] * len(ids)
+        new_rows = [
+            row
+            for row, (i, h) in enumerate(zip(ids, hashes))
+            if not self.is_current(i, h)
+        ]
+        new_rows = list({ids[row]: row for row in new_rows}.values())
+        if not new_rows:
+            return 0
+
+        self._add_vectors(l2_normalize(np.asarray(vectors)[new_rows]))
+        for row in new_rows:
+            self._positions[ids[row]] = len(self.ids)
+            self.ids.append(ids[row])
+            self.hashes.append(hashes[row])
+        self._dirty = True
+        return len(new_rows)
+
+    def compact(self) -> int:
+        """Drop vectors superseded by a revised text. Returns the number dropped."""
+        num_stale = len(self.ids) - len(self._positions)
+        if not num_stale:
+            return 0
+
+        live = np.array(sorted(self._positions.values()), dtype=np.int64)
+        self._keep_vectors(live)
+        self.ids = [self.ids[p] for p in live]
+        self.hashes = [self.hashes[p] for p in live]
+        self._positions = {i: pos for pos, i in enumerate(self.ids)}
+        self._dirty = True
+        return num_stale
+
+    def search(
+        self,
+        query_vecs: np.ndarray,
+        k: int = 10,
+        allowed_ids: set[str] | None = None,
+    ) -> tuple[list[list[str]], list[list[float]]]:
+        """
+        Per-query top-k paper IDs and cosine scores, optionally restricted to
+        `allowed_ids`. Lists may be shorter than k if fewer papers qualify.
+        """
+        query_vecs = l2_normalize(query_vecs)
+        allowed = None
+        if allowed_ids is not None:
+            allowed = np.array(
+                sorted(self._positions[i] for i in allowed_ids if i in self._positions),
+                dtype=np.int64,
+            )
+            k = min(k, len(allowed))
+        elif len(self._positions) < len(self.ids):
+            # Skip vectors superseded by a revised text
+            allowed = np.array(sorted(self._positions.values()), dtype=np.int64)
+        k = min(k, len(self))
+        if k <= 0:
+            return [[] for _ in query_vecs], [[] for _ in query_vecs]
+
+        positions, scores = self._search(query_vecs, k, allowed)
+
+        result_ids, result_scores = [], []
+        for row_positions, row_scores in zip(positions, scores):
+            valid = row_positions >= 0
+            result_ids.append([self.ids[p] for p in row_positions[valid]])
+            result_scores.append(row_scores[valid].tolist())
+        return result_ids, result_scores
+
+    def save(self, path: str | Path | None = None) -> None:
+        path = Path(path) if path else self.path
+        if path is None:
+            raise ValueError("No path given to save the index to")
+        if not self._dirty and path == self.path and (path / "meta.json").exists():
+            return
+        num_stale = self.compact()
+        if num_stale:
+            logger.info(f"Dropped {num_stale} superseded vectors from the index")
+        path.mkdir(parents=True, exist_ok=True)
+
+        self._save_vectors(path)
+        (path / "ids.json").write_text(json.dumps(self.ids), encoding="utf-8")
+        (path / "hashes.json").write_text(json.dumps(self.hashes), encoding="utf-8")
+        meta = {"backend": self.backend, "params": self.params}
+        (path / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        self._dirty = False
+        logger.info(f"Saved {self} to {path}")
+
+    @classmethod
+    def open(cls, path: str | Path, backend: str = "numpy", **kwargs) -> "VectorIndex":
+        """Load the index saved at `path`, or create an empty `backend` index."""
+        path = Path(path)
+        meta_path = path / "meta.json"
+        if not meta_path.exists():
+            return INDEX_REGISTRY[backend](path=path, **kwargs)
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta["backend"] != backend:
+            logger.warning(
+                f"Index at {path} uses backend '{meta['backend']}', not '{backend}'"
+            )
+        index = INDEX_REGISTRY[meta["backend"]](path=path, **meta["params"])
+        index.ids = json.loads((path / "ids.json").read_text(encoding="utf-8"))
+        hashes_path = path / "hashes.json"
+        # Indexes saved before text hashes were kept re-add each paper once
+        index.hashes = (
+            json.loads(hashes_path.read_text(encoding="utf-8"))
+            if hashes_path.exists()
+            else [None] * len(index.ids)
+        )
+        index._positions = {i: pos for pos, i in enumerate(index.ids)}
+        index._load_vectors(path)
+        return index
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(size={len(self)}, params={self.params})"
+
+
+@INDEX_REGISTRY.register("numpy")
+class NumpyIndex(VectorIndex):
+    """Exact brute-force search over an in-memory (or memory-mapped) matrix."""
+
+    backend = "numpy"
+
+    def __init__(self, path: str | Path | None = None, **kwargs):
+        super().__init__(path, **kwargs)
+        self.vectors: np.ndarray | None = None
+
+    def _add_vectors(self, vectors: np.ndarray) -> None:
+        if self.vectors is None:
+            self.vectors = vectors
+        else:
+            self.vectors = np.vstack([self.vectors, vectors])
+
+    def _search(
+        self, query_vecs: np.ndarray, k: int, allowed: np.ndarray | None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        assert self.vectors is not None
+        if allowed is None:
+            return top_k_scores(query_vecs @ self.vectors.T, k)
+
+        positions, scores = top_k_scores(query_vecs @ self.vectors[allowed].T, k)
+        return allowed[positions], scores
+
+    def _keep_vectors(self, positions: np.ndarray) -> None:
+        assert self.vectors is not None
+        self.vectors = np.asarray(self.vectors)[positions]
+
+    def _save_vectors(self, path: Path) -> None:
+        if self.vectors is not None:
+            np.save(path / "vectors.npy", self.vectors)
+
+    def _load_vectors(self, path: Path) -> None:
+        vectors_path = path / "vectors.npy"
+        if vectors_path.exists():
+            self.vectors = np.load(vectors_path, mmap_mode="r")
+
+
+@INDEX_REGISTRY.register("hnsw")
+class HNSWIndex(VectorIndex):
+    """
+    Approximate search with an HNSW graph (requires `hnswlib`).
+
+    `ef_search` trades recall for latency at query time; `m` and
+    `ef_construction` control graph quality at build time.
+    """
+
+    backend = "hnsw"
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        **kwargs,
+    ):
+        super().__init__(
+            path, m=m, ef_construction=ef_construction, ef_search=ef_search, **kwargs
+        )
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError(
+                "The 'hnsw' index backend needs hnswlib: pip install 'arxivrec[ann]'"
+            ) from e
+
+        self._hnswlib = hnswlib
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.graph = None
+
+    def _init_graph(self, dim: int, capacity: int):
+        self.params["dim"] = dim
+        graph = self._hnswlib.Index(space="ip", dim=dim)
+        graph.init_index(
+            max_elements=capacity, M=self.m, ef_construction=self.ef_construction
+        )
+        return graph
+
+    def _add_vectors(self, vectors: np.ndarray) -> None:
+        needed = len(self.ids) + len(vectors)
+        if self.graph is None:
+            self.graph = self._init_graph(vectors.shape[1], max(needed, 1024))
+        elif needed > self.graph.get_max_elements():
+            self.graph.resize_index(max(needed, 2 * self.graph.get_max_elements()))
+
+        labels = np.arange(len(self.ids), needed)
+        self.graph.add_items(vectors, labels)
+
+    def _search(
+        self, query_vecs: np.ndarray, k: int, allowed: np.ndarray | None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        assert self.graph is not None
+        self.graph.set_ef(max(self.ef_search, k))
+
+        label_filter = None
+        if allowed is not None:
+            allowed_set = set(allowed.tolist())
+
+            def label_filter(label: int) -> bool:
+                return label in allowed_set
+
+        try:
+            labels, distances = self.graph.knn_query(
+                query_vecs, k=k, filter=label_filter
+            )
+        except RuntimeError:
+            # The graph walk can come back with fewer than k filtered hits
+            logger.warning("HNSW returned fewer than k results, falling back to exact")
+            return self._exact_search(query_vecs, k, allowed)
+        # "ip" space reports 1 - dot product as distance
+        return labels.astype(np.int64), 1.0 - distances
+
+    def _exact_search(
+        self, query_vecs: np.ndarray, k: int, allowed: np.ndarray | None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        assert self.graph is not None
+        positions = allowed if allowed is not None else np.arange(len(self.ids))
+        vectors = np.asarray(self.graph.get_items(positions), dtype=np.float32)
+        top_positions, scores = top_k_scores(query_vecs @ vectors.T, k)
+        return positions[top_positions], scores
+
+    def _keep_vectors(self, positions: np.ndarray) -> None:
+        # hnswlib cannot drop items, so the graph is rebuilt from the kept ones
+        assert self.graph is not None
+        vectors = np.asarray(self.graph.get_items(positions), dtype=np.float32)
+        self.graph = self._init_graph(vectors.shape[1], max(len(vectors), 1024))
+        if len(vectors):
+            self.graph.add_items(vectors, np.arange(len(vectors)))
+
+    def _save_vectors(self, path: Path) -> None:
+        if self.graph is not None:
+            self.graph.save_index(str(path / "hnsw.bin"))
+
+    def _load_vectors(self, path: Path) -> None:
+        graph_path = path / "hnsw.bin"
+        if graph_path.exists():
+            self.graph = self._hnswlib.Index(space="ip", dim=self.params["dim"])
+            self.graph.load_index(str(graph_path))
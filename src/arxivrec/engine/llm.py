@@ -1,17 +1,31 @@
+import asyncio
 import os
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
 
-import ollama
-
+from arxivrec.utils.env import load_env
 from arxivrec.utils.registry import Registry
 
+if TYPE_CHECKING:
+    import ollama
+
 LLM_REGISTRY = Registry("LLM")
 
 
 class BaseLLM(ABC):
-    def __init__(self, model_name: str, options: dict | None = None, **kwargs):
+    def __init__(
+        self,
+        model_name: str,
+        options: dict | None = None,
+        max_concurrency: int = 4,
+        **kwargs,
+    ):
+        load_env()
         self.model_name: str = model_name
         self.options: dict | None = options
+        self.max_concurrency = max_concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
 
     @abstractmethod
     def call(self, prompt):
@@ -20,6 +34,44 @@ class BaseLLM(ABC):
         """
         pass
 
+    async def _acall(self, prompt):
+        """
+        Backend-specific async call. Defaults to running `call` in a thread.
+        """
+        return await asyncio.to_thread(self.call, prompt)
+
+    def store(self, response: dict) -> None:
+        """
+        Called by the ranker once `response` parsed as a valid ranking. Caching
+        wrappers keep it then; plain clients have nothing to do.
+        """
+        pass
+
+    def discard(self, response: dict) -> None:
+        """Called by the ranker when `response` could not be parsed."""
+        pass
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop they were first used on
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def acall(self, prompt):
+        """
+        Async version of `call`, limited to `max_concurrency` in-flight requests.
+        """
+        async with self._get_semaphore():
+            return await self._acall(prompt)
+
+    async def call_many(self, prompts: list[str]) -> list:
+        """
+        Run several prompts concurrently; responses come back in prompt order.
+        """
+        return list(await asyncio.gather(*(self.acall(p) for p in prompts)))
+
 
 @LLM_REGISTRY.register("ollama")
 class OLlamaLLM(BaseLLM):
@@ -27,10 +79,22 @@ class OLlamaLLM(BaseLLM):
         self,
         model_name: str = "llama3.2:3b",
         options: dict | None = None,
+        host: str | None = None,
+        max_concurrency: int = 4,
     ):
-        super().__init__(model_name, options)
+        super().__init__(model_name, options, max_concurrency=max_concurrency)
+        self.host = host
 
-    def call(self, prompt):
+        # Imported here so that loading the LLM registry stays cheap
+        import ollama
+
+        self._ollama = ollama
+        # Without a host, the ollama module's default client is reused
+        self._client = ollama.Client(host=host) if host else None
+        self._async_client: "ollama.AsyncClient | None" = None
+        self._async_client_loop: asyncio.AbstractEventLoop | None = None
+
+    def _generate_kwargs(self, prompt: str) -> dict:
         options = dict(self.options) if self.options else {"temperature": 0}
         think = options.pop("think", None)
 
@@ -42,10 +106,25 @@ class OLlamaLLM(BaseLLM):
         }
         if think is not None:
             kwargs["think"] = think
+        return kwargs
 
-        response = ollama.generate(**kwargs)
+    def _get_async_client(self) -> "ollama.AsyncClient":
+        # The client's connection pool belongs to the loop it was created on
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = self._ollama.AsyncClient(host=self.host)
+            self._async_client_loop = loop
+        return self._async_client
+
+    def call(self, prompt):
+        generate = self._client.generate if self._client else self._ollama.generate
+        response = generate(**self._generate_kwargs(prompt))
         return response
 
+    async def _acall(self, prompt):
+        client = self._get_async_client()
+        return await client.generate(**self._generate_kwargs(prompt))
+
 
 @LLM_REGISTRY.register("openai")
 class OpenaiLLM(BaseLLM):
@@ -55,16 +134,20 @@ class OpenaiLLM(BaseLLM):
         api_key: str = "",
         api_base: str = "",
         options: dict | None = None,
+        max_concurrency: int = 4,
         **kwargs,
     ):
-        super().__init__(model_name, options)
+        super().__init__(model_name, options, max_concurrency=max_concurrency)
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.api_base = api_base or os.getenv("OPENAI_API_BASE")
         self.kwargs = kwargs
 
-    def call(self, prompt: str) -> dict:
-        from litellm import completion
+        # litellm is slow to import, so do it once per client rather than per call
+        import litellm
 
+        self._litellm = litellm
+
+    def _completion_kwargs(self, prompt: str) -> dict:
         messages = []
         messages.append({"role": "user", "content": prompt})
 
@@ -81,10 +164,20 @@ class OpenaiLLM(BaseLLM):
             completion_kwargs["api_base"] = self.api_base
         if self.kwargs:
             completion_kwargs.update(self.kwargs)
+        return completion_kwargs
 
-        response = completion(**completion_kwargs)
+    @staticmethod
+    def _parse_response(response) -> dict:
         content = response.choices[0].message.content
         if isinstance(content, list):
             content = "".join(c.get("text", "") for c in content if isinstance(c, dict))
 
         return {"response": content, "raw_response": response}
+
+    def call(self, prompt: str) -> dict:
+        response = self._litellm.completion(**self._completion_kwargs(prompt))
+        return self._parse_response(response)
+
+    async def _acall(self, prompt: str) -> dict:
+        response = await self._litellm.acompletion(**self._completion_kwargs(prompt))
+        return self._parse_response(response)
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from arxivrec.engine.llm import BaseLLM
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed store of LLM response texts keyed by a prompt hash.
+
+    Entries older than `ttl_seconds` are treated as misses, and once the store
+    holds more than `max_entries` the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float | None = 7 * 24 * 3600,
+        max_entries: int = 10_000,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_accessed_at ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(client: BaseLLM, prompt: str) -> str:
+        """
+        Hash of everything that changes the answer: backend, server, model,
+        options. The API key is left out; it does not select the model.
+        """
+        identity = {
+            "backend": client.__class__.__name__,
+            # Ollama host / OpenAI-compatible base URL; two servers may serve
+            # different weights under the same model name
+            "endpoint": getattr(client, "host", None)
+            or getattr(client, "api_base", None),
+            "model": client.model_name,
+            "options": client.options,
+            "kwargs": getattr(client, "kwargs", None),
+        }
+        payload = json.dumps(identity, sort_keys=True, default=str) + "\n" + prompt
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (
+                self.ttl_seconds is not None and now - row[1] > self.ttl_seconds
+            ):
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+        self._conn.execute(
+            "DELETE FROM responses WHERE key NOT IN ("
+            "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def __repr__(self):
+        return f"LLMResponseCache(path={self.path}, stats={self.stats()})"
+
+
+class CachedLLM(BaseLLM):
+    """
+    Wrap any registered LLM so identical prompts are answered from the cache.
+    Cached responses carry only the response text and `"cached": True`.
+
+    A response is only written once the ranker has parsed it and calls `store`,
+    and a cached one that fails to parse is dropped through `discard`, so a
+    malformed or truncated answer is never replayed.
+    """
+
+    def __init__(self, client: BaseLLM, cache: LLMResponseCache):
+        super().__init__(
+            client.model_name, client.options, max_concurrency=client.max_concurrency
+        )
+        self.client = client
+        self.cache = cache
+
+    def _lookup(self, key: str) -> dict | None:
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        logger.info("LLM cache hit, skipping model call")
+        return {"response": cached, "cached": True, "cache_key": key}
+
+    def call(self, prompt):
+        key = self.cache.make_key(self.client, prompt)
+        response = self._lookup(key)
+        if response is None:
+            response = {**self.client.call(prompt), "cache_key": key}
+        return response
+
+    async def _acall(self, prompt):
+        key = self.cache.make_key(self.client, prompt)
+        response = self._lookup(key)
+        if response is None:
+            response = {**await self.client.acall(prompt), "cache_key": key}
+        return response
+
+    def store(self, response: dict) -> None:
+        if "cache_key" in response and not response.get("cached"):
+            self.cache.put(response["cache_key"], response["response"])
+
+    def discard(self, response: dict) -> None:
+        if response.get("cached"):
+            logger.warning("Dropping a cached LLM response that failed to parse")
+            self.cache.delete(response["cache_key"])
+
+    def __repr__(self):
+        return f"CachedLLM(client={self.client.__class__.__name__}, cache={self.cache})"
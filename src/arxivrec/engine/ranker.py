@@ -1,10 +1,19 @@
+import asyncio
 import json
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Coroutine
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
 from arxivrec.engine.llm import BaseLLM
+from arxivrec.utils.metrics import METRICS
+
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder
 
 
 class BaseRanker(ABC):
@@ -12,10 +21,87 @@ class BaseRanker(ABC):
     def rank(self, user_interest: str, top_papers_df: pd.DataFrame) -> pd.DataFrame:
         pass
 
+    async def arank(
+        self, user_interest: str, top_papers_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Async version of `rank`. Defaults to running `rank` in a thread."""
+        return await asyncio.to_thread(self.rank, user_interest, top_papers_df)
+
+
+def _run_sync(coro: Coroutine[Any, Any, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Run `coro` to completion from sync code. Inside a running event loop
+    (a notebook, the async pipeline) `asyncio.run` would raise, so the
+    coroutine gets its own loop in a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def _default_token_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable ({e}), estimating 4 chars per token")
+        return lambda text: len(text) // 4 + 1
+
+
+def _record_usage(response) -> None:
+    """Add the LLM call and the token counts its backend reports to the metrics."""
+    METRICS.add("llm.calls")
+    if response.get("cached"):
+        METRICS.add("llm.cached_responses")
+        return
+    try:
+        usage = response["raw_response"].usage  # litellm
+        prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+    except (KeyError, AttributeError):
+        # ollama
+        prompt_tokens = response.get("prompt_eval_count")
+        completion_tokens = response.get("eval_count")
+    if prompt_tokens:
+        METRICS.add("llm.prompt_tokens", prompt_tokens)
+    if completion_tokens:
+        METRICS.add("llm.completion_tokens", completion_tokens)
+
 
 class LLMRanker(BaseRanker):
-    def __init__(self, client: BaseLLM):
+    """
+    LLM-as-a-judge ranking of the bi-encoder candidates.
+
+    With `chunk_token_budget` set, candidate sets whose prompt would exceed the
+    budget are ranked as a tournament: candidates are split into chunks that fit
+    the budget, each chunk is ranked concurrently to pick local winners, and the
+    winners go through further rounds until one final prompt fits.
+    """
+
+    def __init__(
+        self,
+        client: BaseLLM,
+        chunk_token_budget: int | None = None,
+        token_counter: Callable[[str], int] | None = None,
+    ):
         self.client = client
+        self.chunk_token_budget = chunk_token_budget
+        self._token_counter = token_counter
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(client={self.client.__class__.__name__}, "
+            f"chunk_token_budget={self.chunk_token_budget})"
+        )
+
+    def count_tokens(self, text: str) -> int:
+        if self._token_counter is None:
+            self._token_counter = _default_token_counter()
+        return self._token_counter(text)
 
     def _get_authors(self, author_list: list[str]) -> str:
         """
@@ -48,20 +134,33 @@ class LLMRanker(BaseRanker):
                     return data[key]
         return []
 
-    def rank(self, user_interest: str, top_papers_df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Uses a local LLM to decide top candidates.
-        """
-        top_papers_df = top_papers_df.copy()
-        top_papers_df["cleaned_authors"] = top_papers_df["authors"].apply(
-            self._get_authors
+    def _prepare(self, top_papers_df: pd.DataFrame) -> pd.DataFrame:
+        """Only the columns ranking needs, with authors formatted for the prompt."""
+        return pd.DataFrame(
+            {
+                "id": top_papers_df["id"].to_numpy(),
+                "title": top_papers_df["title"].to_numpy(),
+                "cleaned_authors": [
+                    self._get_authors(a) for a in top_papers_df["authors"]
+                ],
+                "abstract": top_papers_df["abstract"].to_numpy(),
+                "url": top_papers_df["url"].to_numpy(),
+            }
         )
-        all_papers_json = top_papers_df[
-            ["id", "title", "cleaned_authors", "abstract"]
-        ].to_dict(orient="records")
+
+    def _paper_records(self, top_papers_df: pd.DataFrame) -> list[dict]:
+        columns = ["id", "title", "cleaned_authors", "abstract"]
+        return [
+            dict(zip(columns, values))
+            for values in zip(*(top_papers_df[c].tolist() for c in columns))
+        ]
+
+    def _build_prompt(self, user_interest: str, top_papers_df: pd.DataFrame) -> str:
+        all_papers_json = self._paper_records(top_papers_df)
 
         logger.info(f"Number of papers to process: {len(all_papers_json)}")
-        logger.info(f"Sample input paper JSON: {all_papers_json[0]}")
+        if all_papers_json:
+            logger.info(f"Sample input paper JSON: {all_papers_json[0]}")
 
         llm_ranking_prompt = f"""
         ## Task
@@ -99,37 +198,207 @@ class LLMRanker(BaseRanker):
             ]
         }}
         """  # noqa: E501
+        return llm_ranking_prompt
+
+    def _collect_results(
+        self, response: dict, top_papers_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        _record_usage(response)
+        try:
+            llm_output = self._parse_llm_output(response["response"])
+            logger.info(f"LLM Output: {llm_output}")
+
+            # ID -> row built once; the results are then taken in a single step
+            row_of = dict(zip(top_papers_df["id"].tolist(), range(len(top_papers_df))))
+            seen_ids: set[str] = set()
+            rows, ids, reasonings = [], [], []
+            for paper_analysis in llm_output:
+                paper_id = paper_analysis["id"]
+                if paper_id not in row_of:
+                    logger.warning(
+                        f"LLM returned unknown paper ID '{paper_id}', skipping"
+                    )
+                    continue
+                if paper_id in seen_ids:
+                    logger.warning(
+                        f"LLM returned duplicate paper ID '{paper_id}', skipping"
+                    )
+                    continue
+                seen_ids.add(paper_id)
+                rows.append(row_of[paper_id])
+                ids.append(paper_id)
+                reasonings.append(paper_analysis["reasoning"])
+        except Exception:
+            # Malformed or truncated answer: never replay it from a cache
+            self.client.discard(response)
+            raise
+        self.client.store(response)
+
+        picked = top_papers_df.iloc[rows]
+        return pd.DataFrame(
+            {
+                "id": ids,
+                "url": picked["url"].to_numpy(),
+                "title": picked["title"].to_numpy(),
+                "authors": picked["cleaned_authors"].to_numpy(),
+                "abstract": picked["abstract"].to_numpy(),
+                "reasoning": reasonings,
+            }
+        )
+
+    def _make_chunks(
+        self, user_interest: str, top_papers_df: pd.DataFrame
+    ) -> list[pd.DataFrame]:
+        """
+        Greedily pack candidates, in order, into chunks whose prompt fits the
+        token budget. Every chunk holds at least one paper.
+        """
+        if not self.chunk_token_budget:
+            return [top_papers_df]
+
+        overhead = self.count_tokens(
+            self._build_prompt(user_interest, top_papers_df.iloc[:0])
+        )
+        paper_tokens = [
+            self.count_tokens(str(r)) for r in self._paper_records(top_papers_df)
+        ]
 
-        response = self.client.call(llm_ranking_prompt)
-
-        llm_output = self._parse_llm_output(response["response"])
-        logger.info(f"LLM Output: {llm_output}")
-
-        valid_ids = set(top_papers_df["id"])
-        seen_ids: set[str] = set()
-        refined_results = []
-        for paper_analysis in llm_output:
-            paper_id = paper_analysis["id"]
-            if paper_id not in valid_ids:
-                logger.warning(f"LLM returned unknown paper ID '{paper_id}', skipping")
-                continue
-            if paper_id in seen_ids:
-                logger.warning(
-                    f"LLM returned duplicate paper ID '{paper_id}', skipping"
-                )
-                continue
-            seen_ids.add(paper_id)
-            matching_paper = top_papers_df[top_papers_df["id"] == paper_id].iloc[0]
-
-            refined_results.append(
-                {
-                    "id": paper_id,
-                    "url": matching_paper["url"],
-                    "title": matching_paper["title"],
-                    "authors": matching_paper["cleaned_authors"],
-                    "abstract": matching_paper["abstract"],
-                    "reasoning": paper_analysis["reasoning"],
-                }
+        chunks, start, used = [], 0, overhead
+        for i, tokens in enumerate(paper_tokens):
+            if i > start and used + tokens > self.chunk_token_budget:
+                chunks.append(top_papers_df.iloc[start:i])
+                start, used = i, overhead
+            used += tokens
+        chunks.append(top_papers_df.iloc[start:])
+        return chunks
+
+    async def _tournament(
+        self, user_interest: str, top_papers_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        round_num = 1
+        chunks = self._make_chunks(user_interest, top_papers_df)
+        while len(chunks) > 1:
+            logger.info(
+                f"Ranking round {round_num}: {len(top_papers_df)} candidates "
+                f"in {len(chunks)} chunks"
+            )
+            prompts = [self._build_prompt(user_interest, c) for c in chunks]
+            with METRICS.span("llm.round"):
+                responses = await self.client.call_many(prompts)
+
+            winner_ids: set[str] = set()
+            for response, chunk in zip(responses, chunks):
+                winners = self._collect_results(response, chunk)
+                if not winners.empty:
+                    winner_ids.update(winners["id"])
+
+            winners_df = top_papers_df[top_papers_df["id"].isin(winner_ids)]
+            if winners_df.empty:
+                logger.warning("No chunk produced winners, ranking the first chunk")
+                winners_df = chunks[0]
+            elif len(winners_df) >= len(top_papers_df):
+                logger.warning("Ranking round made no progress, keeping first chunk")
+                winners_df = self._make_chunks(user_interest, winners_df)[0]
+
+            top_papers_df = winners_df
+            chunks = self._make_chunks(user_interest, top_papers_df)
+            round_num += 1
+
+        prompt = self._build_prompt(user_interest, top_papers_df)
+        with METRICS.span("llm.call"):
+            response = await self.client.acall(prompt)
+        return self._collect_results(response, top_papers_df)
+
+    @METRICS.timed("rank")
+    def rank(self, user_interest: str, top_papers_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Uses a local LLM to decide top candidates.
+        """
+        top_papers_df = self._prepare(top_papers_df)
+        if len(self._make_chunks(user_interest, top_papers_df)) > 1:
+            return _run_sync(self._tournament(user_interest, top_papers_df))
+
+        prompt = self._build_prompt(user_interest, top_papers_df)
+        with METRICS.span("llm.call"):
+            response = self.client.call(prompt)
+        return self._collect_results(response, top_papers_df)
+
+    @METRICS.timed("rank")
+    async def arank(
+        self, user_interest: str, top_papers_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Async version of `rank` using the client's pooled async connection.
+        """
+        top_papers_df = self._prepare(top_papers_df)
+        return await self._tournament(user_interest, top_papers_df)
+
+
+class CrossEncoderRanker(BaseRanker):
+    """
+    Rescore a bi-encoder shortlist with a cross-encoder and keep the best `top_k`.
+
+    A cross-encoder reads the interest and each paper together, so it orders
+    candidates far better than embedding similarity, at the cost of one model
+    pass per pair. Run on a few hundred candidates on CPU, it lets the LLM judge
+    a short list without losing the papers the bi-encoder ranked too low.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        top_k: int = 15,
+        batch_size: int = 32,
+        max_length: int = 256,
+    ):
+        self.model_name = model_name
+        self.top_k = top_k
+        self.batch_size = batch_size
+        # Tokens per (interest, paper) pair; longer abstracts are truncated
+        self.max_length = max_length
+        self._model: "CrossEncoder | None" = None
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(model_name={self.model_name}, "
+            f"top_k={self.top_k}, batch_size={self.batch_size}, "
+            f"max_length={self.max_length})"
+        )
+
+    @property
+    def model(self) -> "CrossEncoder":
+        if self._model is None:
+            # torch and sentence-transformers take seconds to import
+            from sentence_transformers import CrossEncoder
+
+            self._model = CrossEncoder(
+                self.model_name, max_length=self.max_length, device="cpu"
+            )
+        return self._model
+
+    def score(self, user_interest: str, texts: list[str]) -> np.ndarray:
+        """Relevance of each text to the interest; higher is better."""
+        if not texts:
+            return np.empty(0, dtype=np.float32)
+        with METRICS.span("rerank.model"):
+            scores = self.model.predict(
+                [(user_interest, text) for text in texts],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
             )
+        METRICS.add("rerank.pairs", len(texts))
+        return np.asarray(scores, dtype=np.float32).reshape(len(texts))
 
-        return pd.DataFrame(refined_results)
+    @METRICS.timed("rerank")
+    def rank(self, user_interest: str, top_papers_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        The `top_k` best candidates by cross-encoder score, best first, with the
+        score in a `rerank_score` column.
+        """
+        texts = (top_papers_df["title"] + ". " + top_papers_df["abstract"]).tolist()
+        scores = self.score(user_interest, texts)
+        # Stable, so ties keep the bi-encoder order
+        order = np.argsort(-scores, kind="stable")[: self.top_k]
+        logger.info(f"Cross-encoder kept {len(order)}/{len(top_papers_df)} candidates")
+        return top_papers_df.iloc[order].assign(rerank_score=scores[order])
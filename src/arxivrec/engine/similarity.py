@@ -0,0 +1,105 @@
+import heapq
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+def l2_normalize(vecs: np.ndarray) -> np.ndarray:
+    """
+    Return float32 row-normalized vectors. Rows with zero norm are left as zeros.
+    Input that is already float32 and unit-norm is returned without copying.
+    """
+    vecs = np.atleast_2d(np.asarray(vecs, dtype=np.float32))
+    sq_norms = np.einsum("ij,ij->i", vecs, vecs)
+    if np.allclose(sq_norms[sq_norms > 0], 1.0, atol=1e-4):
+        return vecs
+    norms = np.sqrt(sq_norms, dtype=np.float32)
+    norms[norms == 0] = 1.0
+    return vecs / norms[:, None]
+
+
+def top_k_scores(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k highest scores per row of a [Q, N] score matrix.
+
+    Uses np.argpartition so only the selected k entries are sorted.
+    Returns (indices, scores), both [Q, min(k, N)], in descending score order.
+    """
+    scores = np.atleast_2d(scores)
+    num_items = scores.shape[1]
+    k = min(k, num_items)
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(scores.dtype)
+
+    if k < num_items:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(num_items), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    indices = np.take_along_axis(candidates, order, axis=1)
+    return indices, np.take_along_axis(candidate_scores, order, axis=1)
+
+
+def top_k(
+    query_vecs: np.ndarray,  # [Q, D]
+    content_vecs: np.ndarray,  # [N, D]
+    k: int = 10,
+    normalized: bool = False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Batched cosine top-k: per-query indices and scores, both [Q, min(k, N)].
+    With `normalized`, the inputs are trusted to be unit-norm and the norm pass
+    over the content matrix is skipped.
+    """
+    if not normalized:
+        query_vecs, content_vecs = l2_normalize(query_vecs), l2_normalize(content_vecs)
+    return top_k_scores(np.atleast_2d(query_vecs) @ np.asarray(content_vecs).T, k)
+
+
+class RunningTopK:
+    """
+    Bounded min-heap of the k best-scoring rows seen across streamed batches.
+
+    Memory stays at k rows however many batches are pushed. Ties keep the row
+    seen first, and a paper ID already in the heap is not added twice.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self.num_seen = 0
+        self._heap: list[tuple[float, int, str, pd.Series]] = []
+        self._ids: set[str] = set()
+        self._order = itertools.count()
+
+    def push(self, scores: np.ndarray, rows: pd.DataFrame) -> None:
+        """Offer a batch of rows with their [N] scores."""
+        scores = np.asarray(scores).ravel()
+        self.num_seen += len(rows)
+        if self.k <= 0:
+            return
+        # Only a batch's own top k can enter the heap
+        candidates, _ = top_k_scores(scores, self.k)
+        for i in candidates[0]:
+            paper_id = rows["id"].iat[i]
+            if paper_id in self._ids:
+                continue
+            item = (float(scores[i]), -next(self._order), paper_id, rows.iloc[i])
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item[:2] > self._heap[0][:2]:
+                self._ids.discard(heapq.heapreplace(self._heap, item)[2])
+            else:
+                continue
+            self._ids.add(paper_id)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Kept rows, best first."""
+        best = sorted(self._heap, key=lambda item: item[:2], reverse=True)
+        return pd.DataFrame([row for *_, row in best]).reset_index(drop=True)
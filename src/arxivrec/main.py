@@ -1,30 +1,241 @@
 import argparse
+import re
 import sys
+from datetime import date as _date
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
 from loguru import logger
 
-from arxivrec.dataset.fetcher import ArxivFetcher, BaseFetcher
-from arxivrec.dataset.hf_fetcher import HFDailyPapersFetcher
-from arxivrec.engine.encoder import TextEncoder
 from arxivrec.engine.llm import LLM_REGISTRY
-from arxivrec.engine.ranker import LLMRanker
 from arxivrec.notify.notification import NOTIFIER_REGISTRY
-from arxivrec.pipeline import LLMPipeline, build_digest_html
 from arxivrec.topic import Topic
 from arxivrec.utils.config_parse import load_config
-from arxivrec.utils.logger import show_registry_table, show_topic_table
+from arxivrec.utils.env import load_env
+from arxivrec.utils.logger import setup_logging, show_registry_table, show_topic_table
+from arxivrec.utils.metrics import METRICS
 
+# torch, pandas, arxiv, pdfplumber, ollama... are imported by the stage that
+# needs them, so that e.g. `arxiv-rec validate` starts instantly.
+if TYPE_CHECKING:
+    from arxivrec.dataset.fetcher import BaseFetcher
+    from arxivrec.dataset.header_cache import HeaderTextCache
+    from arxivrec.dataset.planner import ArxivQueryPlanner
+    from arxivrec.dataset.store import PaperStore
+    from arxivrec.engine.encoder import TextEncoder
+    from arxivrec.engine.ranker import CrossEncoderRanker
 
-def main():
-    parser = argparse.ArgumentParser()
-    _default_config = Path(__file__).parent.parent / "config.yaml"
-    parser.add_argument("--config", type=str, default=str(_default_config))
-    args = parser.parse_args()
+REPORT_PATH = Path("report.html")
+METRICS_PATH = REPORT_PATH.with_name("metrics.json")
+PIPELINE_MODES = ("per_topic", "shared", "async")
+TOPIC_SOURCES = ("arxiv", "huggingface")
+# Bi-encoder candidates per topic that a cross-encoder rescores
+DEFAULT_RERANK_SHORTLIST = 200
 
-    cfg = load_config(args.config)
 
+def build_fetcher(
+    topic: Topic,
+    topic_data: dict,
+    pipeline_cfg: dict,
+    header_cache: "HeaderTextCache | None" = None,
+    planner: "ArxivQueryPlanner | None" = None,
+    store: "PaperStore | None" = None,
+) -> "BaseFetcher":
+    from arxivrec.dataset.fetcher import ArxivFetcher
+    from arxivrec.dataset.hf_fetcher import HFDailyPapersFetcher
+
+    if topic.source == "huggingface":
+        return HFDailyPapersFetcher(
+            topic=topic,
+            min_upvotes=topic_data.get("min_upvotes", 0),
+            store=store,
+        )
+    if planner is not None:
+        return planner.fetcher_for(
+            topic,
+            lookback_days=pipeline_cfg["lookback_days"],
+            max_results=pipeline_cfg["max_results"],
+            header_cache=header_cache,
+        )
+    return ArxivFetcher(
+        topic=topic,
+        lookback_days=pipeline_cfg["lookback_days"],
+        max_results=pipeline_cfg["max_results"],
+        header_cache=header_cache,
+        store=store,
+    )
+
+
+def build_encoder(encoder_cfg: str | dict, cache_dir: str | None) -> "TextEncoder":
+    """`models.encoder` is a model name, or a dict with `name` and engine options."""
+    from arxivrec.engine.encoder import TextEncoder
+
+    if isinstance(encoder_cfg, str):
+        encoder_cfg = {"name": encoder_cfg}
+    encoder_args = dict(encoder_cfg)
+    return TextEncoder(
+        model_name=encoder_args.pop("name"), cache_dir=cache_dir, **encoder_args
+    )
+
+
+def build_reranker(
+    cross_encoder_cfg: str | dict, top_k: int
+) -> tuple["CrossEncoderRanker", int]:
+    """
+    `models.cross_encoder` is a model name, or a dict with `name`, `shortlist`
+    and engine options. Returns the reranker and the shortlist size.
+    """
+    from arxivrec.engine.ranker import CrossEncoderRanker
+
+    if isinstance(cross_encoder_cfg, str):
+        cross_encoder_cfg = {"name": cross_encoder_cfg}
+    reranker_args = dict(cross_encoder_cfg)
+    shortlist_k = reranker_args.pop("shortlist", DEFAULT_RERANK_SHORTLIST)
+    reranker = CrossEncoderRanker(
+        model_name=reranker_args.pop("name"), top_k=top_k, **reranker_args
+    )
+    return reranker, shortlist_k
+
+
+def run_backfill(cfg: dict, args: argparse.Namespace) -> None:
+    from arxivrec.dataset.backfill import Backfill
+    from arxivrec.dataset.store import PaperStore
+
+    cache_dir = cfg.get("cache", {}).get("dir") or ".cache/arxivrec"
+    store = PaperStore(cache_dir)
+
+    encoder = None
+    if not args.no_encode:
+        encoder = build_encoder(cfg["models"]["encoder"], cache_dir)
+
+    categories = args.categories or list(
+        dict.fromkeys(
+            c
+            for t in cfg["topic"]
+            if t.get("source", "arxiv") == "arxiv"
+            for c in t.get("categories", [])
+        )
+    )
+    backfill = Backfill(store, encoder=encoder, batch_size=args.batch_size)
+    logger.info(f"Backfilling {categories} from {args.start} to {args.end}: {backfill}")
+
+    if args.snapshot:
+        stats = backfill.run_snapshot(args.snapshot, categories, args.start, args.end)
+    else:
+        stats = backfill.run_api(
+            categories, args.start, args.end, slice_days=args.slice_days
+        )
+    logger.info(
+        f"Backfill done: {stats['papers']} papers ({stats['new']} new) in "
+        f"{stats['seconds']}s, {stats['papers_per_sec']} papers/s"
+    )
+
+
+def validate_config(cfg: dict) -> list[str]:
+    """Problems in `cfg` that would make a run fail, found without running it."""
+    from arxivrec.engine.encoder import ENCODER_BACKENDS
+    from arxivrec.engine.index import INDEX_REGISTRY
+
+    errors = []
+    topics = cfg.get("topic") or []
+    if not topics:
+        errors.append("No topics configured under 'topic'")
+    seen_ids = set()
+    for i, topic_data in enumerate(topics):
+        topic_id = topic_data.get("id", f"#{i}")
+        for key in ("id", "description"):
+            if key not in topic_data:
+                errors.append(f"Topic {topic_id}: missing '{key}'")
+        if topic_id in seen_ids:
+            errors.append(f"Topic {topic_id}: duplicate id")
+        seen_ids.add(topic_id)
+        source = topic_data.get("source", "arxiv")
+        if source not in TOPIC_SOURCES:
+            errors.append(f"Topic {topic_id}: unknown source '{source}'")
+        elif source == "arxiv" and not topic_data.get("categories"):
+            errors.append(f"Topic {topic_id}: arXiv topics need 'categories'")
+
+    pipeline_cfg = cfg.get("pipeline") or {}
+    for key in ("simsearch_top_k", "lookback_days", "max_results"):
+        if key not in pipeline_cfg:
+            errors.append(f"pipeline: missing '{key}'")
+    mode = pipeline_cfg.get("mode", "per_topic")
+    if mode not in PIPELINE_MODES:
+        errors.append(f"pipeline: unknown mode '{mode}', expected {PIPELINE_MODES}")
+
+    models_cfg = cfg.get("models") or {}
+    encoder_cfg = models_cfg.get("encoder")
+    if isinstance(encoder_cfg, dict):
+        if "name" not in encoder_cfg:
+            errors.append("models.encoder: missing 'name'")
+        backend = encoder_cfg.get("backend", "torch")
+        if backend not in ENCODER_BACKENDS:
+            errors.append(
+                f"models.encoder: unknown backend '{backend}', "
+                f"expected {ENCODER_BACKENDS}"
+            )
+    elif not isinstance(encoder_cfg, str):
+        errors.append("models.encoder: expected a model name or a dict")
+
+    cross_encoder_cfg = models_cfg.get("cross_encoder")
+    if isinstance(cross_encoder_cfg, dict):
+        if "name" not in cross_encoder_cfg:
+            errors.append("models.cross_encoder: missing 'name'")
+        shortlist = cross_encoder_cfg.get("shortlist", DEFAULT_RERANK_SHORTLIST)
+        if shortlist < pipeline_cfg.get("simsearch_top_k", 0):
+            errors.append(
+                "models.cross_encoder: 'shortlist' is smaller than "
+                "pipeline.simsearch_top_k"
+            )
+    elif cross_encoder_cfg is not None and not isinstance(cross_encoder_cfg, str):
+        errors.append("models.cross_encoder: expected a model name or a dict")
+
+    ranker_cfg = models_cfg.get("ranker") or {}
+    if len(ranker_cfg) != 1:
+        errors.append("models.ranker: expected exactly one LLM")
+    for name in ranker_cfg:
+        if name not in LLM_REGISTRY:
+            errors.append(
+                f"models.ranker: unknown LLM '{name}', "
+                f"available: {LLM_REGISTRY.show_available()}"
+            )
+
+    for type_param_pair in cfg.get("notifiers") or []:
+        for name in type_param_pair:
+            if name not in NOTIFIER_REGISTRY:
+                errors.append(
+                    f"notifiers: unknown notifier '{name}', "
+                    f"available: {NOTIFIER_REGISTRY.show_available()}"
+                )
+
+    index_backend = (cfg.get("index") or {}).get("backend", "numpy")
+    if index_backend not in INDEX_REGISTRY:
+        errors.append(
+            f"index: unknown backend '{index_backend}', "
+            f"available: {INDEX_REGISTRY.show_available()}"
+        )
+    return errors
+
+
+def run_digest(cfg: dict) -> None:
+    import asyncio
+
+    from arxivrec.async_pipeline import AsyncPipelineRunner, notify_all
+    from arxivrec.dataset.header_cache import HeaderTextCache
+    from arxivrec.dataset.planner import ArxivQueryPlanner
+    from arxivrec.dataset.store import PaperStore
+    from arxivrec.engine.index import VectorIndex
+    from arxivrec.engine.llm_cache import CachedLLM, LLMResponseCache
+    from arxivrec.engine.ranker import LLMRanker
+    from arxivrec.pipeline import (
+        LLMPipeline,
+        SharedCorpusPipeline,
+        assign_shortlists,
+        build_digest_html,
+    )
+    from arxivrec.utils.http_cache import HTTPResponseCache, set_http_cache
+
+    logger.info("Starting arXiv recommendation engine!")
     show_registry_table(LLM_REGISTRY, NOTIFIER_REGISTRY)
 
     topic_list = []
@@ -42,10 +253,55 @@ def main():
 
     show_topic_table(topic_list=topic_list)
 
-    encoder = TextEncoder(model_name=cfg["models"]["encoder"])
+    cache_dir = cfg.get("cache", {}).get("dir")
+    http_cache = None
+    http_cache_cfg = cfg.get("cache", {}).get("http")
+    if cache_dir and http_cache_cfg is not None:
+        http_cache = HTTPResponseCache(
+            Path(cache_dir) / "http_responses.sqlite",
+            max_bytes=int(http_cache_cfg.get("max_size_mb", 512) * 2**20),
+            default_ttl_seconds=http_cache_cfg.get("ttl_minutes", 0) * 60,
+        )
+        set_http_cache(http_cache)
+        logger.info(f"Caching HTTP responses: {http_cache}")
+
+    encoder = build_encoder(cfg["models"]["encoder"], cache_dir)
+
+    index = None
+    if cfg.get("index"):
+        index_params = dict(cfg["index"])
+        backend = index_params.pop("backend", "numpy")
+        model_slug = re.sub(r"[^A-Za-z0-9_.-]+", "__", encoder.model_id)
+        index_path = index_params.pop("path", None) or (
+            Path(cache_dir or ".cache/arxivrec") / "index" / f"{backend}-{model_slug}"
+        )
+        index = VectorIndex.open(index_path, backend=backend, **index_params)
+        logger.info(f"Using vector index: {index}")
 
     client_name, client_args = next(iter(cfg["models"]["ranker"].items()))
-    ranker = LLMRanker(client=LLM_REGISTRY[client_name](**client_args))
+    llm_client = LLM_REGISTRY[client_name](**client_args)
+
+    llm_cache_cfg = cfg.get("cache", {}).get("llm")
+    if cache_dir and llm_cache_cfg is not None:
+        llm_cache = LLMResponseCache(
+            Path(cache_dir) / "llm_responses.sqlite",
+            ttl_seconds=llm_cache_cfg.get("ttl_hours", 24) * 3600,
+            max_entries=llm_cache_cfg.get("max_entries", 10_000),
+        )
+        llm_client = CachedLLM(llm_client, llm_cache)
+        logger.info(f"Caching LLM responses: {llm_cache}")
+
+    ranker = LLMRanker(
+        client=llm_client,
+        chunk_token_budget=cfg["pipeline"].get("rank_chunk_tokens"),
+    )
+
+    reranker, shortlist_k = None, None
+    if cfg["models"].get("cross_encoder"):
+        reranker, shortlist_k = build_reranker(
+            cfg["models"]["cross_encoder"], cfg["pipeline"]["simsearch_top_k"]
+        )
+        logger.info(f"Reranking the best {shortlist_k} papers with: {reranker}")
 
     notifier_list = []
     for type_param_pair in cfg["notifiers"]:
@@ -54,62 +310,153 @@ def main():
             logger.info(f"Adding notifier: {note_class.__name__}")
             notifier_list.append(note_class(**{k: v for k, v in note_params.items()}))
 
-    all_results: dict[str, pd.DataFrame] = {}
+    topic_cfg = {t["id"]: t for t in cfg["topic"]}
+    header_cache = HeaderTextCache(cache_dir)
+    store = None
+    if cache_dir and cfg["cache"].get("incremental_fetch", False):
+        store = PaperStore(cache_dir)
+        logger.info(f"Fetching incrementally into {store}")
+    planner = None
+    if cfg["pipeline"].get("shared_arxiv_query", False):
+        planner = ArxivQueryPlanner(
+            max_results_per_topic=cfg["pipeline"]["max_results"], store=store
+        )
+    fetchers = {
+        t.id: build_fetcher(
+            t, topic_cfg[t.id], cfg["pipeline"], header_cache, planner, store
+        )
+        for t in topic_list
+    }
 
-    for curr_topic in topic_list:
-        topic_data = next(t for t in cfg["topic"] if t["id"] == curr_topic.id)
+    all_results = {}
+    mode = cfg["pipeline"].get("mode", "per_topic")
+    history_days = cfg["pipeline"].get("history_days", 0)
+    concurrency = cfg["pipeline"].get("concurrency", {})
 
-        fetcher: BaseFetcher
-        if curr_topic.source == "huggingface":
-            fetcher = HFDailyPapersFetcher(
-                topic=curr_topic,
-                min_upvotes=topic_data.get("min_upvotes", 0),
-            )
-        else:
-            fetcher = ArxivFetcher(
-                topic=curr_topic,
-                lookback_days=cfg["pipeline"]["lookback_days"],
-                max_results=cfg["pipeline"]["max_results"],
-            )
+    exclusive_topics = cfg["pipeline"].get("exclusive_topics", True)
+    dedup_threshold = cfg["pipeline"].get("dedup_threshold", 0.95)
 
-        pipeline = LLMPipeline(
-            topic=curr_topic,
+    if mode == "shared":
+        logger.info("Running shared-corpus pipeline over all topics")
+        shared_pipeline = SharedCorpusPipeline(
+            topics=topic_list,
+            fetchers=fetchers,
             simsearch_top_k=cfg["pipeline"]["simsearch_top_k"],
-            fetcher=fetcher,
             encoder=encoder,
             llm_ranker=ranker,
-            notifier_list=[],
+            store=store,
+            history_days=history_days,
+            exclusive_topics=exclusive_topics,
+            dedup_threshold=dedup_threshold,
+            reranker=reranker,
+            shortlist_k=shortlist_k,
         )
-
-        logger.info(f"Running pipeline for topic: {curr_topic.id}")
-
         try:
-            df = pipeline.recommend()
-            if df is not None and not df.empty:
-                all_results[curr_topic.id] = df
+            all_results = shared_pipeline.recommend()
         except Exception as e:
-            logger.exception(f"Error running pipeline for topic '{curr_topic.id}': {e}")
+            logger.exception(f"Error running shared-corpus pipeline: {e}")
+
+    else:
+        pipelines = [
+            LLMPipeline(
+                topic=curr_topic,
+                simsearch_top_k=cfg["pipeline"]["simsearch_top_k"],
+                fetcher=fetchers[curr_topic.id],
+                encoder=encoder,
+                llm_ranker=ranker,
+                notifier_list=[],
+                index=index,
+                store=store,
+                history_days=history_days,
+                stream_batch_size=cfg["pipeline"].get("stream_batch_size"),
+                reranker=reranker,
+                shortlist_k=shortlist_k,
+            )
+            for curr_topic in topic_list
+        ]
+
+        if mode == "async":
+            runner = AsyncPipelineRunner(
+                pipelines,
+                fetch_concurrency=concurrency.get("fetch", 2),
+                llm_concurrency=concurrency.get("llm", 2),
+                exclusive_topics=exclusive_topics,
+                dedup_threshold=dedup_threshold,
+            )
+            logger.info(f"Running pipelines concurrently: {runner}")
+            all_results = asyncio.run(runner.recommend())
+
+        else:
+            shortlists = {}
+            for pipeline in pipelines:
+                curr_topic = pipeline.topic
+                logger.info(f"Running pipeline for topic: {curr_topic.id}")
+
+                try:
+                    shortlists[curr_topic.id] = pipeline.shortlist()
+                except Exception as e:
+                    logger.exception(
+                        f"Error running pipeline for topic '{curr_topic.id}': {e}"
+                    )
+
+            shortlists = assign_shortlists(
+                topic_list,
+                shortlists,
+                encoder,
+                exclusive_topics=exclusive_topics,
+                dedup_threshold=dedup_threshold,
+            )
+            for pipeline in pipelines:
+                curr_topic = pipeline.topic
+                if curr_topic.id not in shortlists:
+                    continue
+                try:
+                    df = pipeline.rank(shortlists[curr_topic.id])
+                    if df is not None and not df.empty:
+                        all_results[curr_topic.id] = df
+                except Exception as e:
+                    logger.exception(
+                        f"Error ranking papers for topic '{curr_topic.id}': {e}"
+                    )
+
+    if isinstance(llm_client, CachedLLM):
+        logger.info(f"LLM cache stats: {llm_client.cache.stats()}")
+    if http_cache is not None:
+        logger.info(f"HTTP cache stats: {http_cache.stats()}")
 
     if not all_results:
         logger.error("No recommendations generated for any topic.")
         sys.exit(1)
 
     try:
-        digest_html = build_digest_html(topic_list, all_results)
+        with METRICS.span("digest"):
+            digest_html = build_digest_html(topic_list, all_results)
     except Exception as e:
         logger.exception(f"Failed to build digest: {e}")
         sys.exit(1)
 
     try:
-        report_path = Path("report.html")
-        report_path.write_text(digest_html, encoding="utf-8")
-        logger.info(f"Report saved to {report_path.resolve()}")
+        REPORT_PATH.write_text(digest_html, encoding="utf-8")
+        logger.info(f"Report saved to {REPORT_PATH.resolve()}")
     except Exception as e:
         logger.exception(f"Failed to save report.html: {e}")
 
+    subject = "📚 Your Daily ArXiv Digest"
+    if mode == "async":
+        asyncio.run(
+            notify_all(
+                notifier_list,
+                subject=subject,
+                body_html=digest_html,
+                concurrency=concurrency.get("notify", 2),
+            )
+        )
+        return
+
     for notifier in notifier_list:
         try:
-            notifier.notify(subject="📚 Your Daily ArXiv Digest", body_html=digest_html)
+            with METRICS.span(f"notify.{notifier.__class__.__name__}"):
+                notifier.notify(subject=subject, body_html=digest_html)
             logger.info(f"{notifier} digest sent successfully!")
         except Exception as e:
             logger.warning(
@@ -118,6 +465,78 @@ def main():
             )
 
 
+def write_metrics(metrics_cfg: dict) -> None:
+    """Log the run's stage timings and save them next to report.html."""
+    METRICS.log_summary()
+    try:
+        METRICS.write_json(METRICS_PATH)
+        logger.info(f"Metrics saved to {METRICS_PATH.resolve()}")
+        if metrics_cfg.get("prometheus_textfile"):
+            METRICS.write_prometheus(metrics_cfg["prometheus_textfile"])
+    except Exception as e:
+        logger.exception(f"Failed to save run metrics: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    _default_config = Path(__file__).parent.parent / "config.yaml"
+    parser.add_argument("--config", type=str, default=str(_default_config))
+    subparsers = parser.add_subparsers(dest="command")
+
+    backfill_parser = subparsers.add_parser(
+        "backfill", help="Ingest a historical date range into the local paper store"
+    )
+    backfill_parser.add_argument(
+        "--start", type=_date.fromisoformat, required=True, help="YYYY-MM-DD"
+    )
+    backfill_parser.add_argument(
+        "--end",
+        type=_date.fromisoformat,
+        default=_date.today(),
+        help="YYYY-MM-DD, inclusive (default: today)",
+    )
+    backfill_parser.add_argument(
+        "--categories",
+        nargs="+",
+        help="arXiv categories (default: those of the configured topics)",
+    )
+    backfill_parser.add_argument(
+        "--snapshot", type=str, help="Read an arXiv OAI/JSON snapshot, not the API"
+    )
+    backfill_parser.add_argument("--slice-days", type=int, default=1)
+    backfill_parser.add_argument("--batch-size", type=int, default=1000)
+    backfill_parser.add_argument(
+        "--no-encode", action="store_true", help="Store metadata only"
+    )
+    subparsers.add_parser("registry", help="List the registered LLMs and notifiers")
+    subparsers.add_parser(
+        "validate", help="Check the config without loading any model or fetching"
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    load_env()
+    if args.command == "registry":
+        show_registry_table(LLM_REGISTRY, NOTIFIER_REGISTRY)
+        return
+
+    cfg = load_config(args.config)
+    if args.command == "backfill":
+        run_backfill(cfg, args)
+    elif args.command == "validate":
+        errors = validate_config(cfg)
+        for error in errors:
+            logger.error(error)
+        if errors:
+            sys.exit(1)
+        logger.info(f"{args.config} is valid")
+    else:
+        METRICS.reset()
+        try:
+            run_digest(cfg)
+        finally:
+            write_metrics(cfg.get("metrics") or {})
+
+
 if __name__ == "__main__":
-    logger.info("Starting arXiv recommendation engine!")
     main()
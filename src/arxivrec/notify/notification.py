@@ -4,6 +4,7 @@ from abc import ABC, abstractmethod
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+from arxivrec.utils.env import load_env
 from arxivrec.utils.registry import Registry
 
 NOTIFIER_REGISTRY = Registry("Notifier")
@@ -20,6 +21,7 @@ class BaseNotifier(ABC):
 @NOTIFIER_REGISTRY.register("email")
 class EmailNotifier(BaseNotifier):
     def __init__(self, host: str = "smtp.gmail.com", port: int = 465):
+        load_env()
         self.host = host
         self.port = port
 
@@ -1,15 +1,28 @@
+import datetime
 import html as _html
 from abc import ABC, abstractmethod
 from datetime import date as _date
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
 from arxivrec.dataset.fetcher import BaseFetcher
+from arxivrec.dataset.store import (
+    PIPELINE_COLUMNS,
+    SOURCE_ARXIV,
+    SOURCE_HF_DAILY,
+    PaperStore,
+)
+from arxivrec.engine.assignment import restrict_candidates
+from arxivrec.engine.embedding_cache import EmbeddingCache
 from arxivrec.engine.encoder import TextEncoder
+from arxivrec.engine.index import VectorIndex
 from arxivrec.engine.ranker import BaseRanker
+from arxivrec.engine.similarity import RunningTopK, top_k_scores
 from arxivrec.notify.notification import BaseNotifier, EmailNotifier
 from arxivrec.topic import Topic
+from arxivrec.utils.streaming import prefetch
 
 _TOPIC_COLORS = ["#0891b2", "#7c3aed", "#f59e0b", "#10b981", "#ef4444"]
 
@@ -68,15 +81,28 @@ body{{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',sans-serif;
 </html>"""
 
 
+def _render_paper(arxiv_id: str, title, authors, reasoning, url, color: str) -> str:
+    title = _html.escape(str(title))
+    authors = _html.escape(str(authors))
+    reason = _html.escape(str(reasoning))
+    url = _html.escape(str(url))
+    return (
+        f'<div class="paper">'
+        f'<div class="ptitle"><a href="{url}" target="_blank">{title}</a></div>'
+        f'<div class="authors">{authors}</div>'
+        f'<div class="reason" style="border-color:{color}">{reason}</div>'
+        f'<a class="plink" href="{url}" target="_blank">'
+        f"→ arxiv.org/abs/{arxiv_id}</a>"
+        f"</div>"
+    )
+
+
 def build_digest_html(topics: list[Topic], results: dict[str, pd.DataFrame]) -> str:
     today = _date.today().strftime("%B %-d, %Y")
-    total = sum(len(df) for df in results.values() if df is not None and not df.empty)
-    num_topics = sum(
-        1 for t in topics if results.get(t.id) is not None and not results[t.id].empty
-    )
 
     seen_ids: set[str] = set()
-    sections = ""
+    sections = []
+    total = 0
     for i, topic in enumerate(topics):
         df = results.get(topic.id)
         if df is None or df.empty:
@@ -84,51 +110,124 @@ def build_digest_html(topics: list[Topic], results: dict[str, pd.DataFrame]) ->
 
         color = _TOPIC_COLORS[i % len(_TOPIC_COLORS)]
         label = _html.escape(topic.id.replace("_", " "))
-        papers_html = ""
 
-        for _, row in df.iterrows():
-            if str(row["id"]) in seen_ids:
+        papers = []
+        columns = (
+            df[c].tolist() for c in ("id", "title", "authors", "reasoning", "url")
+        )
+        for arxiv_id, title, authors, reasoning, url in zip(*columns):
+            arxiv_id = str(arxiv_id)
+            if arxiv_id in seen_ids:
                 continue
-            seen_ids.add(str(row["id"]))
-            title = _html.escape(str(row["title"]))
-            authors = _html.escape(str(row["authors"]))
-            reason = _html.escape(str(row["reasoning"]))
-            url = _html.escape(str(row["url"]))
-            arxiv_id = str(row["id"])
-
-            papers_html += (
-                f'<div class="paper">'
-                f'<div class="ptitle"><a href="{url}" target="_blank">{title}</a></div>'
-                f'<div class="authors">{authors}</div>'
-                f'<div class="reason" style="border-color:{color}">{reason}</div>'
-                f'<a class="plink" href="{url}" target="_blank">'
-                f"→ arxiv.org/abs/{arxiv_id}</a>"
-                f"</div>"
+            seen_ids.add(arxiv_id)
+            papers.append(
+                _render_paper(arxiv_id, title, authors, reasoning, url, color)
             )
 
-        if not papers_html:
+        if not papers:
             continue
 
-        paper_count = papers_html.count('<div class="paper">')
-        sections += (
+        total += len(papers)
+        sections.append(
             f'<div class="sec">'
             f'<div class="sec-hdr">'
             f'<div class="dot" style="background:{color}"></div>'
             f'<span class="sec-title">{label}</span>'
-            f'<span class="cnt">{paper_count} papers</span>'
+            f'<span class="cnt">{len(papers)} papers</span>'
             f"</div>"
-            f"{papers_html}"
+            f"{''.join(papers)}"
             f"</div>"
         )
 
     return _DIGEST_TEMPLATE.format(
         date=today,
         total_papers=total,
-        num_topics=num_topics,
-        sections=sections,
+        num_topics=len(sections),
+        sections="".join(sections),
     )
 
 
+def with_store_history(
+    df: pd.DataFrame | None, topic: Topic, store: PaperStore, history_days: int
+) -> pd.DataFrame | None:
+    """
+    Extend freshly fetched papers with the topic's papers from the last
+    `history_days` in the local store, reading only the columns search needs.
+
+    Topics with `org_keywords` are left as fetched, since stored papers have not
+    been through their affiliation filter.
+    """
+    if topic.org_keywords:
+        return df
+
+    since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        days=history_days
+    )
+    if topic.source == "huggingface":
+        history = store.read(SOURCE_HF_DAILY, since=since, columns=PIPELINE_COLUMNS)
+    else:
+        history = store.read(
+            SOURCE_ARXIV,
+            since=since,
+            categories=topic.categories,
+            columns=PIPELINE_COLUMNS,
+        )
+    logger.info(f"[{topic.id}] {len(history)} papers from the last {history_days} days")
+
+    frames = [f for f in (df, history) if f is not None and not f.empty]
+    if not frames:
+        return df
+    merged = pd.concat(frames, ignore_index=True)
+    return merged.drop_duplicates(subset="id").reset_index(drop=True)
+
+
+def assign_shortlists(
+    topics: list[Topic],
+    shortlists: dict[str, pd.DataFrame],
+    encoder: TextEncoder,
+    exclusive_topics: bool = True,
+    dedup_threshold: float | None = 0.95,
+) -> dict[str, pd.DataFrame]:
+    """
+    Cross-topic step between the similarity search and LLM ranking of
+    pipelines that search each topic on its own. Over the union of all
+    shortlists, near-duplicates are collapsed and, with `exclusive_topics`, a
+    paper stays only on the shortlist of its best-matching topic, as in
+    `SharedCorpusPipeline`, so no paper is ranked twice.
+    """
+    ranked = [t for t in topics if t.id in shortlists]
+    if not ranked or (not exclusive_topics and dedup_threshold is None):
+        return shortlists
+
+    union = pd.concat([shortlists[t.id] for t in ranked], ignore_index=True)
+    union = union.drop_duplicates(subset="id").reset_index(drop=True)
+    topic_embeddings = encoder.encode([t.description for t in ranked])
+    embeddings = encoder.encode(
+        union["combined_text"].tolist(), ids=union["id"].tolist()
+    )
+    allowed = np.stack([union["id"].isin(shortlists[t.id]["id"]) for t in ranked])
+    allowed = restrict_candidates(
+        encoder.cosine_sim(topic_embeddings, embeddings),
+        allowed,
+        embeddings,
+        exclusive_topics=exclusive_topics,
+        dedup_threshold=dedup_threshold,
+    )
+
+    assigned: dict[str, pd.DataFrame] = {}
+    for row, topic in enumerate(ranked):
+        keep = union["id"][allowed[row]]
+        own = shortlists[topic.id]
+        # Kept copies of this topic's near-duplicates come after its own papers
+        extra = union[union["id"].isin(keep) & ~union["id"].isin(own["id"])]
+        df = pd.concat([own[own["id"].isin(keep)], extra], ignore_index=True)
+        if df.empty:
+            logger.info(f"[{topic.id}] All candidates went to other topics")
+            continue
+        assigned[topic.id] = df
+    return assigned
+
+
 class EmptyFetchException(Exception):
     """No fetch result!"""
 
@@ -163,12 +262,28 @@ class LLMPipeline(BasePipeline):
         encoder: TextEncoder,
         llm_ranker: BaseRanker,
         notifier_list: list[BaseNotifier],
+        index: VectorIndex | None = None,
+        store: PaperStore | None = None,
+        history_days: int = 0,
+        stream_batch_size: int | None = None,
+        reranker: BaseRanker | None = None,
+        shortlist_k: int | None = None,
     ):
         super().__init__(topic)
         self.simsearch_top_k = simsearch_top_k
         self.fetcher = fetcher
         self.encoder = encoder
         self.llm_ranker = llm_ranker
+        # With a reranker, the bi-encoder keeps `shortlist_k` papers and the
+        # reranker cuts them down to the `simsearch_top_k` the LLM ranks
+        self.reranker = reranker
+        self.shortlist_k = shortlist_k
+        self.index = index
+        # With a store, also search papers stored over the last `history_days`
+        self.store = store
+        self.history_days = history_days
+        # Encode papers in micro-batches while the fetcher is still paging
+        self.stream_batch_size = stream_batch_size
         self.df_recommendation: pd.DataFrame | None = None
         self.notifier_list = (
             notifier_list if notifier_list is not None else [EmailNotifier()]
@@ -181,31 +296,58 @@ class LLMPipeline(BasePipeline):
             f"simsearch_top_k={self.simsearch_top_k}, "
             f"fetcher={self.fetcher}, "
             f"encoder={self.encoder}, "
+            f"reranker={self.reranker}, "
             f"llm_ranker={self.llm_ranker}, "
             f"notifiers={self.notifier_list}"
             f")"
         )
 
-    def recommend(self) -> pd.DataFrame:
+    def fetch(self) -> pd.DataFrame:
         df = self.fetcher.fetch()
+        if self.store is not None and self.history_days:
+            df = with_store_history(df, self.topic, self.store, self.history_days)
 
         if df is None or len(df) == 0:
             raise EmptyFetchException("No items fetched!!")
-
+        return df
+
+    @property
+    def search_k(self) -> int:
+        """Number of papers the bi-encoder search keeps."""
+        if self.reranker is None or not self.shortlist_k:
+            return self.simsearch_top_k
+        return max(self.shortlist_k, self.simsearch_top_k)
+
+    def rerank(self, df_simsearch: pd.DataFrame) -> pd.DataFrame:
+        """Cut the bi-encoder shortlist down to `simsearch_top_k` with the reranker."""
+        if self.reranker is None:
+            return df_simsearch
+        return self.reranker.rank(self.topic.description, df_simsearch)
+
+    def search(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Coarse bi-encoder search for the `search_k` closest papers, reranked down
+        to `simsearch_top_k` if a reranker is set.
+        """
         logger.info("Start topic and content embedding...")
 
         my_interest_embedding = self.encoder.encode([self.topic.description])
-        content_embedding = self.encoder.encode(df["combined_text"].tolist())
-        top_k_indices = self.encoder.get_top_k_similar(
-            my_interest_embedding, content_embedding, k=self.simsearch_top_k
-        )
-        df_simsearch = df.iloc[top_k_indices]
+        if self.index is not None:
+            df_simsearch = self._search_index(df, my_interest_embedding)
+        else:
+            content_embedding = self.encoder.encode(
+                df["combined_text"].tolist(), ids=df["id"].tolist()
+            )
+            top_k_indices = self.encoder.get_top_k_similar(
+                my_interest_embedding, content_embedding, k=self.search_k
+            )
+            df_simsearch = df.iloc[top_k_indices]
 
         logger.info("Similarity search done!")
+        return self.rerank(df_simsearch)
 
-        self.df_recommendation = self.llm_ranker.rank(
-            self.topic.description, df_simsearch
-        )
+    def _set_recommendation(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.df_recommendation = df
 
         if self.df_recommendation is not None and not self.df_recommendation.empty:
             titles = self.df_recommendation["title"].tolist()
@@ -213,6 +355,81 @@ class LLMPipeline(BasePipeline):
 
         return self.df_recommendation
 
+    def rank(self, df_simsearch: pd.DataFrame) -> pd.DataFrame:
+        return self._set_recommendation(
+            self.llm_ranker.rank(self.topic.description, df_simsearch)
+        )
+
+    async def arank(self, df_simsearch: pd.DataFrame) -> pd.DataFrame:
+        return self._set_recommendation(
+            await self.llm_ranker.arank(self.topic.description, df_simsearch)
+        )
+
+    def stream_search(self) -> pd.DataFrame:
+        """
+        Streaming variant of `fetch` + `search`. Fetched batches are encoded as
+        they arrive, while a background thread keeps downloading later pages,
+        and only a running top-k is kept, so memory does not grow with the
+        number of fetched papers.
+        """
+        my_interest_embedding = self.encoder.encode([self.topic.description])
+        top = RunningTopK(self.search_k)
+
+        batches = self.fetcher.iter_batches(self.stream_batch_size)
+        for batch in prefetch(batches):
+            if batch.empty:
+                continue
+            content_embedding = self.encoder.encode(
+                batch["combined_text"].tolist(), ids=batch["id"].tolist()
+            )
+            top.push(
+                self.encoder.cosine_sim(my_interest_embedding, content_embedding)[0],
+                batch,
+            )
+
+        if not len(top):
+            raise EmptyFetchException("No items fetched!!")
+        logger.info(f"Streaming search kept {len(top)}/{top.num_seen} papers")
+        return self.rerank(top.to_frame())
+
+    def shortlist(self) -> pd.DataFrame:
+        """Candidates for the LLM: `fetch` + `search`, or `stream_search`."""
+        if self.stream_batch_size:
+            return self.stream_search()
+        return self.search(self.fetch())
+
+    def recommend(self) -> pd.DataFrame:
+        return self.rank(self.shortlist())
+
+    def _search_index(
+        self, df: pd.DataFrame, query_embedding: np.ndarray
+    ) -> pd.DataFrame:
+        """
+        Add unseen or revised papers to the vector index, then search among
+        `df`'s papers.
+        """
+        assert self.index is not None
+        df = df.drop_duplicates(subset="id")
+
+        hashes = [EmbeddingCache.text_hash(t) for t in df["combined_text"]]
+        is_new = [not self.index.is_current(i, h) for i, h in zip(df["id"], hashes)]
+        new_papers = df[is_new]
+        if not new_papers.empty:
+            new_ids = new_papers["id"].tolist()
+            vectors = self.encoder.encode(
+                new_papers["combined_text"].tolist(), ids=new_ids
+            )
+            new_hashes = [h for h, new in zip(hashes, is_new) if new]
+            self.index.add(new_ids, vectors, text_hashes=new_hashes)
+            if self.index.path is not None:
+                self.index.save()
+        logger.info(f"Vector index: {len(new_papers)}/{len(df)} papers newly indexed")
+
+        hit_ids, _ = self.index.search(
+            query_embedding, k=self.search_k, allowed_ids=set(df["id"])
+        )
+        return df.set_index("id", drop=False).loc[hit_ids[0]].reset_index(drop=True)
+
     def notify(self):
         if self.df_recommendation is None:
             raise EmailFailException("No recommendations available to notify about!")
@@ -245,3 +462,171 @@ class LLMPipeline(BasePipeline):
 
         except Exception:
             raise EmailFailException("Failed to send email notification!")
+
+
+class SharedCorpusPipeline:
+    """
+    Recommend for several topics from one pooled corpus.
+
+    Papers fetched for any topic are deduplicated by ID and encoded once, all
+    topic descriptions are encoded as one batch, and a single (topics x papers)
+    similarity matrix drives the per-topic similarity search. Each topic still
+    only sees the papers its own fetcher returned.
+
+    Before ranking, top candidates whose embeddings are at least
+    `dedup_threshold` similar are collapsed into one, and with `exclusive_topics`
+    each paper is only a candidate for its best-matching topic, so the LLM never
+    ranks the same paper twice.
+
+    With a `reranker`, each topic's best `shortlist_k` papers are rescored by it
+    and only the best `simsearch_top_k` of those reach the LLM.
+    """
+
+    def __init__(
+        self,
+        topics: list[Topic],
+        fetchers: dict[str, BaseFetcher],
+        simsearch_top_k: int,
+        encoder: TextEncoder,
+        llm_ranker: BaseRanker,
+        store: PaperStore | None = None,
+        history_days: int = 0,
+        exclusive_topics: bool = True,
+        dedup_threshold: float | None = 0.95,
+        reranker: BaseRanker | None = None,
+        shortlist_k: int | None = None,
+    ):
+        self.topics = topics
+        self.fetchers = fetchers
+        self.simsearch_top_k = simsearch_top_k
+        self.encoder = encoder
+        self.llm_ranker = llm_ranker
+        self.store = store
+        self.history_days = history_days
+        self.exclusive_topics = exclusive_topics
+        self.dedup_threshold = dedup_threshold
+        self.reranker = reranker
+        self.shortlist_k = shortlist_k
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}("
+            f"topics={[t.id for t in self.topics]}, "
+            f"simsearch_top_k={self.simsearch_top_k}, "
+            f"encoder={self.encoder}, "
+            f"reranker={self.reranker}, "
+            f"llm_ranker={self.llm_ranker}"
+            f")"
+        )
+
+    @property
+    def search_k(self) -> int:
+        """Number of papers per topic the bi-encoder search keeps."""
+        if self.reranker is None or not self.shortlist_k:
+            return self.simsearch_top_k
+        return max(self.shortlist_k, self.simsearch_top_k)
+
+    def fetch_corpus(self) -> tuple[pd.DataFrame, dict[str, set[str]]]:
+        """Fetch every topic and return the deduplicated union plus membership."""
+        frames: list[pd.DataFrame] = []
+        membership: dict[str, set[str]] = {}
+
+        for topic in self.topics:
+            try:
+                df = self.fetchers[topic.id].fetch()
+            except Exception as e:
+                logger.exception(f"Error fetching papers for topic '{topic.id}': {e}")
+                continue
+            if self.store is not None and self.history_days:
+                df = with_store_history(df, topic, self.store, self.history_days)
+            if df is None or df.empty:
+                logger.warning(f"No papers fetched for topic '{topic.id}'")
+                continue
+            membership[topic.id] = set(df["id"])
+            frames.append(df)
+
+        if not frames:
+            return pd.DataFrame(), membership
+
+        corpus = pd.concat(frames, ignore_index=True)
+        corpus = corpus.drop_duplicates(subset="id").reset_index(drop=True)
+        total = sum(len(df) for df in frames)
+        logger.info(f"Shared corpus: {len(corpus)} unique papers from {total} fetched")
+        return corpus, membership
+
+    def assign(
+        self,
+        corpus: pd.DataFrame,
+        membership: dict[str, set[str]],
+        embeddings: np.ndarray,
+        sims: np.ndarray,
+    ) -> np.ndarray:
+        """
+        [topics, papers] mask of the papers each topic may rank: the ones its
+        fetcher returned, minus near-duplicates and, with `exclusive_topics`,
+        papers that match another topic better.
+        """
+        allowed = np.stack(
+            [
+                corpus["id"].isin(membership.get(t.id, ())).to_numpy()
+                for t in self.topics
+            ]
+        )
+        # Only papers that can reach ranking are checked for near-duplicates:
+        # each topic's best 2 * search_k
+        return restrict_candidates(
+            sims,
+            allowed,
+            embeddings,
+            exclusive_topics=self.exclusive_topics,
+            dedup_threshold=self.dedup_threshold,
+            pool_size=2 * self.search_k,
+        )
+
+    def recommend(self) -> dict[str, pd.DataFrame]:
+        corpus, membership = self.fetch_corpus()
+
+        if corpus.empty:
+            raise EmptyFetchException("No items fetched!!")
+
+        logger.info("Start topic and content embedding...")
+
+        topic_embeddings = self.encoder.encode([t.description for t in self.topics])
+        content_embeddings = self.encoder.encode(
+            corpus["combined_text"].tolist(), ids=corpus["id"].tolist()
+        )
+        sims = self.encoder.cosine_sim(topic_embeddings, content_embeddings)
+
+        logger.info("Similarity search done!")
+
+        allowed = self.assign(corpus, membership, content_embeddings, sims)
+        top_k_indices, top_k_sims = top_k_scores(
+            np.where(allowed, sims, -np.inf), k=self.search_k
+        )
+
+        results: dict[str, pd.DataFrame] = {}
+        for row, topic in enumerate(self.topics):
+            if topic.id not in membership:
+                continue
+
+            selected = top_k_indices[row][np.isfinite(top_k_sims[row])]
+            if not len(selected):
+                logger.info(f"[{topic.id}] All papers went to other topics")
+                continue
+
+            try:
+                candidates = corpus.iloc[selected]
+                if self.reranker is not None:
+                    candidates = self.reranker.rank(topic.description, candidates)
+                df = self.llm_ranker.rank(topic.description, candidates)
+            except Exception as e:
+                logger.exception(f"Error ranking papers for topic '{topic.id}': {e}")
+                continue
+
+            if df is not None and not df.empty:
+                logger.info(
+                    f"[{topic.id}] Recommended articles: {df['title'].tolist()}"
+                )
+                results[topic.id] = df
+
+        return results
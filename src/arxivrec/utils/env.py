@@ -0,0 +1,14 @@
+import functools
+
+from dotenv import find_dotenv, load_dotenv
+
+
+@functools.cache
+def load_env() -> None:
+    """
+    Load API keys and credentials from the nearest `.env` file, searching up
+    from the working directory, once per process. Called by the clients that read
+    them, so library and notebook users get them without going through `main`.
+    Variables already set in the environment win.
+    """
+    load_dotenv(find_dotenv(usecwd=True))
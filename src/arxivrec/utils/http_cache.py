@@ -0,0 +1,321 @@
+import hashlib
+import http
+import io
+import json
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+from arxivrec.utils.metrics import METRICS
+
+# Heuristic freshness for responses that only carry Last-Modified (RFC 9111 4.2.2)
+_LAST_MODIFIED_FRACTION = 0.1
+_MAX_HEURISTIC_SECONDS = 24 * 3600
+# Hop-by-hop or encoding headers that no longer describe the stored, decoded body
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def _cache_control(headers) -> dict[str, str]:
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPResponseCache:
+    """
+    SQLite-backed store of GET responses for conditional requests.
+
+    A response stays fresh for its Cache-Control max-age or Expires. Without
+    either, a fraction of its Last-Modified age (at most a day) is used, but
+    never less than `default_ttl_seconds`. Stale entries with an ETag or
+    Last-Modified are revalidated, so an unchanged resource costs a 304 with
+    no body. Once bodies add up to more than `max_bytes`, the least recently
+    used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = 512 * 2**20,
+        default_ttl_seconds: float = 0,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl_seconds = default_ttl_seconds
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        # PDF ranges are written from many threads; don't fsync each of them
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # `size` comes before `body`, so summing it doesn't read the bodies
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, "
+            "size INTEGER NOT NULL, expires_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, body BLOB NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_accessed_at ON responses (accessed_at)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    @staticmethod
+    def is_reusable(headers, fresh_for: float) -> bool:
+        """Whether a stored response could ever be served: fresh or revalidatable."""
+        return fresh_for > 0 or "ETag" in headers or "Last-Modified" in headers
+
+    @staticmethod
+    def make_key(request: requests.PreparedRequest) -> str:
+        """Method, URL and byte range; each Range of a PDF is its own entry."""
+        identity = f"{request.method} {request.url} {request.headers.get('Range', '')}"
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def freshness_seconds(self, headers) -> float | None:
+        """How long a response may be reused without asking; None if not storable."""
+        directives = _cache_control(headers)
+        if "no-store" in directives or headers.get("Vary", "").strip() == "*":
+            return None
+        if "no-cache" in directives:
+            return 0.0
+        if directives.get("max-age", "").isdigit():
+            return float(directives["max-age"])
+
+        date = _http_date(headers.get("Date")) or time.time()
+        expires = _http_date(headers.get("Expires"))
+        if expires is not None:
+            return max(expires - date, 0.0)
+        last_modified = _http_date(headers.get("Last-Modified"))
+        heuristic = 0.0
+        if last_modified is not None:
+            heuristic = min(
+                (date - last_modified) * _LAST_MODIFIED_FRACTION,
+                _MAX_HEURISTIC_SECONDS,
+            )
+        return max(heuristic, self.default_ttl_seconds, 0.0)
+
+    def get(self, key: str) -> tuple[int, CaseInsensitiveDict, bytes, bool] | None:
+        """Stored (status, headers, body, is_fresh), or None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        status, headers, body, expires_at = row
+        return status, CaseInsensitiveDict(json.loads(headers)), body, now < expires_at
+
+    def put(
+        self, key: str, status: int, headers, body: bytes, fresh_for: float
+    ) -> None:
+        now = time.time()
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    status,
+                    json.dumps(dict(headers)),
+                    len(body),
+                    now + fresh_for,
+                    now,
+                    body,
+                ),
+            )
+            self._total_bytes += len(body) - (replaced[0] if replaced else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        excess = self._total_bytes - self.max_bytes
+        freed = 0
+        keys = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ):
+            keys.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        self._total_bytes -= freed
+        logger.debug(f"HTTP cache: evicted {len(keys)} responses ({freed} bytes)")
+
+    def record(self, outcome: str) -> None:
+        """Count a request as one of 'hits', 'revalidated' or 'misses'."""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        METRICS.add(f"http.cache_{outcome}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            size = self._total_bytes
+        total = self.hits + self.revalidated + self.misses
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.revalidated) / total if total else 0.0,
+            "entries": entries,
+            "size_mb": round(size / 2**20, 2),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __repr__(self):
+        return (
+            f"HTTPResponseCache(path={self.path}, max_mb={self.max_bytes // 2**20}, "
+            f"default_ttl_seconds={self.default_ttl_seconds})"
+        )
+
+
+# Process-wide cache used by every session `mount_cache` was called on
+_cache: HTTPResponseCache | None = None
+
+
+def set_http_cache(cache: HTTPResponseCache | None) -> None:
+    global _cache
+    _cache = cache
+
+
+def get_http_cache() -> HTTPResponseCache | None:
+    return _cache
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that answers GETs from an `HTTPResponseCache`.
+
+    Fresh entries are returned without a request, stale ones are revalidated
+    with If-None-Match / If-Modified-Since, and storable responses are saved.
+    Streamed responses are passed through untouched, so reading part of a large
+    body never downloads all of it, and a request sent with
+    `Cache-Control: no-cache` skips the stored entry. Without a `cache`, the
+    process-wide one is looked up on every request, so sessions made before the
+    run configures it still use it.
+    """
+
+    def __init__(self, cache: HTTPResponseCache | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def _from_cache(
+        self, request: requests.PreparedRequest, status: int, headers, body: bytes
+    ) -> requests.Response:
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=status,
+            reason=http.HTTPStatus(status).phrase,
+            preload_content=False,
+            decode_content=False,
+            request_method=request.method,
+            request_url=request.url,
+        )
+        return self.build_response(request, raw)
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        cache = self.cache or get_http_cache()
+        conditional = any(
+            name in request.headers for name in ("If-None-Match", "If-Modified-Since")
+        )
+        # Requests that are already conditional are the caller's own business
+        if cache is None or request.method != "GET" or conditional:
+            return super().send(request, **kwargs)
+
+        key = cache.make_key(request)
+        entry = None
+        if "no-cache" not in _cache_control(request.headers):
+            entry = cache.get(key)
+        if entry is not None:
+            status, headers, body, is_fresh = entry
+            if is_fresh:
+                cache.record("hits")
+                return self._from_cache(request, status, headers, body)
+            if "ETag" in headers:
+                request.headers["If-None-Match"] = headers["ETag"]
+            if "Last-Modified" in headers:
+                request.headers["If-Modified-Since"] = headers["Last-Modified"]
+
+        response = super().send(request, **kwargs)
+        if entry is not None and response.status_code == 304:
+            response.close()
+            headers.update(
+                {
+                    k: v
+                    for k, v in response.headers.items()
+                    if k.lower() not in _DROPPED_HEADERS
+                }
+            )
+            cache.put(key, status, headers, body, cache.freshness_seconds(headers) or 0)
+            cache.record("revalidated")
+            return self._from_cache(request, status, headers, body)
+
+        cache.record("misses")
+        fresh_for = cache.freshness_seconds(response.headers)
+        if (
+            kwargs.get("stream")
+            or response.status_code not in (200, 206)
+            or fresh_for is None
+            or not cache.is_reusable(response.headers, fresh_for)
+        ):
+            return response
+        headers = {
+            k: v
+            for k, v in response.headers.items()
+            if k.lower() not in _DROPPED_HEADERS
+        }
+        body = response.content
+        headers["Content-Length"] = str(len(body))
+        cache.put(key, response.status_code, headers, body, fresh_for)
+        return self._from_cache(request, response.status_code, headers, body)
+
+
+def mount_cache(session: requests.Session, **adapter_kwargs) -> requests.Session:
+    """Send the session's HTTP(S) requests through a `CachingHTTPAdapter`."""
+    adapter = CachingHTTPAdapter(**adapter_kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
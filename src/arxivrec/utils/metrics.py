@@ -0,0 +1,168 @@
+import functools
+import inspect
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from loguru import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb(children: bool = False) -> float | None:
+    """Peak resident set size of this process (or its finished children) in MiB."""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    max_rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return round(max_rss / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+class Metrics:
+    """
+    Thread-safe timings and counters for one run.
+
+    Stages are timed with `span` (or the `timed` decorator) and aggregated by
+    name into count, total and max seconds; `add` accumulates counters such as
+    LLM tokens. `report` adds wall time and peak RSS, and can be written as JSON
+    or as a Prometheus textfile for node_exporter's textfile collector.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self._start = time.perf_counter()
+            self.stages: dict[str, dict] = {}
+            self.counters: dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stage = self.stages.setdefault(
+                name, {"count": 0, "total_s": 0.0, "max_s": 0.0}
+            )
+            stage["count"] += 1
+            stage["total_s"] += seconds
+            stage["max_s"] = max(stage["max_s"], seconds)
+
+    def add(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name: str):
+        """Decorator timing every call of a function or coroutine as `name`."""
+
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def report(self) -> dict:
+        with self._lock:
+            stages = {
+                name: {
+                    "count": s["count"],
+                    "total_s": round(s["total_s"], 4),
+                    "mean_s": round(s["total_s"] / s["count"], 4),
+                    "max_s": round(s["max_s"], 4),
+                }
+                for name, s in sorted(self.stages.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+        return {
+            "started_at": time.strftime(
+                "%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)
+            ),
+            "wall_s": round(time.perf_counter() - self._start, 3),
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_children_mb": peak_rss_mb(children=True),
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def write_json(self, path: str | Path) -> dict:
+        report = self.report()
+        Path(path).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        return report
+
+    def write_prometheus(self, path: str | Path, prefix: str = "arxivrec") -> None:
+        """
+        Write the report in the Prometheus text format. The file is replaced
+        atomically, as the textfile collector may read it at any time.
+        """
+        report = self.report()
+        lines = [
+            f"# TYPE {prefix}_run_seconds gauge",
+            f"{prefix}_run_seconds {report['wall_s']}",
+            f"# TYPE {prefix}_run_timestamp_seconds gauge",
+            f"{prefix}_run_timestamp_seconds {round(self.started_at)}",
+        ]
+        if report["peak_rss_mb"] is not None:
+            lines += [
+                f"# TYPE {prefix}_peak_rss_bytes gauge",
+                f"{prefix}_peak_rss_bytes {int(report['peak_rss_mb'] * 2**20)}",
+            ]
+        for metric, key in [("stage_seconds", "total_s"), ("stage_calls", "count")]:
+            lines.append(f"# TYPE {prefix}_{metric} gauge")
+            lines += [
+                f'{prefix}_{metric}{{stage="{name}"}} {stage[key]}'
+                for name, stage in report["stages"].items()
+            ]
+        for name, value in report["counters"].items():
+            metric = f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        tmp_path.replace(path)
+
+    def log_summary(self) -> None:
+        report = self.report()
+        stages = ", ".join(
+            f"{name} {s['total_s']:.2f}s/{s['count']}"
+            for name, s in sorted(
+                report["stages"].items(), key=lambda kv: -kv[1]["total_s"]
+            )
+        )
+        logger.info(
+            f"Run took {report['wall_s']}s, peak RSS {report['peak_rss_mb']} MiB; "
+            f"stages (total/calls): {stages}"
+        )
+
+
+# Process-wide metrics of the current run
+METRICS = Metrics()
@@ -0,0 +1,58 @@
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(iterable: Iterable[T], max_pending: int = 2) -> Iterator[T]:
+    """
+    Iterate `iterable` in a background thread, keeping up to `max_pending` items
+    ready in a bounded queue.
+
+    The producer (e.g. API paging with its rate-limit delays) runs while the
+    consumer works on the previous item, and the bounded queue keeps memory flat
+    when the consumer is slower. Exceptions are re-raised in the consumer, and
+    the producer stops when the consumer stops iterating.
+    """
+    pending: queue.Queue = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failure(e))
+
+    producer = threading.Thread(target=produce, name="prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
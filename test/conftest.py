@@ -1,9 +1,112 @@
+import datetime
+import os
+from xml.sax.saxutils import escape
+
+import numpy as np
 import pytest
 
 from arxivrec.engine.encoder import TextEncoder
+from arxivrec.engine.similarity import l2_normalize
+
+
+class FakeSentenceTransformer:
+    """Deterministic bag-of-words stand-in so tests don't download a model."""
+
+    dim = 16
+
+    def __init__(self, *args, **kwargs):
+        self.calls: list[list[str]] = []
+        self.pools: list[dict] = []
+
+    def start_multi_process_pool(self, target_devices):
+        pool = {"devices": target_devices, "threads": os.environ["OMP_NUM_THREADS"]}
+        self.pools.append(pool)
+        return pool
+
+    def stop_multi_process_pool(self, pool):
+        pool["stopped"] = True
+
+    def encode(self, texts, pool=None, normalize_embeddings=False, **kwargs):
+        self.calls.append(list(texts))
+        if pool is not None:
+            pool.setdefault("calls", []).append(len(texts))
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, sum(map(ord, word)) % self.dim] += 1.0
+        return l2_normalize(vectors) if normalize_embeddings else vectors
 
 
 @pytest.fixture
 def vanilla_encoder():
     """Fixture to reuse the encoder across tests without re-initializing."""
     return TextEncoder()  # default uses "sentence-transformers/all-MiniLM-L6-v2"
+
+
+@pytest.fixture
+def fake_sentence_transformer(monkeypatch):
+    """Make TextEncoder load FakeSentenceTransformer instead of a real model."""
+    monkeypatch.setattr(
+        "sentence_transformers.SentenceTransformer", FakeSentenceTransformer
+    )
+    return FakeSentenceTransformer
+
+
+@pytest.fixture
+def fake_encoder(fake_sentence_transformer):
+    return TextEncoder(model_name="fake/model")
+
+
+class FakeArxivAPI:
+    """Answers arXiv API requests with queued pages, then with empty ones."""
+
+    def __init__(self):
+        self.pages: list[bytes] = []
+        self.requests: list[dict] = []
+
+    def __call__(self, params: dict, refresh: bool = False) -> bytes:
+        self.requests.append(dict(params))
+        return self.pages.pop(0) if self.pages else self.page([])
+
+    @staticmethod
+    def entry(
+        arxiv_id: str,
+        title: str = "Title",
+        published: datetime.datetime | None = None,
+        authors: tuple[str, ...] = ("Alice",),
+        summary: str = "Abstract.",
+        categories: tuple[str, ...] = ("cs.LG",),
+    ) -> str:
+        """One <entry> of an arXiv API Atom page."""
+        published = published or datetime.datetime.now(datetime.timezone.utc)
+        stamp = published.strftime("%Y-%m-%dT%H:%M:%SZ")
+        names = "".join(f"<author><name>{escape(a)}</name></author>" for a in authors)
+        tags = "".join(f'<category term="{c}"/>' for c in categories)
+        return (
+            f"<entry><id>http://arxiv.org/abs/{arxiv_id}v1</id>"
+            f"<published>{stamp}</published><title>{escape(title)}</title>"
+            f"<summary>{escape(summary)}</summary>{names}"
+            f'<link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}v1"/>'
+            f'<arxiv:primary_category term="{categories[0]}"/>{tags}</entry>'
+        )
+
+    @staticmethod
+    def page(entries: list[str], total: int | None = None) -> bytes:
+        """An arXiv API response holding `entries` out of `total` results."""
+        total = len(entries) if total is None else total
+        return (
+            '<feed xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:arxiv="http://arxiv.org/schemas/atom" '
+            'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+            f"<opensearch:totalResults>{total}</opensearch:totalResults>"
+            f"{''.join(entries)}</feed>"
+        ).encode("utf-8")
+
+
+@pytest.fixture
+def arxiv_api(monkeypatch):
+    """Serve `iter_arxiv` from FakeArxivAPI, without the delay between requests."""
+    api = FakeArxivAPI()
+    monkeypatch.setattr("arxivrec.dataset.fetcher._request_page", api)
+    monkeypatch.setattr("arxivrec.dataset.fetcher._ARXIV_DELAY_SECONDS", 0.0)
+    return api
@@ -0,0 +1,21 @@
+import numpy as np
+
+from arxivrec.engine.assignment import assign_to_topics, near_duplicate_of
+
+
+def test_near_duplicate_of_maps_to_earliest_kept_row():
+    angles = np.radians([0, 20, 40, 90, 0])
+    embeddings = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+    # cos(20°) = 0.94 is a duplicate, cos(40°) = 0.77 is not: the 40° paper is
+    # kept although it is close to the 20° one, which was collapsed into 0°
+    representative = near_duplicate_of(embeddings, threshold=0.9, block_size=2)
+
+    assert representative.tolist() == [0, 0, 2, 3, 0]
+
+
+def test_assign_to_topics_picks_best_allowed_topic():
+    sims = np.array([[0.9, 0.2, 0.5], [0.8, 0.7, 0.1]])
+    allowed = np.array([[False, True, False], [True, True, False]])
+
+    assert assign_to_topics(sims, allowed).tolist() == [1, 1, -1]
@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pandas as pd
+
+from arxivrec.async_pipeline import AsyncPipelineRunner, notify_all
+from arxivrec.dataset.fetcher import BaseFetcher
+from arxivrec.engine.ranker import BaseRanker
+from arxivrec.notify.notification import BaseNotifier
+from arxivrec.pipeline import LLMPipeline
+from arxivrec.topic import Topic
+
+
+class SlowFetcher(BaseFetcher):
+    def __init__(self, title: str, delay: float = 0.2):
+        self.title = title
+        self.delay = delay
+
+    def fetch(self, **kwargs) -> pd.DataFrame:
+        time.sleep(self.delay)
+        if not self.title:
+            return pd.DataFrame()
+        return pd.DataFrame(
+            {
+                "id": [self.title],
+                "title": [self.title],
+                "combined_text": [self.title],
+            }
+        )
+
+
+class SlowRanker(BaseRanker):
+    def rank(self, user_interest: str, top_papers_df: pd.DataFrame) -> pd.DataFrame:
+        time.sleep(0.2)
+        return top_papers_df.assign(reasoning=user_interest)
+
+
+class RecordingNotifier(BaseNotifier):
+    def __init__(self):
+        self.bodies: list[str] = []
+
+    def notify(self, subject: str = "", body_html: str = "", **kwargs):
+        self.bodies.append(body_html)
+
+
+def make_pipeline(topic_id: str, fetcher: BaseFetcher, encoder) -> LLMPipeline:
+    return LLMPipeline(
+        topic=Topic(id=topic_id, description=topic_id),
+        simsearch_top_k=5,
+        fetcher=fetcher,
+        encoder=encoder,
+        llm_ranker=SlowRanker(),
+        notifier_list=[],
+    )
+
+
+def test_runner_overlaps_topics(fake_encoder):
+    pipelines = [
+        make_pipeline(f"t{i}", SlowFetcher(f"paper {i}"), fake_encoder)
+        for i in range(4)
+    ]
+    runner = AsyncPipelineRunner(pipelines, fetch_concurrency=4, llm_concurrency=4)
+
+    start = time.perf_counter()
+    results = asyncio.run(runner.recommend())
+    elapsed = time.perf_counter() - start
+
+    assert sorted(results) == ["t0", "t1", "t2", "t3"]
+    assert results["t2"]["title"].tolist() == ["paper 2"]
+    # Sequential would take 4 x (0.2 fetch + 0.2 rank) = 1.6s
+    assert elapsed < 1.0
+
+
+def test_runner_streams_topics_with_a_batch_size(fake_encoder):
+    pipeline = make_pipeline("t", SlowFetcher("paper", delay=0), fake_encoder)
+    pipeline.stream_batch_size = 1
+    calls = []
+    stream_search = pipeline.stream_search
+    pipeline.stream_search = lambda: calls.append("stream") or stream_search()
+
+    results = asyncio.run(AsyncPipelineRunner([pipeline]).recommend())
+
+    assert calls == ["stream"]
+    assert results["t"]["title"].tolist() == ["paper"]
+
+
+def test_runner_ranks_a_paper_shared_by_topics_once(fake_encoder):
+    pipelines = [
+        make_pipeline(topic_id, SlowFetcher("graph networks", delay=0), fake_encoder)
+        for topic_id in ("graph networks", "vision")
+    ]
+
+    results = asyncio.run(AsyncPipelineRunner(pipelines).recommend())
+
+    assert list(results) == ["graph networks"]
+
+
+def test_runner_isolates_failing_topic(fake_encoder):
+    pipelines = [
+        make_pipeline("empty", SlowFetcher("", delay=0), fake_encoder),
+        make_pipeline("ok", SlowFetcher("paper", delay=0), fake_encoder),
+    ]
+
+    results = asyncio.run(AsyncPipelineRunner(pipelines).recommend())
+
+    assert list(results) == ["ok"]
+
+
+def test_notify_all_sends_through_every_notifier():
+    notifiers = [RecordingNotifier(), RecordingNotifier()]
+
+    asyncio.run(notify_all(notifiers, subject="s", body_html="<p>hi</p>"))
+
+    assert [n.bodies for n in notifiers] == [["<p>hi</p>"], ["<p>hi</p>"]]
@@ -0,0 +1,125 @@
+import datetime
+import json
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from arxivrec.dataset.backfill import Backfill, snapshot_record
+from arxivrec.dataset.store import SOURCE_ARXIV, PaperStore
+
+
+def snapshot_line(paper_id: str, created: str, categories: str = "cs.LG") -> str:
+    return json.dumps(
+        {
+            "id": paper_id,
+            "title": f"Paper\n  {paper_id}",
+            "abstract": "  An abstract\nover two lines.\n",
+            "categories": categories,
+            "versions": [{"version": "v1", "created": created}],
+            "authors_parsed": [["Doe", "Jane", ""], ["Roe", "R.", ""]],
+        }
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PaperStore(tmp_path)
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "arxiv-metadata-oai-snapshot.json"
+    lines = [
+        snapshot_line("2401.00001", "Mon, 1 Jan 2024 10:00:00 GMT"),
+        snapshot_line("2401.00002", "Tue, 2 Jan 2024 10:00:00 GMT", "math.AG"),
+        snapshot_line("2401.00003", "Wed, 3 Jan 2024 10:00:00 GMT", "cs.CL cs.LG"),
+        snapshot_line("2301.00004", "Sun, 1 Jan 2023 10:00:00 GMT"),
+        snapshot_line("2401.00005", "Thu, 4 Jan 2024 10:00:00 GMT"),
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_snapshot_record_matches_fetcher_columns():
+    record = snapshot_record(
+        json.loads(snapshot_line("2401.00003", "Wed, 3 Jan 2024 10:00:00 GMT"))
+    )
+    assert record["title"] == "Paper 2401.00003"
+    assert record["authors"] == ["Jane Doe", "R. Roe"]
+    assert record["categories"] == ["cs.LG"]
+    assert record["published"].isoformat() == "2024-01-03T10:00:00+00:00"
+    assert record["combined_text"].startswith("Title: Paper 2401.00003; Abstract: An")
+
+
+def test_snapshot_backfill_filters_and_encodes_in_batches(store, snapshot):
+    class RecordingEncoder:
+        def __init__(self):
+            self.batches = []
+
+        def encode(self, texts, ids=None):
+            self.batches.append(ids)
+
+    encoder = RecordingEncoder()
+    backfill = Backfill(store, encoder=encoder, batch_size=2, encode_batch_size=1)
+    stats = backfill.run_snapshot(
+        snapshot, ["cs.LG"], datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)
+    )
+
+    assert stats["papers"] == stats["new"] == 3
+    assert encoder.batches == [["2401.00001"], ["2401.00003"], ["2401.00005"]]
+    assert sorted(store.read(SOURCE_ARXIV)["id"]) == [
+        "2401.00001",
+        "2401.00003",
+        "2401.00005",
+    ]
+
+
+def test_snapshot_backfill_resumes_from_checkpoint(store, snapshot):
+    start, end = datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)
+    backfill = Backfill(store, batch_size=2)
+    batches = backfill._snapshot_batches(snapshot, 0, ["cs.LG"], start, end)
+    df, offset = next(batches)
+    backfill._ingest(df)
+    key = f"backfill:snapshot:{snapshot.resolve()}"
+    store.set_cursor(
+        key, start=start.isoformat(), end=end.isoformat(), categories="cs.LG"
+    )
+    store.set_cursor(key, offset=offset)
+
+    resumed = Backfill(store, batch_size=2).run_snapshot(
+        snapshot, ["cs.LG"], start, end
+    )
+
+    assert resumed["papers"] == 1  # only 2401.00005 is left after the checkpoint
+    assert len(store.read(SOURCE_ARXIV)) == 3
+
+
+@patch("arxivrec.dataset.backfill.search_arxiv")
+def test_api_backfill_slices_by_date_and_resumes(mock_search, store):
+    def fake_search(categories, lookback_days, max_results, since, until, **kwargs):
+        if since.day == 3 and mock_search.call_count == 3:
+            raise ConnectionError("arXiv API unavailable")
+        return pd.DataFrame(
+            {
+                "id": [f"2401.0000{since.day}"],
+                "published": [since + datetime.timedelta(hours=1)],
+                "combined_text": ["text"],
+            }
+        )
+
+    mock_search.side_effect = fake_search
+    start, end = datetime.date(2024, 1, 1), datetime.date(2024, 1, 4)
+
+    with pytest.raises(ConnectionError):
+        Backfill(store).run_api(["cs.LG"], start, end, slice_days=1)
+    stats = Backfill(store).run_api(["cs.LG"], start, end, slice_days=1)
+
+    windows = [
+        (c.kwargs["since"].day, c.kwargs["until"]) for c in mock_search.mock_calls
+    ]
+    assert [day for day, _ in windows] == [1, 2, 3, 3, 4]
+    assert windows[0][1].isoformat() == "2024-01-01T23:59:00+00:00"
+    assert stats["papers"] == 2
+    assert len(store.read(SOURCE_ARXIV)) == 4
+    assert store.get_cursor("backfill:api:cs.LG")["done_until"] == "2024-01-05"
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from arxivrec.engine.embedding_cache import EmbeddingCache
+from arxivrec.engine.encoder import TextEncoder
+
+
+@pytest.fixture
+def cached_encoder(fake_sentence_transformer, tmp_path):
+    return TextEncoder(model_name="fake/model", cache_dir=tmp_path)
+
+
+def test_cache_roundtrip_persists_to_disk(tmp_path):
+    cache = EmbeddingCache(tmp_path, "fake/model")
+    keys = [EmbeddingCache.make_key("1", "a"), EmbeddingCache.make_key("2", "b")]
+    cache.put_many(keys, np.eye(2, 3, dtype=np.float32))
+
+    reopened = EmbeddingCache(tmp_path, "fake/model")
+    vectors = reopened.get_many(keys + ["missing:0"])
+
+    assert np.array_equal(vectors[0], [1, 0, 0])
+    assert np.array_equal(vectors[1], [0, 1, 0])
+    assert vectors[2] is None
+
+
+def test_cache_is_scoped_by_model_name(tmp_path):
+    key = EmbeddingCache.make_key("1", "a")
+    EmbeddingCache(tmp_path, "model-a").put_many([key], np.ones((1, 3)))
+
+    assert EmbeddingCache(tmp_path, "model-b").get_many([key]) == [None]
+
+
+def test_encode_only_runs_model_on_misses(cached_encoder):
+    first = cached_encoder.encode(["aa", "bbb"], ids=["1", "2"])
+    second = cached_encoder.encode(["aa", "bbb", "c"], ids=["1", "2", "3"])
+
+    assert cached_encoder.model.calls == [["aa", "bbb"], ["c"]]
+    assert np.array_equal(second[:2], first)
+    assert second.shape == (3, cached_encoder.model.dim)
+
+
+def test_encode_reencodes_when_text_changes(cached_encoder):
+    cached_encoder.encode(["old abstract"], ids=["1"])
+    cached_encoder.encode(["new abstract!"], ids=["1"])
+
+    assert cached_encoder.model.calls == [["old abstract"], ["new abstract!"]]
+
+
+def test_model_not_loaded_when_cache_has_every_text(cached_encoder, tmp_path):
+    cached_encoder.encode(["aa", "bbb"], ids=["1", "2"])
+
+    rerun = TextEncoder(model_name="fake/model", cache_dir=tmp_path)
+    rerun.encode(["aa", "bbb"], ids=["1", "2"])
+
+    assert rerun._model is None
+
+
+def test_cache_appends_without_rewriting_and_recovers_torn_writes(tmp_path):
+    cache = EmbeddingCache(tmp_path, "fake/model")
+    cache.put_many(["1:a"], np.ones((1, 3)))
+    cache.put_many(["2:b"], np.full((1, 3), 2.0))
+    # A run killed after appending a vector, mid-way through its key
+    with open(cache._vectors_path, "ab") as f:
+        f.write(np.zeros(3, dtype=np.float32).tobytes())
+    with open(cache._keys_path, "a") as f:
+        f.write("3:")
+
+    reopened = EmbeddingCache(tmp_path, "fake/model")
+    reopened.put_many(["3:c"], np.full((1, 3), 3.0))
+
+    assert cache._keys_path.read_text() == "1:a\n2:b\n3:c\n"
+    assert [v[0] for v in reopened.get_many(["1:a", "2:b", "3:c"])] == [1, 2, 3]
+
+
+def test_cache_of_another_model_is_cleared(tmp_path):
+    key = EmbeddingCache.make_key("1", "a")
+    first = EmbeddingCache(tmp_path, "model-a")
+    first.put_many([key], np.ones((1, 3)))
+    first._meta_path.write_text('{"model_name": "model-b", "dim": 3}')
+
+    cache = EmbeddingCache(tmp_path, "model-a")
+    cache.put_many([key], np.full((1, 3), 2.0))
+
+    assert len(cache) == 1
+    assert cache._vectors_path.stat().st_size == 3 * 4
+    assert cache.get_many([key])[0][0] == 2
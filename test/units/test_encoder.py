@@ -1,6 +1,10 @@
+import os
+
 import numpy as np
 import pytest
 
+from arxivrec.engine.encoder import TextEncoder, check_parity
+
 
 def test_encode_single_string(vanilla_encoder):
     text = "Machine Learning in Healthcare"
@@ -12,12 +16,22 @@ def test_encode_single_string(vanilla_encoder):
 
 
 def test_cosine_sim_identity(vanilla_encoder):
-    # A vector should have a similarity of ~1.0 with itself
+    # A vector should have a similarity of ~1.0 with itself; like the output of
+    # `encode`, it is unit-norm
     vec = np.random.rand(1, 384)
+    vec /= np.linalg.norm(vec)
     sim = vanilla_encoder.cosine_sim(vec, vec)
     assert sim == pytest.approx(1.0)
 
 
+def test_cosine_sim_normalizes_when_encoder_does_not():
+    encoder = TextEncoder("fake/model", normalize=False)
+    vec1, vec2 = np.array([[3.0, 4.0]]), np.array([[6.0, 8.0], [0.0, 2.0]])
+
+    assert encoder.cosine_sim(vec1, vec2) == pytest.approx(np.array([[1.0, 0.8]]))
+    assert encoder.get_top_k_similar(vec1, vec2, k=1) == [0]
+
+
 def test_cosine_sim_orthogonal(vanilla_encoder):
     # Two orthogonal vectors should have a similarity of ~0.0
     vec1 = np.array([[1, 0, 0]])
@@ -33,3 +47,43 @@ def test_get_top_k_dimensions(vanilla_encoder):
 
     assert len(indices) == 3
     assert all(isinstance(i, (int, np.integer)) for i in indices)
+
+
+def test_multi_process_pool_used_for_large_inputs(fake_sentence_transformer):
+    threads_before = os.environ.get("OMP_NUM_THREADS")
+    encoder = TextEncoder("fake/model", batch_size=2, num_workers=3, torch_threads=5)
+    texts = [f"paper {i}" for i in range(6)]
+
+    small = encoder.encode(texts[:5])
+    large = encoder.encode(texts)
+
+    [pool] = encoder.model.pools
+    assert pool["devices"] == ["cpu"] * 3
+    assert pool["threads"] == "5"
+    assert pool["calls"] == [6]  # five texts stay in-process
+    np.testing.assert_allclose(large[:5], small)
+
+    encoder.close()
+    assert pool["stopped"]
+    assert os.environ.get("OMP_NUM_THREADS") == threads_before
+
+
+def test_check_parity_against_reference(fake_sentence_transformer):
+    reference = TextEncoder("fake/model")
+    docs = [f"paper about topic{i} and topic{i % 7}" for i in range(40)]
+    queries = ["topic3", "topic5 topic1"]
+
+    assert check_parity(reference, reference, queries, docs, k=5) == 1.0
+
+    rng = np.random.default_rng(0)
+    noisy = TextEncoder("fake/model")
+    noisy.model.encode = lambda texts, **kwargs: rng.random((len(texts), 16))
+    with pytest.raises(ValueError, match="below the 90% threshold"):
+        check_parity(noisy, reference, queries, docs, k=5)
+
+
+def test_backend_validation(fake_sentence_transformer):
+    with pytest.raises(ValueError, match="Unknown encoder backend"):
+        TextEncoder("fake/model", backend="tpu")
+    with pytest.raises(ValueError, match="num_workers"):
+        TextEncoder("fake/model", backend="onnx", num_workers=2)
@@ -1,9 +1,12 @@
-from unittest.mock import MagicMock, patch
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import pytest
 
-from arxivrec.dataset.fetcher import ArxivFetcher
+from arxivrec.dataset.fetcher import ArxivFetcher, iter_arxiv
+from arxivrec.dataset.header_cache import HeaderTextCache
 from arxivrec.topic import Topic
 
 
@@ -17,22 +20,12 @@ def fetcher(topic):
     return ArxivFetcher(topic=topic, lookback_days=1, max_results=5)
 
 
-@patch("arxivrec.dataset.fetcher.arxiv.Client")
-@patch("arxivrec.dataset.fetcher.arxiv.Search")
-def test_fetch_returns_dataframe(mock_search, mock_client, fetcher):
-    # Mock arxiv result
-    mock_result = MagicMock()
-    mock_result.entry_id = "http://arxiv.org/abs/1234.5678"
-    mock_result.title = "Test Title"
-    mock_result.authors = [MagicMock(name="Author", name__="Alice")]
-    mock_result.authors[0].name = "Alice"
-    mock_result.summary = "Test abstract\nwith newline."
-    mock_result.published = pd.Timestamp.now(tz="UTC")
-    mock_result.primary_category = "cs.LG"
-    mock_result.pdf_url = "http://arxiv.org/pdf/1234.5678"
-
-    # Mock client.results to return a list of mock results
-    mock_client.return_value.results.return_value = [mock_result]
+def test_fetch_returns_dataframe(arxiv_api, fetcher):
+    arxiv_api.pages = [
+        arxiv_api.page(
+            [arxiv_api.entry("1234.5678", "Test\n  Title", summary="Test\nabstract")]
+        )
+    ]
 
     df = fetcher.fetch()
     assert isinstance(df, pd.DataFrame)
@@ -45,53 +38,104 @@ def test_fetch_returns_dataframe(mock_search, mock_client, fetcher):
     assert "primary_category" in df.columns
     assert "url" in df.columns
     assert "combined_text" in df.columns
+    assert df.iloc[0]["id"] == "1234.5678"
     assert df.iloc[0]["title"] == "Test Title"
+    assert df.iloc[0]["abstract"] == "Test abstract"
     assert df.iloc[0]["authors"] == ["Alice"]
+    assert df.iloc[0]["url"] == "http://arxiv.org/pdf/1234.5678v1"
+    assert arxiv_api.requests[0]["search_query"] == "cat:cs.LG OR cat:cs.AI"
 
 
-@patch("arxivrec.dataset.fetcher.arxiv.Client")
-@patch("arxivrec.dataset.fetcher.arxiv.Search")
-def test_fetch_breaks_on_old_paper(mock_search, mock_client, fetcher):
-    # Mock arxiv result with old published date
-    mock_result = MagicMock()
-    mock_result.entry_id = "http://arxiv.org/abs/0000.0000"
-    mock_result.title = "Old Paper"
-    mock_result.authors = [MagicMock(name="Author", name__="Bob")]
-    mock_result.authors[0].name = "Bob"
-    mock_result.summary = "Old abstract."
-    mock_result.published = pd.Timestamp("2000-01-01", tz="UTC")
-    mock_result.primary_category = "cs.AI"
-    mock_result.pdf_url = "http://arxiv.org/pdf/0000.0000"
-
-    mock_client.return_value.results.return_value = [mock_result]
+def test_fetch_breaks_on_old_paper(arxiv_api, fetcher):
+    old = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+    arxiv_api.pages = [arxiv_api.page([arxiv_api.entry("0000.0000", published=old)])]
 
     df = fetcher.fetch()
     # Should break before adding old paper
     assert df.empty
 
 
-@patch("arxivrec.dataset.fetcher.arxiv.Client")
-@patch("arxivrec.dataset.fetcher.arxiv.Search")
-def test_fetch_with_fallback(mock_search, mock_client, fetcher):
-    mock_result = MagicMock()
-    mock_result.entry_id = "http://arxiv.org/abs/9999.9999"
-    mock_result.title = "Fallback Paper"
-    mock_result.authors = [MagicMock(name="Alice")]
-    mock_result.authors[0].name = "Alice"
-    mock_result.summary = "Fallback abstract."
-    mock_result.published = pd.Timestamp.now(tz="UTC")
-    mock_result.primary_category = "cs.LG"
-    mock_result.pdf_url = "http://arxiv.org/pdf/9999.9999"
-
-    # 2. Use side_effect to simulate the sequence of calls
-    # Call 1: Returns empty list (triggers fallback)
-    # Call 2: Returns our mock result
-    mock_client.return_value.results.side_effect = [[], [mock_result]]
+def test_fetch_with_fallback(arxiv_api, fetcher):
+    # Call 1: empty page (triggers fallback); call 2: our paper
+    arxiv_api.pages = [
+        arxiv_api.page([]),
+        arxiv_api.page([arxiv_api.entry("9999.9999", "Fallback")]),
+    ]
 
     df = fetcher.fetch()
 
-    # 4. Assertions
     assert not df.empty
-    assert df.iloc[0]["title"] == "Fallback Paper"
-    # Verify that the search was actually called twice
-    assert mock_client.return_value.results.call_count == 2
+    assert df.iloc[0]["title"] == "Fallback"
+    assert len(arxiv_api.requests) == 2
+
+
+def test_iter_arxiv_pages_and_retries_empty_pages(arxiv_api):
+    entries = [arxiv_api.entry(f"2401.0000{i}") for i in range(5)]
+    arxiv_api.pages = [
+        arxiv_api.page(entries[:2], total=5),
+        arxiv_api.page([], total=5),  # arXiv's occasional empty page mid-result
+        arxiv_api.page(entries[2:4], total=5),
+        arxiv_api.page(entries[4:], total=5),
+    ]
+
+    records = list(iter_arxiv(["cs.LG"], 1, max_results=10, page_size=2))
+
+    assert [r["id"] for r in records] == [f"2401.0000{i}" for i in range(5)]
+    assert [r["start"] for r in arxiv_api.requests] == [0, 2, 2, 4]
+
+
+def test_iter_arxiv_rate_limit_is_shared_across_threads(arxiv_api, monkeypatch):
+    monkeypatch.setattr("arxivrec.dataset.fetcher._ARXIV_DELAY_SECONDS", 0.1)
+    times = []
+
+    def timed_api(params, refresh=False):
+        times.append(time.monotonic())
+        return arxiv_api(params, refresh)
+
+    monkeypatch.setattr("arxivrec.dataset.fetcher._request_page", timed_api)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda c: list(iter_arxiv([c], 1, 10)), ["a", "b", "c", "d"]))
+
+    gaps = [b - a for a, b in zip(sorted(times), sorted(times)[1:])]
+    assert len(times) == 4
+    assert min(gaps) >= 0.09
+
+
+def test_header_cache_dedups_concurrent_and_repeated_extractions(tmp_path):
+    calls = []
+
+    def slow_extractor(url):
+        calls.append(url)
+        time.sleep(0.1)
+        return "Google DeepMind"
+
+    cache = HeaderTextCache(tmp_path, extractor=slow_extractor)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        texts = list(pool.map(lambda _: cache.get("2408.0001", "url"), range(4)))
+
+    # A fresh cache on the same directory reads the text from disk
+    reopened = HeaderTextCache(tmp_path, extractor=slow_extractor)
+
+    assert texts == ["Google DeepMind"] * 4
+    assert reopened.get("2408.0001", "url") == "Google DeepMind"
+    assert calls == ["url"]
+
+
+def test_org_filter_reuses_shared_header_cache():
+    calls = []
+
+    def extractor(url):
+        calls.append(url)
+        return "OpenAI" if url.endswith("1") else "Some University"
+
+    cache = HeaderTextCache(extractor=extractor)
+    df = pd.DataFrame({"id": ["p1", "p2"], "url": ["u1", "u2"]})
+
+    openai_topic = Topic(org_keywords=["OpenAI"])
+    uni_topic = Topic(org_keywords=["University"])
+    kept_openai = ArxivFetcher(openai_topic, header_cache=cache)._filter_by_org(df)
+    kept_uni = ArxivFetcher(uni_topic, header_cache=cache)._filter_by_org(df)
+
+    assert kept_openai["id"].tolist() == ["p1"]
+    assert kept_uni["id"].tolist() == ["p2"]
+    assert sorted(calls) == ["u1", "u2"]
@@ -0,0 +1,87 @@
+import datetime
+import threading
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from arxivrec.dataset.hf_fetcher import HFDailyPapersFetcher, get_session
+from arxivrec.topic import Topic
+
+TODAY = datetime.date.today()
+DAY = datetime.timedelta(days=1)
+
+
+def make_item(paper_id: str, upvotes: int) -> dict:
+    return {
+        "paper": {
+            "id": paper_id,
+            "title": f"Title {paper_id}",
+            "summary": "Line one\nline two",
+            "publishedAt": "2024-01-01T00:00:00.000Z",
+            "upvotes": upvotes,
+            "authors": [{"name": "Alice"}, {"name": "Hidden", "hidden": True}],
+        }
+    }
+
+
+def test_fetch_requests_all_days_concurrently_and_merges_them():
+    listings = {
+        TODAY: [make_item("a", 10)],
+        TODAY - datetime.timedelta(days=1): [make_item("a", 4), make_item("b", 2)],
+        TODAY - datetime.timedelta(days=2): [],
+    }
+    # Every day's request has to be in flight before any of them can return
+    barrier = threading.Barrier(len(listings), timeout=5)
+
+    def fetch_for_date(d):
+        barrier.wait()
+        return listings[d]
+
+    fetcher = HFDailyPapersFetcher(Topic(source="huggingface"), lookback_days=3)
+    with patch.object(fetcher, "_fetch_for_date", side_effect=fetch_for_date):
+        df = fetcher.fetch()
+
+    # Papers listed on several days keep their latest listing
+    assert df["id"].tolist() == ["a", "b"]
+    assert df["upvotes"].tolist() == [10, 2]
+    assert df.iloc[0]["authors"] == ["Alice"]
+    assert df.iloc[0]["combined_text"] == "Title: Title a; Abstract: Line one line two"
+
+
+def test_fetch_skips_a_failing_day_and_keeps_the_others():
+    yesterday = TODAY - datetime.timedelta(days=1)
+
+    def fetch_for_date(d):
+        if d == yesterday:
+            raise requests.HTTPError("500 Server Error")
+        return [make_item(f"paper-{d}", 1)]
+
+    fetcher = HFDailyPapersFetcher(Topic(source="huggingface"), lookback_days=3)
+    with patch.object(fetcher, "_fetch_for_date", side_effect=fetch_for_date):
+        df = fetcher.fetch()
+
+    assert df["id"].tolist() == [f"paper-{TODAY}", f"paper-{TODAY - 2 * DAY}"]
+    with patch.object(fetcher, "_fetch_for_date", side_effect=requests.HTTPError):
+        with pytest.raises(requests.HTTPError):
+            fetcher.fetch()
+
+
+def test_fetch_filters_upvotes_and_handles_empty_window():
+    fetcher = HFDailyPapersFetcher(
+        Topic(source="huggingface"), min_upvotes=3, lookback_days=2
+    )
+    with patch.object(
+        fetcher, "_fetch_for_date", return_value=[make_item("a", 5), make_item("b", 1)]
+    ):
+        assert fetcher.fetch()["id"].tolist() == ["a"]
+    with patch.object(fetcher, "_fetch_for_date", return_value=[]):
+        assert fetcher.fetch().empty
+
+
+def test_session_is_shared_and_retries_with_backoff():
+    session = get_session()
+    assert get_session() is session
+    retry = session.get_adapter("https://huggingface.co").max_retries
+    assert retry.total == 3 and retry.backoff_factor > 0
+    assert 503 in retry.status_forcelist
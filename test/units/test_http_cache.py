@@ -0,0 +1,206 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from arxivrec.dataset.parser import get_header_text
+from arxivrec.utils.http_cache import (
+    CachingHTTPAdapter,
+    HTTPResponseCache,
+    mount_cache,
+    set_http_cache,
+)
+
+BODY = b"0123456789" * 100
+
+
+class Origin:
+    """Local server whose response headers each test sets."""
+
+    def __init__(self):
+        self.headers = {"ETag": '"v1"', "Cache-Control": "no-cache"}
+        self.requests: list[dict] = []
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                origin.requests.append(dict(self.headers))
+                etag = origin.headers.get("ETag")
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                body = BODY
+                status = 200
+                if self.headers.get("Range"):
+                    first, last = self.headers["Range"][6:].split("-")
+                    body = BODY[int(first) : int(last) + 1]
+                    status = 206
+                self.send_response(status)
+                for name, value in origin.headers.items():
+                    self.send_header(name, value)
+                if status == 206:
+                    end = int(first) + len(body) - 1
+                    self.send_header(
+                        "Content-Range", f"bytes {first}-{end}/{len(BODY)}"
+                    )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(
+            target=self.httpd.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/file"
+
+
+@pytest.fixture
+def origin():
+    server = Origin()
+    yield server
+    server.httpd.shutdown()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HTTPResponseCache(tmp_path / "http.sqlite")
+    yield cache
+    cache.close()
+
+
+def make_session(cache) -> requests.Session:
+    session = requests.Session()
+    session.mount("http://", CachingHTTPAdapter(cache))
+    return session
+
+
+def test_revalidates_with_etag_and_serves_body_on_304(origin, cache):
+    session = make_session(cache)
+    assert session.get(origin.url).content == BODY
+    response = session.get(origin.url)
+
+    assert response.status_code == 200 and response.content == BODY
+    assert origin.requests[1]["If-None-Match"] == '"v1"'
+    assert cache.stats()["revalidated"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_fresh_responses_need_no_request_and_survive_restarts(origin, cache, tmp_path):
+    origin.headers = {"Cache-Control": "max-age=600"}
+    make_session(cache).get(origin.url)
+
+    reopened = HTTPResponseCache(tmp_path / "http.sqlite")
+    assert make_session(reopened).get(origin.url).content == BODY
+    assert len(origin.requests) == 1
+    assert reopened.stats()["hits"] == 1
+    reopened.close()
+
+
+def test_no_store_and_changed_etag_refetch(origin, cache):
+    session = make_session(cache)
+    origin.headers = {"Cache-Control": "no-store"}
+    session.get(origin.url)
+    session.get(origin.url)
+    assert "If-None-Match" not in origin.requests[1]
+
+    origin.headers = {"ETag": '"v2"', "Cache-Control": "no-cache"}
+    session.get(origin.url)
+    origin.headers["ETag"] = '"v3"'
+    assert session.get(origin.url).status_code == 200
+    assert cache.stats()["revalidated"] == 0
+
+
+def test_ranges_are_cached_separately(origin, cache):
+    origin.headers = {"Cache-Control": "max-age=600"}
+    session = make_session(cache)
+    for _ in range(2):
+        head = session.get(origin.url, headers={"Range": "bytes=0-9"})
+        assert head.status_code == 206 and head.content == BODY[:10]
+    tail = session.get(origin.url, headers={"Range": "bytes=990-999"})
+
+    assert tail.content == BODY[990:]
+    assert len(origin.requests) == 2
+
+
+def test_streamed_responses_are_not_buffered_or_stored(origin, cache):
+    origin.headers = {"Cache-Control": "max-age=600"}
+    session = make_session(cache)
+    with session.get(origin.url, stream=True) as response:
+        assert response.raw.read(5, decode_content=True) == b"01234"
+        assert not response._content_consumed
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_pdf_header_ranges_are_served_from_cache(origin, cache, monkeypatch):
+    origin.headers = {"ETag": '"v1"', "Cache-Control": "max-age=600"}
+    # Stands in for pdfplumber: reads the whole (sparse) file, so every block
+    monkeypatch.setattr(
+        "arxivrec.dataset.parser._first_page_text", lambda fp: fp.read().decode()
+    )
+    session = make_session(cache)
+
+    first = get_header_text(origin.url, max_bytes=100, session=session)
+    num_requests = len(origin.requests)
+    second = get_header_text(origin.url, max_bytes=100, session=session)
+
+    assert first == second == BODY.decode()
+    assert num_requests == 2  # the leading range, then the blocks after it
+    assert len(origin.requests) == num_requests
+
+
+def test_unusable_responses_are_not_stored_and_no_cache_refetches(origin, cache):
+    origin.headers = {}
+    session = make_session(cache)
+    session.get(origin.url)
+    assert cache.stats()["entries"] == 0
+
+    origin.headers = {"Cache-Control": "max-age=600"}
+    session.get(origin.url)
+    session.get(origin.url, headers={"Cache-Control": "no-cache"})
+    assert len(origin.requests) == 3
+    assert cache.stats()["entries"] == 1
+
+
+def test_evicts_least_recently_used_beyond_max_bytes(origin, tmp_path):
+    origin.headers = {"Cache-Control": "max-age=600"}
+    cache = HTTPResponseCache(tmp_path / "http.sqlite", max_bytes=2500)
+    session = make_session(cache)
+    for query in ["a", "b", "a", "c"]:
+        session.get(f"{origin.url}?{query}")
+
+    session.get(f"{origin.url}?a")
+    session.get(f"{origin.url}?b")
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["hits"] == 2  # "a" twice; "b" was evicted
+    cache.close()
+
+
+def test_default_ttl_applies_without_caching_headers(origin, tmp_path):
+    origin.headers = {}
+    cache = HTTPResponseCache(tmp_path / "http.sqlite", default_ttl_seconds=60)
+    session = make_session(cache)
+    session.get(origin.url)
+    session.get(origin.url)
+    assert len(origin.requests) == 1
+    cache.close()
+
+
+def test_mounted_sessions_use_the_process_wide_cache(origin, cache):
+    origin.headers = {"Cache-Control": "max-age=600"}
+    session = mount_cache(requests.Session())
+    session.get(origin.url)
+
+    set_http_cache(cache)
+    try:
+        session.get(origin.url)
+        session.get(origin.url)
+    finally:
+        set_http_cache(None)
+    assert len(origin.requests) == 2
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from arxivrec.engine.index import INDEX_REGISTRY, VectorIndex
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(50, 8)).astype(np.float32)
+
+
+@pytest.fixture(params=["numpy", "hnsw"])
+def backend(request):
+    if request.param == "hnsw":
+        pytest.importorskip("hnswlib")
+    return request.param
+
+
+def test_index_finds_exact_match(backend, vectors):
+    index = INDEX_REGISTRY[backend]()
+    index.add([f"p{i}" for i in range(50)], vectors)
+
+    ids, scores = index.search(vectors[[7, 21]], k=3)
+
+    assert [row[0] for row in ids] == ["p7", "p21"]
+    assert scores[0][0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_index_search_respects_allowed_ids(backend, vectors):
+    index = INDEX_REGISTRY[backend]()
+    index.add([f"p{i}" for i in range(50)], vectors)
+
+    ids, _ = index.search(vectors[[7]], k=5, allowed_ids={"p1", "p2", "missing"})
+
+    assert sorted(ids[0]) == ["p1", "p2"]
+
+
+def test_index_skips_known_ids_and_roundtrips(backend, vectors, tmp_path):
+    index = VectorIndex.open(tmp_path / "idx", backend=backend)
+    assert index.add(["a", "b"], vectors[:2]) == 2
+    assert index.add(["b", "c"], vectors[1:3]) == 1
+    index.save()
+
+    reopened = VectorIndex.open(tmp_path / "idx", backend=backend)
+    ids, _ = reopened.search(vectors[[2]], k=1)
+
+    assert len(reopened) == 3
+    assert "c" in reopened
+    assert ids == [["c"]]
+
+
+def test_index_replaces_vectors_whose_text_changed(backend, vectors, tmp_path):
+    index = VectorIndex.open(tmp_path / "idx", backend=backend)
+    index.add(["a", "b"], vectors[:2], text_hashes=["h1", "h1"])
+
+    assert index.add(["a", "b"], vectors[:2], text_hashes=["h1", "h1"]) == 0
+    assert index.add(["a"], vectors[[5]], text_hashes=["h2"]) == 1
+    index.save()
+
+    reopened = VectorIndex.open(tmp_path / "idx", backend=backend)
+    ids, scores = reopened.search(vectors[[0]], k=2)
+
+    assert len(reopened) == len(reopened.ids) == 2  # superseded row dropped on save
+    assert reopened.is_current("a", "h2") and not reopened.is_current("a", "h1")
+    assert sorted(ids[0]) == ["a", "b"]
+    assert scores[0][0] < 0.999
+    assert reopened.search(vectors[[5]], k=1)[0] == [["a"]]
+
+
+def test_index_save_skips_unchanged_index(vectors, tmp_path):
+    index = VectorIndex.open(tmp_path / "idx")
+    index.add(["a"], vectors[:1])
+    index.save()
+    saved_at = (tmp_path / "idx" / "vectors.npy").stat().st_mtime_ns
+
+    reopened = VectorIndex.open(tmp_path / "idx")
+    reopened.save()
+
+    assert (tmp_path / "idx" / "vectors.npy").stat().st_mtime_ns == saved_at
@@ -1,6 +1,8 @@
+import asyncio
 from types import SimpleNamespace
 
 from arxivrec.engine.llm import LLM_REGISTRY
+from arxivrec.utils.env import load_env
 
 
 def test_ollama_call_uses_registered_class_and_default_options(monkeypatch):
@@ -17,7 +19,7 @@ def test_ollama_call_uses_registered_class_and_default_options(monkeypatch):
         )
         return {"response": '{"papers": []}'}
 
-    monkeypatch.setattr("arxivrec.engine.llm.ollama.generate", fake_generate)
+    monkeypatch.setattr("ollama.generate", fake_generate)
 
     client = LLM_REGISTRY["ollama"](model_name="llama3.2:3b")
     response = client.call("rank these papers")
@@ -62,3 +64,59 @@ def test_openai_call_uses_registered_class_and_forwards_kwargs(monkeypatch):
     assert call_kwargs["api_key"] == "test-key"
     assert call_kwargs["api_base"] == "http://localhost:8000/v1"
     assert call_kwargs["timeout"] == 30
+
+
+def test_call_many_preserves_order_and_limits_concurrency(monkeypatch):
+    in_flight = {"now": 0, "max": 0}
+
+    class FakeAsyncClient:
+        instances = 0
+
+        def __init__(self, host=None):
+            FakeAsyncClient.instances += 1
+
+        async def generate(self, *, model, prompt, format, options):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return {"response": prompt}
+
+    monkeypatch.setattr("ollama.AsyncClient", FakeAsyncClient)
+
+    client = LLM_REGISTRY["ollama"](model_name="llama3.2:3b", max_concurrency=2)
+    prompts = [f"prompt {i}" for i in range(6)]
+    responses = asyncio.run(client.call_many(prompts))
+
+    assert [r["response"] for r in responses] == prompts
+    assert in_flight["max"] == 2
+    assert FakeAsyncClient.instances == 1
+
+
+def test_openai_acall_uses_acompletion(monkeypatch):
+    class FakeResponse:
+        choices = [SimpleNamespace(message=SimpleNamespace(content='{"ok": 1}'))]
+
+    async def fake_acompletion(**kwargs):
+        assert kwargs["messages"] == [{"role": "user", "content": "hi"}]
+        return FakeResponse()
+
+    fake_litellm = SimpleNamespace(acompletion=fake_acompletion)
+    monkeypatch.setitem(__import__("sys").modules, "litellm", fake_litellm)
+
+    client = LLM_REGISTRY["openai"](model_name="openai/gpt-5.1-instant")
+    response = asyncio.run(client.acall("hi"))
+
+    assert response["response"] == '{"ok": 1}'
+
+
+def test_client_reads_api_key_from_dotenv_without_main(monkeypatch, tmp_path):
+    (tmp_path / ".env").write_text("OPENAI_API_KEY=from-dotenv\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setitem(__import__("sys").modules, "litellm", SimpleNamespace())
+    load_env.cache_clear()
+
+    client = LLM_REGISTRY["openai"](model_name="openai/gpt-5.1-instant")
+
+    assert client.api_key == "from-dotenv"
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from arxivrec.engine.llm import BaseLLM
+from arxivrec.engine.llm_cache import CachedLLM, LLMResponseCache
+from arxivrec.engine.ranker import LLMRanker
+
+
+class CountingLLM(BaseLLM):
+    def __init__(self, model_name: str = "fake", options: dict | None = None):
+        super().__init__(model_name, options)
+        self.calls = 0
+
+    def call(self, prompt):
+        self.calls += 1
+        return {"response": f"answer to {prompt}"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(tmp_path / "llm.sqlite")
+
+
+def test_cached_llm_skips_repeated_prompts(cache):
+    client = CountingLLM()
+    cached = CachedLLM(client, cache)
+
+    first = cached.call("rank")
+    cached.store(first)
+    second = cached.call("rank")
+    asyncio.run(cached.acall("rank"))
+
+    assert client.calls == 1
+    assert first["response"] == second["response"] == "answer to rank"
+    assert second["cached"] is True
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3, "entries": 1}
+
+
+class ScriptedLLM(BaseLLM):
+    def __init__(self, answers: list[str]):
+        super().__init__("fake")
+        self.answers = answers
+        self.calls = 0
+
+    def call(self, prompt):
+        self.calls += 1
+        return {"response": self.answers.pop(0)}
+
+
+def test_cache_only_keeps_responses_the_ranker_parsed(cache):
+    client = ScriptedLLM(
+        ['{"papers": [{"id": "p0"', '[{"id": "p0", "reasoning": "r"}]']
+    )
+    ranker = LLMRanker(CachedLLM(client, cache))
+    papers = pd.DataFrame(
+        {
+            "id": ["p0"],
+            "url": ["u"],
+            "title": ["t"],
+            "authors": [["A"]],
+            "abstract": ["a"],
+        }
+    )
+
+    with pytest.raises(json.JSONDecodeError):
+        ranker.rank("interest", papers)
+    assert cache.stats()["entries"] == 0
+
+    for _ in range(2):
+        assert ranker.rank("interest", papers)["id"].tolist() == ["p0"]
+    assert client.calls == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_discard_drops_a_cached_response(cache):
+    client = CountingLLM()
+    cache.put(LLMResponseCache.make_key(client, "rank"), "truncated")
+    cached = CachedLLM(client, cache)
+
+    cached.discard(cached.call("rank"))
+
+    assert cache.stats()["entries"] == 0
+    assert cached.call("rank")["response"] == "answer to rank"
+
+
+def test_cache_key_depends_on_model_and_options():
+    base = LLMResponseCache.make_key(CountingLLM("a", {"temperature": 0}), "p")
+
+    assert base == LLMResponseCache.make_key(CountingLLM("a", {"temperature": 0}), "p")
+    assert base != LLMResponseCache.make_key(CountingLLM("b", {"temperature": 0}), "p")
+    assert base != LLMResponseCache.make_key(CountingLLM("a", {"temperature": 1}), "p")
+
+
+def test_cache_key_depends_on_endpoint():
+    local, remote = CountingLLM("a"), CountingLLM("a")
+    local.host, remote.host = "http://localhost:11434", "http://gpu-box:11434"
+    proxy = CountingLLM("a")
+    proxy.api_base = "http://proxy:4000"
+
+    keys = {LLMResponseCache.make_key(c, "p") for c in (local, remote, proxy)}
+
+    assert len(keys) == 3
+
+
+def test_cache_expires_entries_after_ttl(tmp_path):
+    cache = LLMResponseCache(tmp_path / "llm.sqlite", ttl_seconds=0)
+    cache.put("key", "value")
+
+    assert cache.get("key") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = LLMResponseCache(tmp_path / "llm.sqlite", max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
@@ -0,0 +1,82 @@
+import copy
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from arxivrec.main import validate_config
+from arxivrec.utils.config_parse import load_config
+
+CONFIG_PATH = Path(__file__).parents[2] / "src" / "config.yaml"
+
+# Each of these adds from a few hundred ms (pandas) to seconds (torch) to startup
+HEAVY_MODULES = [
+    "litellm",
+    "ollama",
+    "pandas",
+    "pdfplumber",
+    "pyarrow",
+    "sentence_transformers",
+    "torch",
+]
+
+
+def imported_modules(statement: str) -> set[str]:
+    """Top-level packages imported by `statement`, per `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {
+        line.rsplit("|", 1)[1].strip().split(".")[0]
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import arxivrec.main",
+        "from arxivrec.main import LLM_REGISTRY, NOTIFIER_REGISTRY",
+    ],
+)
+def test_cli_startup_skips_heavy_imports(statement):
+    heavy = imported_modules(statement) & set(HEAVY_MODULES)
+    assert not heavy, f"'{statement}' imports {sorted(heavy)} at startup"
+
+
+@pytest.fixture
+def cfg():
+    return load_config(CONFIG_PATH)
+
+
+def test_validate_accepts_shipped_config(cfg):
+    assert validate_config(cfg) == []
+
+
+def test_validate_reports_every_problem(cfg):
+    broken = copy.deepcopy(cfg)
+    broken["topic"].append(dict(broken["topic"][0]))
+    del broken["topic"][1]["categories"]
+    broken["pipeline"]["mode"] = "batch"
+    broken["models"]["encoder"] = {"name": "m", "backend": "tpu"}
+    broken["models"]["cross_encoder"] = {"name": "ce", "shortlist": 5}
+    broken["models"]["ranker"] = {"gpt": {}}
+    broken["notifiers"].append({"pager": {}})
+
+    errors = validate_config(broken)
+
+    assert errors == [
+        "Topic LLM_Research: arXiv topics need 'categories'",
+        "Topic Document_AI: duplicate id",
+        "pipeline: unknown mode 'batch', expected ('per_topic', 'shared', 'async')",
+        "models.encoder: unknown backend 'tpu', "
+        "expected ('torch', 'torch-int8', 'onnx', 'onnx-int8')",
+        "models.cross_encoder: 'shortlist' is smaller than pipeline.simsearch_top_k",
+        "models.ranker: unknown LLM 'gpt', available: ['ollama', 'openai']",
+        "notifiers: unknown notifier 'pager', available: ['email', 'slack', 'rss']",
+    ]
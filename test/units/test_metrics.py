@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from arxivrec.engine.llm import BaseLLM
+from arxivrec.engine.ranker import LLMRanker
+from arxivrec.utils.metrics import METRICS, Metrics
+
+
+@pytest.fixture
+def candidates():
+    return pd.DataFrame(
+        {
+            "id": ["p0", "p1", "p2"],
+            "title": ["a", "b", "c"],
+            "authors": [["Alice"]] * 3,
+            "abstract": ["x"] * 3,
+            "url": ["u0", "u1", "u2"],
+        }
+    )
+
+
+def test_spans_and_counters_are_aggregated_by_name():
+    metrics = Metrics()
+
+    @metrics.timed("stage")
+    def work():
+        return 42
+
+    @metrics.timed("stage")
+    async def async_work():
+        return 43
+
+    assert work() == 42
+    assert asyncio.run(async_work()) == 43
+    with pytest.raises(ValueError):
+        with metrics.span("failing"):
+            raise ValueError
+    metrics.add("tokens", 10)
+    metrics.add("tokens", 5)
+
+    report = metrics.report()
+
+    assert report["stages"]["stage"]["count"] == 2
+    assert report["stages"]["failing"]["count"] == 1
+    assert report["counters"] == {"tokens": 15}
+    assert report["peak_rss_mb"] > 0
+
+
+def test_report_files(tmp_path):
+    metrics = Metrics()
+    metrics.record("encode.model", 1.5)
+    metrics.add("llm.prompt_tokens", 120)
+
+    metrics.write_json(tmp_path / "metrics.json")
+    metrics.write_prometheus(tmp_path / "arxivrec.prom")
+
+    report = json.loads((tmp_path / "metrics.json").read_text())
+    assert report["stages"]["encode.model"]["total_s"] == 1.5
+    prom = (tmp_path / "arxivrec.prom").read_text()
+    assert 'arxivrec_stage_seconds{stage="encode.model"} 1.5' in prom
+    assert "arxivrec_llm_prompt_tokens_total 120" in prom
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_ranker_records_llm_latency_and_tokens(candidates):
+    class OllamaLikeLLM(BaseLLM):
+        def call(self, prompt):
+            return {
+                "response": json.dumps({"papers": [{"id": "p1", "reasoning": "ok"}]}),
+                "prompt_eval_count": 300,
+                "eval_count": 40,
+            }
+
+    METRICS.reset()
+    LLMRanker(OllamaLikeLLM("fake")).rank("interest", candidates)
+
+    report = METRICS.report()
+    assert report["stages"]["rank"]["count"] == 1
+    assert report["stages"]["llm.call"]["count"] == 1
+    assert report["counters"] == {
+        "llm.calls": 1,
+        "llm.completion_tokens": 40,
+        "llm.prompt_tokens": 300,
+    }
@@ -0,0 +1,75 @@
+import pytest
+
+from arxivrec.dataset.parser import get_header_text
+
+
+def make_pdf(text: str, padding: int = 0) -> bytes:
+    """Minimal one-page PDF, optionally with a large unreferenced object at the end."""
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n" % padding + b"0" * padding + b"\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    out += b"startxref\n%d\n%%%%EOF\n" % xref
+    return bytes(out)
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, status_code: int = 200, headers=None):
+        self.content = body
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, body: bytes, supports_range: bool = True):
+        self.body = body
+        self.supports_range = supports_range
+        self.bytes_sent = 0
+
+    def get(self, url, headers=None, timeout=None):
+        range_header = (headers or {}).get("Range")
+        if not (self.supports_range and range_header):
+            self.bytes_sent += len(self.body)
+            return FakeResponse(self.body)
+
+        start, end = map(int, range_header.removeprefix("bytes=").split("-"))
+        chunk = self.body[start : end + 1]
+        self.bytes_sent += len(chunk)
+        content_range = f"bytes {start}-{start + len(chunk) - 1}/{len(self.body)}"
+        return FakeResponse(chunk, 206, {"Content-Range": content_range})
+
+
+@pytest.mark.parametrize("supports_range", [True, False])
+def test_header_text_from_small_pdf(supports_range):
+    session = FakeSession(make_pdf("Google DeepMind"), supports_range)
+
+    assert get_header_text("u", session=session) == "Google DeepMind"
+
+
+def test_header_text_only_downloads_needed_ranges():
+    body = make_pdf("Anthropic", padding=2_000_000)
+    session = FakeSession(body)
+
+    text = get_header_text("u", max_bytes=64 * 1024, session=session)
+
+    assert text == "Anthropic"
+    assert session.bytes_sent < len(body) / 10
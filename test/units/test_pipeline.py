@@ -0,0 +1,253 @@
+import pandas as pd
+import pytest
+
+from arxivrec.dataset.fetcher import BaseFetcher
+from arxivrec.engine.index import NumpyIndex
+from arxivrec.engine.ranker import BaseRanker
+from arxivrec.pipeline import (
+    EmptyFetchException,
+    LLMPipeline,
+    SharedCorpusPipeline,
+    assign_shortlists,
+    build_digest_html,
+)
+from arxivrec.topic import Topic
+
+
+def make_papers(*titles: str) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": [t.replace(" ", "-") for t in titles],
+            "title": list(titles),
+            "authors": [["Alice"] for _ in titles],
+            "abstract": list(titles),
+            "url": [f"https://arxiv.org/pdf/{t}" for t in titles],
+            "combined_text": list(titles),
+        }
+    )
+
+
+class StaticFetcher(BaseFetcher):
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def fetch(self, **kwargs) -> pd.DataFrame:
+        return self.df
+
+
+class EchoRanker(BaseRanker):
+    def __init__(self):
+        self.seen: dict[str, list[str]] = {}
+
+    def rank(self, user_interest: str, top_papers_df: pd.DataFrame) -> pd.DataFrame:
+        self.seen[user_interest] = top_papers_df["id"].tolist()
+        return top_papers_df.assign(reasoning="relevant")
+
+
+class LastFirstReranker(BaseRanker):
+    """Reverses the shortlist it is given and keeps the first `top_k`."""
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self.seen: list[list[str]] = []
+
+    def rank(self, user_interest: str, top_papers_df: pd.DataFrame) -> pd.DataFrame:
+        self.seen.append(top_papers_df["id"].tolist())
+        return top_papers_df.iloc[::-1].head(self.top_k)
+
+
+@pytest.fixture
+def topics():
+    return [
+        Topic(id="vision", description="image segmentation"),
+        Topic(id="nlp", description="language models"),
+    ]
+
+
+def test_shared_pipeline_encodes_union_once(fake_encoder, topics):
+    shared = make_papers("language models scale", "image segmentation masks")
+    fetchers = {
+        "vision": StaticFetcher(shared),
+        "nlp": StaticFetcher(
+            pd.concat([shared, make_papers("language models reason")])
+        ),
+    }
+    ranker = EchoRanker()
+
+    results = SharedCorpusPipeline(
+        topics=topics,
+        fetchers=fetchers,
+        simsearch_top_k=1,
+        encoder=fake_encoder,
+        llm_ranker=ranker,
+    ).recommend()
+
+    # One batch for topic descriptions, one for the deduplicated corpus
+    assert fake_encoder.model.calls[0] == ["image segmentation", "language models"]
+    assert len(fake_encoder.model.calls) == 2
+    assert len(fake_encoder.model.calls[1]) == 3
+    assert results["vision"]["id"].tolist() == ["image-segmentation-masks"]
+    assert ranker.seen["language models"][0].startswith("language-models")
+
+
+def test_shared_pipeline_restricts_topic_to_its_own_papers(fake_encoder, topics):
+    fetchers = {
+        "vision": StaticFetcher(make_papers("language models scale")),
+        "nlp": StaticFetcher(make_papers("image segmentation masks")),
+    }
+    ranker = EchoRanker()
+
+    SharedCorpusPipeline(topics, fetchers, 5, fake_encoder, ranker).recommend()
+
+    assert ranker.seen["image segmentation"] == ["language-models-scale"]
+    assert ranker.seen["language models"] == ["image-segmentation-masks"]
+
+
+def test_shared_pipeline_raises_on_empty_corpus(fake_encoder, topics):
+    fetchers = {t.id: StaticFetcher(pd.DataFrame()) for t in topics}
+
+    with pytest.raises(EmptyFetchException):
+        SharedCorpusPipeline(
+            topics, fetchers, 5, fake_encoder, EchoRanker()
+        ).recommend()
+
+
+def test_llm_pipeline_with_index_only_encodes_new_papers(fake_encoder, topics):
+    fetcher = StaticFetcher(make_papers("image segmentation masks", "language models"))
+    pipeline = LLMPipeline(
+        topic=topics[0],
+        simsearch_top_k=1,
+        fetcher=fetcher,
+        encoder=fake_encoder,
+        llm_ranker=EchoRanker(),
+        notifier_list=[],
+        index=NumpyIndex(),
+    )
+
+    first = pipeline.recommend()
+    fetcher.df = pd.concat([fetcher.df, make_papers("image segmentation masks v2")])
+    pipeline.recommend()
+
+    corpus_calls = [c for c in fake_encoder.model.calls if c != ["image segmentation"]]
+    assert corpus_calls == [
+        ["image segmentation masks", "language models"],
+        ["image segmentation masks v2"],
+    ]
+    assert first["id"].tolist() == ["image-segmentation-masks"]
+
+
+def test_llm_pipeline_with_index_reencodes_revised_papers(fake_encoder, topics):
+    fetcher = StaticFetcher(make_papers("image segmentation masks"))
+    pipeline = LLMPipeline(
+        topic=topics[0],
+        simsearch_top_k=1,
+        fetcher=fetcher,
+        encoder=fake_encoder,
+        llm_ranker=EchoRanker(),
+        notifier_list=[],
+        index=NumpyIndex(),
+    )
+
+    pipeline.recommend()
+    fetcher.df = fetcher.df.assign(combined_text="image segmentation masks, revised")
+    pipeline.recommend()
+    pipeline.recommend()
+
+    corpus_calls = [c for c in fake_encoder.model.calls if c != ["image segmentation"]]
+    assert corpus_calls == [
+        ["image segmentation masks"],
+        ["image segmentation masks, revised"],
+    ]
+
+
+def test_reranker_cuts_a_larger_shortlist_before_the_llm(fake_encoder, topics):
+    papers = make_papers(
+        "image segmentation masks", "image segmentation", "image masks", "audio"
+    )
+    reranker, ranker = LastFirstReranker(top_k=1), EchoRanker()
+
+    LLMPipeline(
+        topic=topics[0],
+        simsearch_top_k=1,
+        fetcher=StaticFetcher(papers),
+        encoder=fake_encoder,
+        llm_ranker=ranker,
+        notifier_list=[],
+        reranker=reranker,
+        shortlist_k=3,
+    ).recommend()
+    SharedCorpusPipeline(
+        topics[:1],
+        {"vision": StaticFetcher(papers)},
+        1,
+        fake_encoder,
+        ranker,
+        reranker=reranker,
+        shortlist_k=3,
+    ).recommend()
+
+    for shortlist in reranker.seen:
+        assert len(shortlist) == 3 and "audio" not in shortlist
+    assert ranker.seen["image segmentation"] == [reranker.seen[-1][-1]]
+
+
+def test_shared_pipeline_gives_shared_papers_to_best_topic(fake_encoder, topics):
+    shared = make_papers("image segmentation masks", "language models scale")
+    fetchers = {"vision": StaticFetcher(shared), "nlp": StaticFetcher(shared)}
+    ranker = EchoRanker()
+
+    SharedCorpusPipeline(topics, fetchers, 5, fake_encoder, ranker).recommend()
+
+    assert ranker.seen == {
+        "image segmentation": ["image-segmentation-masks"],
+        "language models": ["language-models-scale"],
+    }
+
+
+def test_shared_pipeline_collapses_near_duplicates(fake_encoder, topics):
+    # Same text under two IDs, e.g. a cross-listed repost
+    repost = make_papers("language models scale").assign(id="repost")
+    fetchers = {
+        "vision": StaticFetcher(repost),
+        "nlp": StaticFetcher(make_papers("language models scale", "image masks")),
+    }
+    ranker = EchoRanker()
+
+    SharedCorpusPipeline(
+        topics, fetchers, 5, fake_encoder, ranker, exclusive_topics=False
+    ).recommend()
+
+    assert ranker.seen["image segmentation"] == ["repost"]
+    assert ranker.seen["language models"] == ["repost", "image-masks"]
+
+
+def test_assign_shortlists_ranks_shared_papers_once(fake_encoder, topics):
+    shortlists = {
+        "vision": make_papers("image segmentation masks", "language models scale"),
+        "nlp": pd.concat(
+            [
+                make_papers("language models scale"),
+                make_papers("language models scale").assign(id="repost"),
+            ]
+        ),
+    }
+
+    assigned = assign_shortlists(topics, shortlists, fake_encoder)
+
+    assert assigned["vision"]["id"].tolist() == ["image-segmentation-masks"]
+    assert assigned["nlp"]["id"].tolist() == ["language-models-scale"]
+
+
+def test_digest_shows_each_paper_once_and_counts_what_it_shows(topics):
+    results = {
+        t.id: make_papers("shared paper", f"{t.id} <paper>").assign(reasoning="why")
+        for t in topics
+    }
+
+    digest = build_digest_html(topics, results)
+
+    assert digest.count('<div class="paper">') == 3
+    assert digest.count("shared-paper</a>") == 1
+    assert "vision &lt;paper&gt;" in digest
+    assert '<span class="chip">3 papers</span>' in digest
+    assert '<span class="chip">2 topics</span>' in digest
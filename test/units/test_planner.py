@@ -0,0 +1,74 @@
+import datetime
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from arxivrec.dataset.planner import ArxivQueryPlanner
+from arxivrec.topic import Topic
+
+
+def make_window() -> pd.DataFrame:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return pd.DataFrame(
+        {
+            "id": ["p0", "p1", "p2"],
+            "published": [now - datetime.timedelta(hours=30 * i) for i in range(3)],
+            "categories": [["cs.CL"], ["cs.CV", "cs.AI"], ["cs.LG"]],
+        }
+    )
+
+
+@pytest.fixture
+def planner():
+    return ArxivQueryPlanner(max_results_per_topic=10)
+
+
+@patch("arxivrec.dataset.planner.search_arxiv")
+def test_planner_issues_one_query_for_union(mock_search, planner):
+    mock_search.return_value = make_window()
+    nlp = planner.fetcher_for(Topic(categories=["cs.CL", "cs.AI"]))
+    ml = planner.fetcher_for(Topic(categories=["cs.LG", "cs.AI"]))
+
+    nlp_ids = nlp.fetch(lookback_days=4)["id"].tolist()
+    ml_ids = ml.fetch(lookback_days=4)["id"].tolist()
+
+    mock_search.assert_called_once_with(["cs.CL", "cs.AI", "cs.LG"], 4, 20)
+    assert nlp_ids == ["p0", "p1"]
+    assert ml_ids == ["p1", "p2"]
+
+
+@patch("arxivrec.dataset.planner.search_arxiv")
+def test_planner_answers_smaller_window_from_memory(mock_search, planner):
+    mock_search.return_value = make_window()
+    planner.fetcher_for(Topic(categories=["cs.CL"]))
+
+    wide = planner.fetch_window(4)
+    narrow = planner.fetch_window(1)
+
+    assert mock_search.call_count == 1
+    assert len(wide) == 3
+    assert narrow["id"].tolist() == ["p0"]
+
+
+@patch("arxivrec.dataset.planner.search_arxiv")
+def test_planner_tops_up_topic_crowded_out_of_truncated_window(mock_search):
+    planner = ArxivQueryPlanner(max_results_per_topic=1)
+    window = make_window().iloc[:2].assign(categories=[["cs.CL"], ["cs.CL"]])
+    older = pd.DataFrame(
+        {
+            "id": ["p9"],
+            "published": [window["published"].min() - datetime.timedelta(hours=1)],
+            "categories": [["cs.LG"]],
+        }
+    )
+    mock_search.side_effect = [window, older]
+    planner.fetcher_for(Topic(categories=["cs.CL"]))
+    ml = planner.fetcher_for(Topic(categories=["cs.LG"]))
+
+    ml_ids = ml.fetch(lookback_days=4)["id"].tolist()
+
+    assert ml_ids == ["p9"]
+    follow_up = mock_search.call_args_list[1]
+    assert follow_up.args == (["cs.LG"], 4, 1)
+    assert follow_up.kwargs["until"] == window["published"].min()
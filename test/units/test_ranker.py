@@ -0,0 +1,139 @@
+import asyncio
+import json
+import re
+
+import pandas as pd
+import pytest
+
+from arxivrec.engine.llm import BaseLLM
+from arxivrec.engine.ranker import CrossEncoderRanker, LLMRanker
+
+
+class PickFirstLLM(BaseLLM):
+    """Picks the first `picks` paper IDs that appear in the prompt."""
+
+    def __init__(self, picks: int = 2):
+        super().__init__(model_name="fake")
+        self.picks = picks
+        self.prompts: list[str] = []
+
+    def call(self, prompt):
+        self.prompts.append(prompt)
+        ids = re.findall(r"'id': '([^']+)'", prompt)[: self.picks]
+        papers = [{"id": i, "reasoning": f"picked {i}"} for i in ids]
+        return {"response": json.dumps({"papers": papers})}
+
+
+@pytest.fixture
+def candidates():
+    n = 12
+    return pd.DataFrame(
+        {
+            "id": [f"p{i}" for i in range(n)],
+            "title": [f"Title {i}" for i in range(n)],
+            "authors": [["Alice", "Bob"] for _ in range(n)],
+            "abstract": ["word " * 20 for _ in range(n)],
+            "url": [f"https://arxiv.org/pdf/p{i}" for i in range(n)],
+        }
+    )
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many words of the query the text contains."""
+
+    def __init__(self, model_name, max_length=None, device=None):
+        self.max_length = max_length
+        self.batches: list[int] = []
+
+    def predict(self, pairs, batch_size=32, **kwargs):
+        scores = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start : start + batch_size]
+            self.batches.append(len(batch))
+            scores += [len(set(q.split()) & set(t.split())) for q, t in batch]
+        return scores
+
+
+def word_count(text: str) -> int:
+    return len(text.split())
+
+
+def test_rank_without_budget_uses_single_prompt(candidates):
+    client = PickFirstLLM()
+    result = LLMRanker(client).rank("interest", candidates)
+
+    assert len(client.prompts) == 1
+    assert result["id"].tolist() == ["p0", "p1"]
+    assert result["reasoning"].tolist() == ["picked p0", "picked p1"]
+
+
+def test_make_chunks_respects_token_budget(candidates):
+    ranker = LLMRanker(PickFirstLLM(), chunk_token_budget=400, token_counter=word_count)
+    prepared = ranker._prepare(candidates)
+
+    chunks = ranker._make_chunks("interest", prepared)
+
+    assert len(chunks) > 1
+    assert pd.concat(chunks)["id"].tolist() == candidates["id"].tolist()
+    for chunk in chunks:
+        assert word_count(ranker._build_prompt("interest", chunk)) <= 400
+
+
+def test_rank_runs_tournament_over_chunk_winners(candidates):
+    client = PickFirstLLM()
+    ranker = LLMRanker(client, chunk_token_budget=400, token_counter=word_count)
+
+    result = ranker.rank("interest", candidates)
+
+    num_chunks = len(ranker._make_chunks("interest", ranker._prepare(candidates)))
+    assert len(client.prompts) > num_chunks
+    final_prompt_ids = re.findall(r"'id': '([^']+)'", client.prompts[-1])
+    assert len(final_prompt_ids) < len(candidates)
+    assert result["id"].tolist() == ["p0", "p1"]
+
+
+def test_rank_runs_tournament_inside_a_running_event_loop(candidates):
+    ranker = LLMRanker(PickFirstLLM(), chunk_token_budget=400, token_counter=word_count)
+
+    async def rank_from_loop():
+        return ranker.rank("interest", candidates)
+
+    result = asyncio.run(rank_from_loop())
+
+    assert result["id"].tolist() == ["p0", "p1"]
+
+
+def test_collect_results_skips_unknown_and_duplicate_ids(candidates):
+    ranker = LLMRanker(PickFirstLLM())
+    answer = [
+        {"id": "p7", "reasoning": "first"},
+        {"id": "missing", "reasoning": "hallucinated"},
+        {"id": "p7", "reasoning": "again"},
+        {"id": "p2", "reasoning": "second"},
+    ]
+
+    result = ranker._collect_results(
+        {"response": json.dumps({"papers": answer})}, ranker._prepare(candidates)
+    )
+
+    assert result["id"].tolist() == ["p7", "p2"]
+    assert result["reasoning"].tolist() == ["first", "second"]
+    assert result["url"].tolist() == [
+        "https://arxiv.org/pdf/p7",
+        "https://arxiv.org/pdf/p2",
+    ]
+    assert result["authors"].tolist() == ["Alice, Bob", "Alice, Bob"]
+
+
+def test_cross_encoder_keeps_best_scored_candidates_in_batches(candidates, monkeypatch):
+    monkeypatch.setattr("sentence_transformers.CrossEncoder", FakeCrossEncoder)
+    candidates.loc[[3, 9], "abstract"] = ["graph neural networks", "neural networks"]
+    ranker = CrossEncoderRanker("fake/model", top_k=3, batch_size=5, max_length=64)
+
+    result = ranker.rank("graph neural networks", candidates)
+
+    assert result["id"].tolist() == ["p3", "p9", "p0"]  # ties keep input order
+    assert result["rerank_score"].tolist() == [3, 2, 0]
+    assert result["url"].tolist()[0] == "https://arxiv.org/pdf/p3"
+    assert ranker.model.batches == [5, 5, 2]
+    assert ranker.model.max_length == 64
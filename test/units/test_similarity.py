@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from arxivrec.engine.similarity import l2_normalize, top_k, top_k_scores
+
+
+def test_l2_normalize_returns_unit_float32_rows():
+    vecs = np.array([[3.0, 4.0], [0.0, 0.0]])
+    normed = l2_normalize(vecs)
+
+    assert normed.dtype == np.float32
+    assert normed[0] == pytest.approx([0.6, 0.8])
+    assert normed[1] == pytest.approx([0.0, 0.0])
+
+
+def test_l2_normalize_skips_copy_for_normalized_input():
+    vecs = l2_normalize(np.random.rand(5, 8))
+    assert l2_normalize(vecs) is vecs
+
+
+def test_top_k_matches_full_argsort():
+    rng = np.random.default_rng(0)
+    queries = rng.normal(size=(3, 32))
+    content = rng.normal(size=(200, 32))
+
+    indices, scores = top_k(queries, content, k=7)
+
+    sims = l2_normalize(queries) @ l2_normalize(content).T
+    expected = np.argsort(-sims, axis=1)[:, :7]
+    assert indices.shape == scores.shape == (3, 7)
+    assert np.array_equal(indices, expected)
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+
+def test_top_k_scores_caps_k_at_corpus_size():
+    indices, scores = top_k_scores(np.array([[0.1, 0.9, -np.inf]]), k=10)
+
+    assert indices.tolist() == [[1, 0, 2]]
+    assert scores[0, 0] == pytest.approx(0.9)
+
+
+def test_top_k_trusts_normalized_input(monkeypatch):
+    rng = np.random.default_rng(0)
+    queries, content = (
+        l2_normalize(rng.normal(size=(2, 8))),
+        l2_normalize(rng.normal(size=(50, 8))),
+    )
+    expected = top_k(queries, content, k=5)
+
+    def fail(vecs):
+        raise AssertionError("normalized input was re-normalized")
+
+    monkeypatch.setattr("arxivrec.engine.similarity.l2_normalize", fail)
+    indices, scores = top_k(queries, content, k=5, normalized=True)
+
+    assert np.array_equal(indices, expected[0])
+    assert scores == pytest.approx(expected[1])
@@ -0,0 +1,216 @@
+import datetime
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from arxivrec.dataset.fetcher import sync_arxiv
+from arxivrec.dataset.hf_fetcher import HFDailyPapersFetcher
+from arxivrec.dataset.store import SOURCE_ARXIV, PaperStore
+from arxivrec.pipeline import LLMPipeline
+from arxivrec.topic import Topic
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+
+def make_papers(ids, hours_ago, categories=None) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": ids,
+            "title": [f"Title {i}" for i in ids],
+            "authors": [["Alice", "Bob"] for _ in ids],
+            "published": [NOW - datetime.timedelta(hours=h) for h in hours_ago],
+            "categories": categories or [["cs.LG"] for _ in ids],
+            "combined_text": [f"Title {i}" for i in ids],
+        }
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PaperStore(tmp_path)
+
+
+def test_upsert_dedups_and_round_trips_lists(store):
+    assert store.upsert(make_papers(["a", "b"], [1, 2]), SOURCE_ARXIV) == 2
+    assert store.upsert(make_papers(["b", "c"], [2, 3]), SOURCE_ARXIV) == 1
+
+    df = store.read(SOURCE_ARXIV)
+    assert df["id"].tolist() == ["a", "b", "c"]
+    assert df.iloc[0]["authors"] == ["Alice", "Bob"]
+    assert df.iloc[0]["date"] == (NOW - datetime.timedelta(hours=1)).strftime(
+        "%Y-%m-%d"
+    )
+
+
+def test_read_filters_by_time_and_category(store):
+    store.upsert(
+        make_papers(["a", "b", "c"], [1, 30, 2], [["cs.CL"], ["cs.LG"], ["cs.LG"]]),
+        SOURCE_ARXIV,
+    )
+    since = NOW - datetime.timedelta(days=1)
+
+    assert store.read(SOURCE_ARXIV, since=since)["id"].tolist() == ["a", "c"]
+    assert store.read(SOURCE_ARXIV, categories=["cs.LG"])["id"].tolist() == ["c", "b"]
+
+
+def test_cursor_persists_across_instances(store, tmp_path):
+    store.set_cursor("arxiv:cs.LG", covered_from="then")
+    store.set_cursor("arxiv:cs.LG", synced_at="now")
+
+    assert PaperStore(tmp_path).get_cursor("arxiv:cs.LG") == {
+        "covered_from": "then",
+        "synced_at": "now",
+    }
+    assert store.get_cursor("missing") == {}
+
+
+@patch("arxivrec.dataset.fetcher.search_arxiv")
+def test_sync_only_fetches_papers_newer_than_cursor(mock_search, store):
+    mock_search.return_value = make_papers(["a", "b"], [1, 2])
+    first = sync_arxiv(store, ["cs.LG"], lookback_days=1, max_results=10)
+    assert mock_search.call_args.kwargs["since"] is None
+
+    mock_search.return_value = make_papers(["new"], [0.5])
+    second = sync_arxiv(
+        store,
+        ["cs.LG"],
+        lookback_days=1,
+        max_results=10,
+        min_sync_interval=datetime.timedelta(0),
+    )
+
+    kwargs = mock_search.call_args.kwargs
+    assert kwargs["since"] == NOW - datetime.timedelta(hours=1)
+    assert "stop_at_id" not in kwargs
+    assert first["id"].tolist() == ["a", "b"]
+    assert second["id"].tolist() == ["new", "a", "b"]
+
+
+@patch("arxivrec.dataset.fetcher.search_arxiv")
+def test_sync_refetches_papers_sharing_the_cursor_timestamp(mock_search, store):
+    mock_search.return_value = make_papers(["a", "b"], [1, 2])
+    sync_arxiv(store, ["cs.LG"], lookback_days=1, max_results=10)
+
+    # "a2" shares "a"'s timestamp but was not listed yet on the first sync
+    mock_search.return_value = make_papers(["a", "a2"], [1, 1])
+    df = sync_arxiv(
+        store,
+        ["cs.LG"],
+        lookback_days=1,
+        max_results=10,
+        min_sync_interval=datetime.timedelta(0),
+    )
+
+    assert mock_search.call_args.kwargs["since"] == NOW - datetime.timedelta(hours=1)
+    assert sorted(df["id"]) == ["a", "a2", "b"]
+
+
+@patch("arxivrec.dataset.fetcher.search_arxiv")
+def test_sync_wider_window_only_fetches_uncovered_gap(mock_search, store):
+    mock_search.return_value = make_papers(["a"], [1])
+    sync_arxiv(store, ["cs.LG"], lookback_days=1, max_results=10)
+    covered_from = datetime.datetime.fromisoformat(
+        store.get_cursor("arxiv:cs.LG")["covered_from"]
+    )
+
+    mock_search.return_value = make_papers(["old"], [40])
+    df = sync_arxiv(store, ["cs.LG"], lookback_days=2, max_results=10)
+
+    # Synced moments ago, so the only request is for the older, uncovered gap
+    assert mock_search.call_count == 2
+    assert mock_search.call_args.kwargs["until"] == covered_from
+    assert df["id"].tolist() == ["a", "old"]
+
+    sync_arxiv(store, ["cs.LG"], lookback_days=2, max_results=10)
+    assert mock_search.call_count == 2
+
+
+def test_hf_fetcher_reads_settled_listings_from_store(store):
+    def item(paper_id, upvotes):
+        return {
+            "paper": {
+                "id": paper_id,
+                "title": "T",
+                "summary": "S",
+                "publishedAt": "2024-01-01T00:00:00.000Z",
+                "upvotes": upvotes,
+            }
+        }
+
+    fetcher = HFDailyPapersFetcher(
+        Topic(source="huggingface"), min_upvotes=3, lookback_days=4, store=store
+    )
+    today = datetime.date.today()
+    yesterday, settled = (
+        today - datetime.timedelta(days=1),
+        today - datetime.timedelta(days=3),
+    )
+
+    def listing(upvotes):
+        def fetch_for_date(d):
+            if d == settled:
+                return [item("2401.00001", 5)]
+            return [item("2401.00002", upvotes)] if d == yesterday else []
+
+        return fetch_for_date
+
+    with patch.object(fetcher, "_fetch_for_date", side_effect=listing(1)) as mock:
+        first = fetcher.fetch()
+    assert mock.call_count == 4
+    with patch.object(fetcher, "_fetch_for_date", side_effect=listing(9)) as mock:
+        second = fetcher.fetch()
+
+    # Today and yesterday are still collecting upvotes, so they are requested again
+    assert sorted(c.args[0] for c in mock.call_args_list) == [yesterday, today]
+    assert first["id"].tolist() == ["2401.00001"]
+    assert second["id"].tolist() == ["2401.00002", "2401.00001"]
+    assert second.iloc[1]["combined_text"] == "Title: T; Abstract: S"
+
+
+def test_store_partitions_by_date_and_category_with_typed_columns(store):
+    papers = make_papers(["a", "b"], [1, 50], [["cs.CL"], ["cs.LG", "cs.CL"]])
+    papers["primary_category"] = ["cs.CL", "cs.LG"]
+    store.upsert(papers, SOURCE_ARXIV)
+
+    files = sorted(store.root.glob("arxiv/date=*/category=*/papers.parquet"))
+    assert [f.parent.name for f in files] == ["category=cs.LG", "category=cs.CL"]
+    schema = pq.read_schema(files[0])
+    assert schema.field("authors").type == pa.list_(pa.string())
+    assert schema.field("published").type == pa.timestamp("us", tz="UTC")
+
+
+def test_read_prunes_partitions_and_columns(store):
+    store.upsert(make_papers(["a", "b"], [1, 50]), SOURCE_ARXIV)
+    since = NOW - datetime.timedelta(hours=2)
+
+    with patch("arxivrec.dataset.store.pq.read_table", wraps=pq.read_table) as spy:
+        df = store.read(SOURCE_ARXIV, since=since, columns=["id", "authors"])
+
+    assert spy.call_count == 1
+    assert spy.call_args.kwargs["columns"] == ["id", "authors", "published"]
+    assert df.columns.tolist() == ["id", "authors"]
+    assert df.iloc[0].tolist() == ["a", ["Alice", "Bob"]]
+
+
+def test_pipeline_searches_store_history(store, fake_encoder):
+    store.upsert(make_papers(["old"], [24 * 5]), SOURCE_ARXIV)
+    fresh = make_papers(["new"], [1])
+    fresh["abstract"] = fresh["combined_text"] = ["fresh"]
+
+    fetcher = MagicMock()
+    fetcher.fetch.return_value = fresh
+    pipeline = LLMPipeline(
+        topic=Topic(categories=["cs.LG"]),
+        simsearch_top_k=2,
+        fetcher=fetcher,
+        encoder=fake_encoder,
+        llm_ranker=MagicMock(),
+        notifier_list=[],
+        store=store,
+        history_days=7,
+    )
+
+    assert pipeline.fetch()["id"].tolist() == ["new", "old"]
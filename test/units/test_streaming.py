@@ -0,0 +1,149 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from arxivrec.dataset.fetcher import ArxivFetcher, BaseFetcher
+from arxivrec.engine.similarity import RunningTopK, top_k_scores
+from arxivrec.pipeline import EmptyFetchException, LLMPipeline
+from arxivrec.topic import Topic
+from arxivrec.utils.streaming import prefetch
+
+
+def test_prefetch_overlaps_producer_and_consumer():
+    def pages():
+        for i in range(4):
+            time.sleep(0.1)  # e.g. the arXiv client's delay between pages
+            yield i
+
+    start = time.perf_counter()
+    items = []
+    for item in prefetch(pages()):
+        time.sleep(0.1)  # e.g. encoding the batch
+        items.append(item)
+
+    assert items == [0, 1, 2, 3]
+    assert time.perf_counter() - start < 0.7  # ~0.5s overlapped vs 0.8s serial
+
+
+def test_prefetch_is_bounded_and_propagates_errors():
+    produced = []
+
+    def pages():
+        for i in range(100):
+            produced.append(i)
+            if i == 3:
+                raise ConnectionError("page failed")
+            yield i
+
+    stream = prefetch(pages(), max_pending=1)
+    assert next(stream) == 0
+    time.sleep(0.1)
+    assert len(produced) <= 3  # one queued, one blocked in put
+    with pytest.raises(ConnectionError):
+        list(stream)
+
+
+def test_prefetch_stops_producer_when_consumer_stops():
+    def endless():
+        i = 0
+        while True:
+            yield i
+            i += 1
+
+    stream = prefetch(endless())
+    next(stream)
+    stream.close()
+    time.sleep(0.3)
+    assert not any(t.name == "prefetch" and t.is_alive() for t in threading.enumerate())
+
+
+def test_running_top_k_matches_full_top_k():
+    rng = np.random.default_rng(0)
+    scores = rng.random(103)
+    rows = pd.DataFrame({"id": [f"p{i}" for i in range(103)]})
+
+    top = RunningTopK(7)
+    for start in range(0, 103, 10):
+        top.push(scores[start : start + 10], rows.iloc[start : start + 10])
+
+    expected, _ = top_k_scores(scores, 7)
+    assert top.to_frame()["id"].tolist() == [f"p{i}" for i in expected[0]]
+    assert top.num_seen == 103
+
+
+def test_running_top_k_skips_duplicate_ids():
+    top = RunningTopK(2)
+    rows = pd.DataFrame({"id": ["a", "b"]})
+    top.push(np.array([0.9, 0.5]), rows)
+    top.push(np.array([0.9, 0.5]), rows)
+
+    assert top.to_frame()["id"].tolist() == ["a", "b"]
+
+
+class BatchFetcher(BaseFetcher):
+    def __init__(self, titles: list[str]):
+        self.titles = titles
+
+    def fetch(self, **kwargs) -> pd.DataFrame:
+        return pd.DataFrame(
+            {"id": self.titles, "title": self.titles, "combined_text": self.titles}
+        )
+
+
+def make_pipeline(fetcher, encoder, **kwargs) -> LLMPipeline:
+    return LLMPipeline(
+        topic=Topic(description="graph neural networks"),
+        simsearch_top_k=3,
+        fetcher=fetcher,
+        encoder=encoder,
+        llm_ranker=MagicMock(),
+        notifier_list=[],
+        **kwargs,
+    )
+
+
+def test_stream_search_matches_batch_search(fake_encoder):
+    words = ["graph", "neural", "vision", "speech"] * 5
+    titles = [f"paper {i} about {w}" for i, w in enumerate(words)]
+    fetcher = BatchFetcher(titles)
+
+    streamed = make_pipeline(fetcher, fake_encoder, stream_batch_size=4)
+    batch = make_pipeline(fetcher, fake_encoder)
+
+    def scores(df):
+        query = fake_encoder.encode(["graph neural networks"])
+        content = fake_encoder.encode(df["combined_text"].tolist())
+        return np.round(fake_encoder.cosine_sim(query, content)[0], 6).tolist()
+
+    expected = batch.search(batch.fetch())
+    result = streamed.stream_search()
+    # Compare scores: the order among tied papers is not specified
+    fake_encoder.model.calls.clear()
+    assert scores(result) == scores(expected)
+
+    fake_encoder.model.calls.clear()
+    streamed.stream_search()
+    # Topic query plus one encode call per micro-batch
+    assert len(fake_encoder.model.calls) == 1 + 5
+
+
+def test_stream_search_raises_when_nothing_fetched(fake_encoder):
+    pipeline = make_pipeline(BatchFetcher([]), fake_encoder, stream_batch_size=4)
+    with pytest.raises(EmptyFetchException):
+        pipeline.stream_search()
+
+
+def test_arxiv_fetcher_yields_batches_while_paging(arxiv_api):
+    arxiv_api.pages = [
+        arxiv_api.page([arxiv_api.entry(f"2401.0000{i}") for i in range(5)])
+    ]
+    fetcher = ArxivFetcher(Topic(categories=["cs.LG"]), max_results=10)
+
+    batches = list(fetcher.iter_batches(2))
+
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert batches[2]["id"].tolist() == ["2401.00004"]